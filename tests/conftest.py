@@ -36,4 +36,14 @@ assert any(app in INSTALLED_APPS for app in ['posts.apps.PostsConfig', 'posts'])
 pytest_plugins = [
     'tests.fixtures.fixture_user',
     'tests.fixtures.fixture_data',
+    'tests.fixtures.fixture_query_budget',
 ]
+
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def media_in_temp_directory(mock_media):
+    # mixer создаёт картинки постов: не в MEDIA_ROOT проекта
+    yield mock_media
@@ -0,0 +1,29 @@
+import pytest
+
+from posts.tests.query_budget import measure
+
+
+@pytest.fixture
+def query_budget(user_client, user, another_user, group):
+    """Проверка бюджета запросов страницы, см. posts/tests/query_budget.py."""
+    from posts.models import Post
+
+    data = {
+        'author': another_user,
+        'reader': user,
+        'group': group,
+        'post': Post.objects.create(
+            text='Пост', author=another_user, group=group
+        ),
+    }
+
+    def check(view_name):
+        small, large, budget = measure(user_client, data, view_name)
+        assert small == large, (
+            f'Число запросов `{view_name}` растёт с числом записей: '
+            f'{small} -> {large}'
+        )
+        assert large <= budget, (
+            f'`{view_name}` делает {large} запросов при бюджете {budget}'
+        )
+    return check
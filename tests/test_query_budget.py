@@ -0,0 +1,9 @@
+import pytest
+
+from posts.tests.query_budget import QUERY_BUDGETS
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('view_name', QUERY_BUDGETS)
+def test_view_query_budget(query_budget, view_name):
+    query_budget(view_name)
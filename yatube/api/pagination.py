@@ -0,0 +1,72 @@
+"""Курсорная пагинация: курсор — непрозрачная строка с ключом последней
+записи страницы, поэтому глубокие страницы не требуют OFFSET и не
+съезжают, когда появляются новые посты.
+"""
+import base64
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+def encode_cursor(*parts):
+    raw = '|'.join(str(part) for part in parts)
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Части курсора; ValueError, если курсор испорчен."""
+    try:
+        return base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+    except (ValueError, UnicodeError):
+        raise ValueError('неверный курсор')
+
+
+def page_limit(request):
+    limit = int(request.GET.get('limit', settings.API_PAGE_SIZE))
+    if limit < 1:
+        raise ValueError('неверный limit')
+    return min(limit, settings.API_MAX_PAGE_SIZE)
+
+
+def paginate_posts(posts, request, archived=None):
+    """Страница постов по (-pub_date, -pk) и курсор следующей.
+
+    Когда горячие посты кончаются, страница продолжается архивными
+    (archived): они всегда старше, курсор тот же.
+    """
+    limit = page_limit(request)
+    after = None
+    if request.GET.get('cursor'):
+        pub_date, pk = decode_cursor(request.GET['cursor'])
+        pub_date = parse_datetime(pub_date)
+        if pub_date is None:
+            raise ValueError('неверный курсор')
+        after = Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=int(pk))
+
+    def first(queryset, count):
+        queryset = queryset.order_by('-pub_date', '-pk')
+        if after is not None:
+            queryset = queryset.filter(after)
+        return list(queryset[:count])
+
+    page = first(posts, limit + 1)
+    if archived is not None and len(page) <= limit:
+        page += first(archived, limit + 1 - len(page))
+    if len(page) <= limit:
+        return page, None
+    last = page[limit - 1]
+    return page[:limit], encode_cursor(last.pub_date.isoformat(), last.pk)
+
+
+def paginate_comments(comments, request):
+    """Страница комментариев по возрастанию id и курсор следующей."""
+    limit = page_limit(request)
+    comments = comments.order_by('pk')
+    if request.GET.get('cursor'):
+        pk, = decode_cursor(request.GET['cursor'])
+        comments = comments.filter(pk__gt=int(pk))
+    page = list(comments[:limit + 1])
+    if len(page) <= limit:
+        return page, None
+    return page[:limit], encode_cursor(page[limit - 1].pk)
@@ -0,0 +1,33 @@
+"""Компактные словари для JSON API: только то, что показывают клиенты."""
+from posts.groups import get_group
+
+
+def post_summary(post):
+    group = get_group(post.group_id) if post.group_id else None
+    return {
+        'id': post.pk,
+        'author': post.author.username,
+        'group': group.slug if group else None,
+        'pub_date': post.pub_date.isoformat(),
+        'excerpt': post.excerpt,
+        'truncated': post.is_truncated,
+        'image': post.image.url if post.image else None,
+    }
+
+
+def post_detail(post, comments_count):
+    data = post_summary(post)
+    del data['excerpt'], data['truncated']
+    data.update(
+        text=post.text, text_html=post.text_html, comments=comments_count
+    )
+    return data
+
+
+def comment(comment):
+    return {
+        'id': comment.pk,
+        'author': comment.author.username,
+        'text': comment.text,
+        'created': comment.created.isoformat(),
+    }
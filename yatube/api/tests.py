@@ -0,0 +1,120 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+
+from posts import rollups
+from posts.models import Comment, Group, Post, User
+
+
+@override_settings(API_PAGE_SIZE=2)
+class ApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Группа', slug='api-group', description='Описание'
+        )
+        cls.posts = [
+            Post.objects.create(
+                text=f'Пост {i}', author=cls.user, group=cls.group
+            )
+            for i in range(3)
+        ]
+        Comment.objects.create(
+            post=cls.posts[0], author=cls.user, text='Комментарий'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_feeds_paginate_by_cursor(self):
+        """Ленты отдаются страницами, курсор ведёт на следующую."""
+        for url in ('/api/v1/posts/', '/api/v1/groups/api-group/posts/',
+                    '/api/v1/profiles/author/posts/'):
+            with self.subTest(url=url):
+                first = self.client.get(url).json()
+                second = self.client.get(
+                    url, {'cursor': first['next']}
+                ).json()
+                ids = [post['id'] for post in first['results']]
+                ids += [post['id'] for post in second['results']]
+                self.assertEqual(
+                    ids, [post.pk for post in reversed(self.posts)]
+                )
+                self.assertIsNone(second['next'])
+
+    def test_if_none_match_returns_304_without_list_query(self):
+        """Совпавший ETag — 304 за один агрегирующий запрос."""
+        etag = self.client.get('/api/v1/posts/')['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                '/api/v1/posts/', HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_changes_on_edit_and_comment(self):
+        """Правка поста и новый комментарий меняют ETag."""
+        feed_etag = self.client.get('/api/v1/posts/')['ETag']
+        url = f'/api/v1/posts/{self.posts[0].pk}/'
+        post_etag = self.client.get(url)['ETag']
+        self.posts[0].text = 'Новый текст'
+        self.posts[0].save()
+        self.assertNotEqual(
+            self.client.get('/api/v1/posts/')['ETag'], feed_etag
+        )
+        Comment.objects.create(
+            post=self.posts[1], author=self.user, text='Ещё'
+        )
+        comments_url = f'/api/v1/posts/{self.posts[1].pk}/comments/'
+        etag = self.client.get(comments_url)['ETag']
+        self.assertNotEqual(self.client.get(url)['ETag'], post_etag)
+        self.assertEqual(len(self.client.get(
+            comments_url, HTTP_IF_NONE_MATCH='"stale"'
+        ).json()['results']), 1)
+        self.assertEqual(self.client.get(
+            comments_url, HTTP_IF_NONE_MATCH=etag
+        ).status_code, 304)
+
+    def test_etag_changes_on_delete_and_rename(self):
+        """Удаление поста и новое имя автора меняют ETag ленты."""
+        etag = self.client.get('/api/v1/posts/')['ETag']
+        Post.objects.create(text='Удалить', author=self.user).delete()
+        deleted = self.client.get('/api/v1/posts/')['ETag']
+        self.assertNotEqual(deleted, etag)
+        self.user.username = 'renamed'
+        self.user.save()
+        self.assertNotEqual(self.client.get('/api/v1/posts/')['ETag'], deleted)
+
+    def test_post_detail(self):
+        """Пост отдаётся с полным текстом и числом комментариев."""
+        data = self.client.get(f'/api/v1/posts/{self.posts[0].pk}/').json()
+        self.assertEqual(data['text'], 'Пост 0')
+        self.assertEqual(data['comments'], 1)
+        self.assertEqual(data['group'], 'api-group')
+
+    def test_bad_cursor(self):
+        """Испорченный курсор — 400."""
+        response = self.client.get('/api/v1/posts/', {'cursor': 'xx'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_stats_read_rollups(self):
+        """Статистика отдаётся из суточных итогов и меняет ETag с ними."""
+        url = '/api/v1/stats/authors/'
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url).json(), {'results': []})
+        rollups.roll_up()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.json()['results'], [{
+            'author': 'author', 'posts': 3, 'comments': 1, 'followers': 0
+        }])
+        groups = self.client.get('/api/v1/stats/groups/').json()['results']
+        self.assertEqual(
+            [(row['group'], row['posts'], row['comments']) for row in groups],
+            [('api-group', 3, 1)]
+        )
+        for params in ({'days': 0}, {'days': 'x'}, {'limit': 0}):
+            with self.subTest(params=params):
+                self.assertEqual(
+                    self.client.get(url, params).status_code, 400
+                )
@@ -0,0 +1,16 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('posts/', views.index, name='index'),
+    path('groups/<slug:slug>/posts/', views.group_posts, name='group_posts'),
+    path('profiles/<str:username>/posts/', views.profile, name='profile'),
+    path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path('posts/<int:post_id>/comments/', views.post_comments,
+         name='post_comments'),
+    path('stats/groups/', views.group_stats, name='group_stats'),
+    path('stats/authors/', views.author_stats, name='author_stats'),
+]
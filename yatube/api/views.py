@@ -0,0 +1,155 @@
+from django.http import JsonResponse
+from django.conf import settings
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_GET
+
+from posts import rollups
+from posts.conditional import feed_state, make_etag, post_state
+from posts.groups import get_group_by_slug_or_404
+from posts.archive import get_post_or_archived_or_404
+from posts.models import ArchivedPost, Post, User
+
+from . import serializers
+from .pagination import page_limit, paginate_comments, paginate_posts
+
+API_VERSION = 'v1'
+
+
+def json_response(data, status=200):
+    return JsonResponse(data, status=status, json_dumps_params={
+        'ensure_ascii': False, 'separators': (',', ':')
+    })
+
+
+def bad_request(error):
+    return json_response({'error': str(error)}, status=400)
+
+
+def api_view(etag_func):
+    """GET без кэша у клиента: каждый опрос — проверка ETag, на
+    совпадение отвечаем 304 до запроса списка."""
+    def decorator(view_func):
+        return require_GET(cache_control(no_cache=True)(
+            condition(etag_func=etag_func)(view_func)
+        ))
+    return decorator
+
+
+def feed_view(get_posts):
+    """View ленты; get_posts(**kwargs) отдаёт её горячие и архивные посты.
+    """
+    def posts(request, kwargs):
+        # ETag и view работают с одним набором: автор или группа
+        # ищутся один раз
+        if not hasattr(request, 'api_posts'):
+            request.api_posts = get_posts(**kwargs)
+        return request.api_posts
+
+    def etag(request, **kwargs):
+        # перенос в архив меняет и горячий набор
+        return make_etag(
+            API_VERSION, *feed_state(posts(request, kwargs)[0]),
+            request.GET.urlencode()
+        )
+
+    @api_view(etag)
+    def view(request, **kwargs):
+        hot, archived = posts(request, kwargs)
+        try:
+            page, cursor = paginate_posts(
+                hot.select_related('author').defer('text', 'text_html'),
+                request,
+                archived.select_related('author').defer('text', 'text_html'),
+            )
+        except ValueError as error:
+            return bad_request(error)
+        return json_response({
+            'results': [serializers.post_summary(post) for post in page],
+            'next': cursor,
+        })
+    return view
+
+
+def group_feed(slug):
+    group = get_group_by_slug_or_404(slug)
+    return group.posts.all(), group.archived_posts.all()
+
+
+def profile_feed(username):
+    author = get_object_or_404(User, username=username)
+    return author.posts.all(), author.archived_posts.all()
+
+
+index = feed_view(lambda: (Post.objects.all(), ArchivedPost.objects.all()))
+group_posts = feed_view(group_feed)
+profile = feed_view(profile_feed)
+
+
+def post_etag(request, post_id):
+    state = post_state(post_id)
+    if state is None:
+        return None
+    return make_etag(API_VERSION, post_id, *state, request.GET.urlencode())
+
+
+@api_view(post_etag)
+def post_detail(request, post_id):
+    post, _ = get_post_or_archived_or_404(
+        Post.objects.select_related('author'),
+        ArchivedPost.objects.select_related('author'), post_id
+    )
+    return json_response(
+        serializers.post_detail(post, post.comments.count())
+    )
+
+
+@api_view(post_etag)
+def post_comments(request, post_id):
+    post, _ = get_post_or_archived_or_404(
+        Post.objects.only('pk'), ArchivedPost.objects.only('pk'), post_id
+    )
+    try:
+        page, cursor = paginate_comments(
+            post.comments.select_related('author'), request
+        )
+    except ValueError as error:
+        return bad_request(error)
+    return json_response({
+        'results': [serializers.comment(comment) for comment in page],
+        'next': cursor,
+    })
+
+
+def stats_days(request):
+    days = int(request.GET.get('days', 7))
+    if not 1 <= days <= settings.API_STATS_MAX_DAYS:
+        raise ValueError('неверный days')
+    return days
+
+
+def stats_etag(request):
+    # итоги меняются вместе с отметками rollup_stats, окно дней — в полночь
+    return make_etag(
+        API_VERSION, *rollups.state(), timezone.localdate(),
+        request.GET.urlencode()
+    )
+
+
+@api_view(stats_etag)
+def group_stats(request):
+    try:
+        days = stats_days(request)
+    except ValueError as error:
+        return bad_request(error)
+    return json_response({'results': rollups.group_activity(days)})
+
+
+@api_view(stats_etag)
+def author_stats(request):
+    try:
+        days, limit = stats_days(request), page_limit(request)
+    except ValueError as error:
+        return bad_request(error)
+    return json_response({'results': rollups.top_authors(days, limit)})
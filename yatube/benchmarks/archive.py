@@ -0,0 +1,78 @@
+"""Ленты до и после переноса старых постов в архив.
+
+    python -m benchmarks.archive --db /tmp/bench-archive.sqlite3
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import timedelta
+
+from benchmarks.utils import setup, throughput
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--posts', type=int, default=100000)
+    parser.add_argument('--db', help='файл базы, переиспользуется')
+    parser.add_argument('--requests', type=int, default=100)
+    args = parser.parse_args()
+    db_name = args.db or os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')
+    setup(db_name, keepdb=bool(args.db))
+
+    from django.conf import settings
+    from django.core.paginator import Paginator
+    from django.utils import timezone
+
+    from benchmarks.dataset import seed
+    from posts import archive, groups
+    from posts.models import ArchivedPost, Post, User
+
+    if not Post.objects.exists() and not ArchivedPost.objects.exists():
+        seed(args.posts)
+        # даты публикации за последние три года
+        for day in range(0, 3 * 365, 5):
+            Post.objects.filter(pk__gt=day * args.posts // 1095).update(
+                pub_date=timezone.now() - timedelta(days=1095 - day)
+            )
+
+    author = User.objects.order_by('pk').first()
+    group = groups.all_groups()[0]
+
+    def feeds():
+        return {
+            'главная': archive.Timeline(
+                Post.objects.all(), ArchivedPost.objects.all(), 'all'
+            ),
+            'группа': archive.Timeline(
+                group.posts.all(), group.archived_posts.all(),
+                f'group:{group.pk}'
+            ),
+            'профиль': archive.Timeline(
+                author.posts.all(), author.archived_posts.all(),
+                f'author:{author.pk}'
+            ),
+        }
+
+    def first_page(name):
+        # как во view: count() для Paginator и первая страница
+        page = Paginator(feeds()[name], settings.POSTS_ON_PAGE).get_page(1)
+        return list(page)
+
+    def measure(title):
+        print(title, f'(горячих постов: {Post.objects.count()})')
+        for name in feeds():
+            rate = throughput(lambda: first_page(name), args.requests)
+            print(f'  {name:10} {rate:9.1f} запросов/с')
+
+    measure('до архива')
+    cutoff = timezone.now() - timedelta(days=settings.ARCHIVE_AFTER_DAYS)
+    started = time.perf_counter()
+    posts, comments = archive.archive(cutoff)
+    print(f'archive_posts: {posts} постов, {comments} комментариев за '
+          f'{time.perf_counter() - started:.1f} с')
+    measure('после архива')
+
+
+if __name__ == '__main__':
+    main()
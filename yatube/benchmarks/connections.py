@@ -0,0 +1,101 @@
+"""Накладные расходы на соединение: CONN_MAX_AGE = 0 и постоянные.
+
+    python -m benchmarks.connections --db /tmp/bench-conn.sqlite3
+
+Запросы идут через WSGIHandler, как на настоящем сервере: тестовый
+Client отключает close_old_connections, и разницы не было бы видно.
+Кэш очищается перед каждым запросом, чтобы страница ходила в базу.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.utils import setup
+
+VIEWS = {
+    'index': lambda rnd, data: f'/?page={rnd.randint(1, 20)}',
+    'group_posts': lambda rnd, data: f'/group/{rnd.choice(data["slugs"])}/',
+    'profile': lambda rnd, data: f'/profile/{rnd.choice(data["users"])}/',
+    'post_detail': lambda rnd, data: f'/posts/{rnd.choice(data["posts"])}/',
+}
+
+
+def measure(handler, path_for, requests):
+    from django.core.cache import cache
+    from django.db.backends.signals import connection_created
+    from django.test.client import RequestFactory
+
+    factory = RequestFactory()
+    opened = []
+
+    def count(sender, connection, **kwargs):
+        opened.append(connection.alias)
+
+    connection_created.connect(count)
+    latencies = []
+    try:
+        for _ in range(requests):
+            cache.clear()
+            path, _, query = path_for().partition('?')
+            environ = factory._base_environ(
+                PATH_INFO=path, QUERY_STRING=query
+            )
+            started = time.perf_counter()
+            response = handler(environ, lambda status, headers: None)
+            response.close()
+            assert response.status_code == 200, path
+            latencies.append(time.perf_counter() - started)
+    finally:
+        connection_created.disconnect(count)
+    return sum(latencies) / len(latencies) * 1000, len(opened)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--posts', type=int, default=10000)
+    parser.add_argument('--db', help='файл базы, переиспользуется')
+    parser.add_argument('--requests', type=int, default=300)
+    args = parser.parse_args()
+
+    db_name = args.db or os.path.join(
+        tempfile.gettempdir(), 'yatube-conn.sqlite3'
+    )
+    setup(db_name=db_name, keepdb=bool(args.db))
+    from benchmarks.dataset import seed
+    from django.contrib.auth import get_user_model
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.db import connections
+    from posts.models import Group, Post
+
+    if not Post.objects.exists():
+        seed(args.posts)
+    data = {
+        'users': list(get_user_model().objects.values_list(
+            'username', flat=True
+        )[:100]),
+        'slugs': list(Group.objects.values_list('slug', flat=True)),
+        'posts': list(Post.objects.values_list('pk', flat=True)[:1000]),
+    }
+    handler = WSGIHandler()
+    for name, path in VIEWS.items():
+        results = []
+        for max_age in (0, 60):
+            for connection in connections.all():
+                connection.close()
+                connection.settings_dict['CONN_MAX_AGE'] = max_age
+            rnd = random.Random(0)
+            results.append(measure(
+                handler, lambda: path(rnd, data), args.requests
+            ))
+        (before, opened_before), (after, opened_after) = results
+        print(
+            f'{name:<12} CONN_MAX_AGE=0 {before:6.2f} ms ({opened_before} '
+            f'conn)   =60 {after:6.2f} ms ({opened_after} conn)   '
+            f'{before - after:+.2f} ms/request'
+        )
+
+
+if __name__ == '__main__':
+    main()
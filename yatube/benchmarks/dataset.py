@@ -0,0 +1,91 @@
+"""Реалистичный набор данных для бенчмарков.
+
+Авторы, группы и подписки распределены по степенному закону: немногие
+авторы пишут большую часть постов и собирают большую часть подписчиков,
+как на живом сайте.
+"""
+import random
+from itertools import accumulate
+
+from faker import Faker
+
+BATCH_SIZE = 5000
+TEXT_POOL_SIZE = 500
+
+
+def zipf_cum_weights(count, exponent=1.1):
+    return list(accumulate(
+        1 / rank ** exponent for rank in range(1, count + 1)
+    ))
+
+
+def seed(posts, seed=0):
+    from django.contrib.auth import get_user_model
+    from mixer.backend.django import mixer
+    from posts.models import (
+        Comment, Follow, Group, Post, make_excerpt, make_excerpt_html,
+    )
+    from posts.rendering import render_many
+
+    User = get_user_model()
+    fake = Faker('ru_RU')
+    Faker.seed(seed)
+    rnd = random.Random(seed)
+
+    users = mixer.cycle(max(10, posts // 100)).blend(
+        User,
+        username=mixer.sequence('user{0}'),
+        first_name=fake.first_name,
+        last_name=fake.last_name,
+    )
+    groups = mixer.cycle(max(5, posts // 2000)).blend(
+        Group, slug=mixer.sequence('group-{0}'), title=fake.catch_phrase
+    )
+    author_weights = zipf_cum_weights(len(users))
+    group_weights = zipf_cum_weights(len(groups))
+    texts = [fake.paragraph(nb_sentences=8) for _ in range(TEXT_POOL_SIZE)]
+    rendered = dict(zip(texts, render_many(texts)))
+
+    for start in range(0, posts, BATCH_SIZE):
+        batch = []
+        for _ in range(min(BATCH_SIZE, posts - start)):
+            text = rnd.choice(texts)
+            excerpt = make_excerpt(text)
+            batch.append(Post(
+                text=text,
+                excerpt=excerpt,
+                is_truncated=excerpt != text,
+                text_html=rendered[text],
+                excerpt_html=make_excerpt_html(rendered[text]),
+                author=rnd.choices(users, cum_weights=author_weights)[0],
+                # у трети постов нет группы
+                group=(
+                    rnd.choices(groups, cum_weights=group_weights)[0]
+                    if rnd.random() > 0.3 else None
+                ),
+            ))
+        Post.objects.bulk_create(batch)
+
+    follows = set()
+    for user in users:
+        for author in rnd.choices(
+            users, cum_weights=author_weights, k=rnd.randint(0, 20)
+        ):
+            if author != user:
+                follows.add((user.pk, author.pk))
+    Follow.objects.bulk_create(
+        Follow(user_id=user, author_id=author) for user, author in follows
+    )
+
+    post_ids = list(Post.objects.values_list('pk', flat=True)[:posts // 5])
+    Comment.objects.bulk_create(
+        (
+            Comment(
+                post_id=rnd.choice(post_ids),
+                author=rnd.choices(users, cum_weights=author_weights)[0],
+                text=rnd.choice(texts)[:200],
+            )
+            for _ in range(posts // 5)
+        )
+    )
+    return users, groups
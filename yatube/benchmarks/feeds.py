@@ -0,0 +1,49 @@
+"""Опрос RSS читателями: лента без кэша, из кэша и с If-None-Match.
+
+    python -m benchmarks.feeds --db /tmp/bench-feeds.sqlite3
+"""
+import argparse
+import os
+import tempfile
+
+from benchmarks.utils import setup, throughput
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--posts', type=int, default=10000)
+    parser.add_argument('--db', help='файл базы, переиспользуется')
+    parser.add_argument('--requests', type=int, default=300)
+    args = parser.parse_args()
+    db_name = args.db or os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')
+    setup(db_name, keepdb=bool(args.db))
+
+    from django.core.cache import cache
+    from django.test import Client
+    from django.urls import reverse
+
+    from benchmarks.dataset import seed
+    from posts.models import Post
+
+    if not Post.objects.exists():
+        seed(args.posts)
+    client = Client()
+    url = reverse('posts:index_feed')
+
+    def cold():
+        cache.clear()
+        client.get(url)
+
+    etag = client.get(url)['ETag']
+    runs = {
+        'без кэша': cold,
+        'из кэша': lambda: client.get(url),
+        'If-None-Match': lambda: client.get(url, HTTP_IF_NONE_MATCH=etag),
+    }
+    for name, func in runs.items():
+        rate = throughput(func, args.requests)
+        print(f'{name:15} {rate:8.1f} запросов/с')
+
+
+if __name__ == '__main__':
+    main()
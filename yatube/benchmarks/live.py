@@ -0,0 +1,72 @@
+"""Проверка новых постов: перезагрузка главной против since.
+
+    python -m benchmarks.live --db /tmp/bench-live.sqlite3
+
+Клиент видел ленту, после этого появилось --new постов. Кэш очищается
+перед каждым запросом, как если бы страница устарела.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.utils import setup
+
+
+def measure(client, url, params, requests):
+    from django.core.cache import cache
+    from django.db import connections
+    from django.test.utils import CaptureQueriesContext
+
+    latencies = []
+    for _ in range(requests):
+        cache.clear()
+        # GET читает с реплики: считаем запросы во все базы
+        captured = [CaptureQueriesContext(conn) for conn in connections.all()]
+        for queries in captured:
+            queries.__enter__()
+        started = time.perf_counter()
+        response = client.get(url, params)
+        latencies.append(time.perf_counter() - started)
+        for queries in captured:
+            queries.__exit__(None, None, None)
+        assert response.status_code == 200, url
+    return (
+        sum(latencies) / len(latencies) * 1000,
+        sum(len(queries) for queries in captured),
+        len(response.content),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--posts', type=int, default=10000)
+    parser.add_argument('--new', type=int, default=3)
+    parser.add_argument('--db', help='файл базы, переиспользуется')
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+    db_name = args.db or os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')
+    setup(db_name, keepdb=bool(args.db))
+
+    from django.test import Client
+    from django.urls import reverse
+
+    from benchmarks.dataset import seed
+    from posts.models import Post
+
+    if not Post.objects.exists():
+        seed(args.posts)
+    ids = list(Post.objects.order_by('-pk').values_list('pk', flat=True)
+               [:args.new + 1])
+    client = Client()
+    runs = {
+        'перезагрузка index': (reverse('posts:index'), {}),
+        'since': (reverse('posts:since'), {'after': ids[-1]}),
+    }
+    for name, (url, params) in runs.items():
+        ms, queries, size = measure(client, url, params, args.requests)
+        print(f'{name:20} {ms:7.2f} мс  запросов {queries}  байт {size}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""Время рендера списка постов с тёплым и холодным кэшем карточек."""
+import time
+
+from benchmarks.utils import setup
+
+RENDERS = 300
+
+
+def render_time(posts, warm):
+    from django.core.cache import cache
+    from django.template.loader import render_to_string
+
+    cache.clear()
+    render_to_string('posts/includes/post_list.html', {'posts': posts})
+    started = time.perf_counter()
+    for _ in range(RENDERS):
+        if not warm:
+            cache.clear()
+        render_to_string('posts/includes/post_list.html', {'posts': posts})
+    return (time.perf_counter() - started) / RENDERS * 1000
+
+
+def main():
+    setup()
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from posts.models import Group, Post
+
+    author = get_user_model().objects.create_user(
+        username='bench', first_name='Имя', last_name='Фамилия'
+    )
+    group = Group.objects.create(title='Группа', slug='bench')
+    Post.objects.bulk_create(
+        Post(text='Текст поста ' * 200, author=author, group=group)
+        for _ in range(settings.POSTS_ON_PAGE)
+    )
+    posts = list(Post.objects.select_related('author'))
+    cold = render_time(posts, warm=False)
+    warm = render_time(posts, warm=True)
+    print(f'cold cards: {cold:6.2f} ms/page')
+    print(f'warm cards: {warm:6.2f} ms/page')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""Страницы под параллельной записью: чтение с реплики и без неё.
+
+    python -m benchmarks.read_replica --db /tmp/bench-replica.sqlite3
+
+Читатели открывают главную, профили и посты, писатели одновременно
+создают посты и комментарии. Прогон повторяется с
+DATABASE_READ_REPLICA = None, когда всё идёт через default.
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from benchmarks.utils import latency_summary, setup
+
+READ_VIEWS = ('index', 'profile', 'post_detail')
+WRITE_VIEWS = ('post_create', 'add_comment')
+
+
+def run(scenarios, user_ids, readers, writers, duration):
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.test import Client
+
+    User = get_user_model()
+    latencies = {'read': [], 'write': []}
+    errors = []
+    deadline = time.monotonic() + duration
+
+    def worker(kind, names, user_id):
+        client = Client()
+        client.force_login(User.objects.get(pk=user_id))
+        rnd = random.Random(user_id)
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            response = scenarios[rnd.choice(names)](client)
+            latencies[kind].append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+        connection.close()
+
+    threads = [
+        threading.Thread(target=worker, args=('read', READ_VIEWS, user_id))
+        for user_id in user_ids[:readers]
+    ] + [
+        threading.Thread(target=worker, args=('write', WRITE_VIEWS, user_id))
+        for user_id in user_ids[readers:readers + writers]
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_time = time.perf_counter() - started
+    return {
+        kind: latency_summary(values, wall_time)
+        for kind, values in latencies.items()
+    }, len(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--posts', type=int, default=10000)
+    parser.add_argument('--db', help='файл базы, переиспользуется')
+    parser.add_argument('--readers', type=int, default=6)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--duration', type=float, default=10)
+    args = parser.parse_args()
+
+    db_name = args.db or os.path.join(
+        tempfile.gettempdir(), 'yatube-replica.sqlite3'
+    )
+    setup(db_name=db_name, keepdb=bool(args.db))
+    from benchmarks.dataset import seed
+    from benchmarks.views import make_scenarios
+    from django.core.cache import cache
+    from django.test import override_settings
+    from posts.models import Post
+
+    if not Post.objects.exists():
+        seed(args.posts)
+    scenarios, user_ids = make_scenarios(random.Random(0))
+    for name, replica in (('default', None), ('replica', 'replica')):
+        cache.clear()
+        with override_settings(DATABASE_READ_REPLICA=replica):
+            results, errors = run(
+                scenarios, user_ids, args.readers, args.writers,
+                args.duration
+            )
+        for kind, result in results.items():
+            print(
+                f'{name:<8} {kind:<6} {result["throughput"]:8.1f} req/s   '
+                f'p50 {result["p50"]:7.1f}   p95 {result["p95"]:7.1f}   '
+                f'p99 {result["p99"]:7.1f} ms'
+            )
+        print(f'{name:<8} errors {errors}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""Время расчёта рекомендаций на синтетическом графе подписок.
+
+    python -m benchmarks.recommendations --users 50000 --edges 1000000
+
+Граф строится в памяти без базы: авторов выбирают по степенному закону,
+как в benchmarks.dataset. Запись в таблицу не входит в замер.
+"""
+import argparse
+import random
+import time
+
+from benchmarks.dataset import zipf_cum_weights
+from benchmarks.utils import setup
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--users', type=int, default=50000)
+    parser.add_argument('--edges', type=int, default=1000000)
+    args = parser.parse_args()
+    setup()
+
+    from posts.recommendations import FollowGraph, compute
+
+    rnd = random.Random(0)
+    weights = zipf_cum_weights(args.users)
+    edges = set()
+    while len(edges) < args.edges:
+        user = rnd.randrange(args.users)
+        author = rnd.choices(range(args.users), cum_weights=weights)[0]
+        if user != author:
+            edges.add((user, author))
+
+    started = time.perf_counter()
+    graph = FollowGraph(range(args.users), edges)
+    built = time.perf_counter()
+    rows = sum(len(authors) for _, authors in compute(graph))
+    done = time.perf_counter()
+    print(f'граф {args.users} пользователей, {len(edges)} подписок: '
+          f'{built - started:.1f} с')
+    print(f'расчёт {rows} рекомендаций: {done - built:.1f} с')
+
+
+if __name__ == '__main__':
+    main()
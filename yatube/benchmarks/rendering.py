@@ -0,0 +1,55 @@
+"""Текст поста: форматирование на каждом рендере против готового text_html.
+
+    python -m benchmarks.rendering
+"""
+import argparse
+import time
+from io import StringIO
+
+from benchmarks.utils import setup, throughput
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--posts', type=int, default=5000)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+    setup()
+
+    from django.template import Context, Template
+
+    from benchmarks.dataset import seed
+    from posts.models import Post, User
+    from posts.rendering import render_text
+
+    seed(args.posts)
+    usernames = list(User.objects.values_list('username', flat=True)[:5])
+    text = (
+        Post.objects.values_list('text', flat=True).first()
+        + f'\n\nСм. https://example.com/ и @{usernames[0]}, @{usernames[1]}.'
+    )
+    text_html = render_text(text)
+
+    per_render = Template('{{ text|urlize|linebreaks }}')
+    stored = Template('{{ text_html|safe }}')
+    runs = {
+        'urlize|linebreaks': lambda: per_render.render(
+            Context({'text': text})
+        ),
+        '+ упоминания': lambda: render_text(text),
+        'text_html': lambda: stored.render(Context({'text_html': text_html})),
+    }
+    for name, func in runs.items():
+        rate = throughput(func, args.requests)
+        print(f'{name:20} {rate:10.1f} рендеров/с')
+
+    from django.core.management import call_command
+
+    started = time.perf_counter()
+    call_command('render_posts', '--all', stdout=StringIO())
+    print(f'render_posts --all: {args.posts} постов за '
+          f'{time.perf_counter() - started:.1f} с')
+
+
+if __name__ == '__main__':
+    main()
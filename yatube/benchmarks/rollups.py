@@ -0,0 +1,72 @@
+"""Отчёты по активности: GROUP BY по всей таблице против суточных итогов.
+
+    python -m benchmarks.rollups --db /tmp/bench-rollups.sqlite3
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import timedelta
+
+from benchmarks.utils import setup, throughput
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--posts', type=int, default=50000)
+    parser.add_argument('--db', help='файл базы, переиспользуется')
+    parser.add_argument('--requests', type=int, default=50)
+    args = parser.parse_args()
+    db_name = args.db or os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')
+    setup(db_name, keepdb=bool(args.db))
+
+    from django.db.models import Count
+    from django.db.models.functions import TruncDate
+    from django.utils import timezone
+
+    from benchmarks.dataset import seed
+    from posts import rollups
+    from posts.models import Post
+
+    if not Post.objects.exists():
+        seed(args.posts)
+        # даты публикации за последние полгода
+        for day in range(180):
+            Post.objects.filter(pk__gt=day * args.posts // 180).update(
+                pub_date=timezone.now() - timedelta(days=day)
+            )
+
+    started = time.perf_counter()
+    rollups.rebuild()
+    print(f'первый проход: {time.perf_counter() - started:.1f} с')
+    Post.objects.bulk_create(
+        Post(text='Новый', excerpt='Новый', author_id=1)
+        for _ in range(1000)
+    )
+    started = time.perf_counter()
+    rollups.roll_up()
+    print(f'инкремент на 1000 постов: '
+          f'{(time.perf_counter() - started) * 1000:.0f} мс')
+
+    since = timezone.now() - timedelta(days=30)
+    runs = {
+        'GROUP BY по Post': lambda: list(
+            Post.objects.filter(pub_date__gte=since)
+            .annotate(day=TruncDate('pub_date')).order_by()
+            .values('day', 'group_id').annotate(count=Count('pk'))
+        ),
+        'итоги по группам': lambda: rollups.group_activity(30),
+        'GROUP BY авторы': lambda: list(
+            Post.objects.filter(pub_date__gte=since).order_by()
+            .values('author__username').annotate(count=Count('pk'))
+            .order_by('-count')[:10]
+        ),
+        'итоги по авторам': lambda: rollups.top_authors(30, 10),
+    }
+    for name, func in runs.items():
+        rate = throughput(func, args.requests)
+        print(f'{name:20} {rate:8.1f} запросов/с')
+
+
+if __name__ == '__main__':
+    main()
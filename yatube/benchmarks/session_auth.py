@@ -0,0 +1,45 @@
+"""Нагрузочный тест: сессии и request.user из кэша против чтения из БД."""
+from benchmarks.utils import setup, throughput
+
+REQUESTS = 2000
+
+BASELINE = {
+    'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+    'AUTHENTICATION_BACKENDS': ['django.contrib.auth.backends.ModelBackend'],
+}
+CACHED = {
+    'SESSION_ENGINE': 'django.contrib.sessions.backends.cached_db',
+    'AUTHENTICATION_BACKENDS': ['users.backends.CachedModelBackend'],
+}
+
+
+def run(name, overrides, user):
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test import Client, override_settings
+    from django.test.utils import CaptureQueriesContext
+
+    cache.clear()
+    with override_settings(**overrides):
+        client = Client()
+        client.force_login(user)
+        client.get('/about/author/')
+        with CaptureQueriesContext(connection) as queries:
+            client.get('/about/author/')
+        # request_started очищает connection.queries, считаем сразу
+        count = len(queries)
+        rps = throughput(lambda: client.get('/about/author/'), REQUESTS)
+    print(f'{name:<10} queries/request: {count:>2}   {rps:8.1f} req/s')
+
+
+def main():
+    setup()
+    from django.contrib.auth import get_user_model
+
+    user = get_user_model().objects.create_user(username='bench')
+    run('baseline', BASELINE, user)
+    run('cached', CACHED, user)
+
+
+if __name__ == '__main__':
+    main()
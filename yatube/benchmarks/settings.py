@@ -0,0 +1,11 @@
+# Настройки для бенчмарков: как в продакшене, без DEBUG и debug_toolbar
+# (его панель шаблонов подменяет Template._render и сильно искажает замеры).
+from yatube.settings import *  # noqa: F401,F403
+from yatube.settings import INSTALLED_APPS, MIDDLEWARE
+
+DEBUG = False
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app != 'debug_toolbar']
+MIDDLEWARE = [
+    middleware for middleware in MIDDLEWARE
+    if not middleware.startswith('debug_toolbar')
+]
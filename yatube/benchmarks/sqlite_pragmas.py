@@ -0,0 +1,94 @@
+"""Параллельные чтения и записи в SQLite: PRAGMA по умолчанию и core.db.
+
+Читатели крутят запросы главной страницы (COUNT и страница постов),
+писатели создают посты и комментарии. Считаются операции в секунду и
+ошибки «database is locked».
+"""
+import os
+import tempfile
+import threading
+import time
+from io import StringIO
+
+from benchmarks.utils import setup
+
+DURATION = 10
+READERS = 6
+WRITERS = 2
+
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'DELETE',
+    'synchronous': 'FULL',
+    'busy_timeout': 5000,
+}
+
+
+def workload(author_id, post_id):
+    from django.db import OperationalError, connection
+    from posts.models import Comment, Post
+
+    counts = {'reads': 0, 'writes': 0, 'locked': 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + DURATION
+
+    def loop(kind, operation):
+        while time.monotonic() < deadline:
+            try:
+                operation()
+            except OperationalError:
+                outcome = 'locked'
+            else:
+                outcome = kind
+            with lock:
+                counts[outcome] += 1
+        connection.close()
+
+    def read():
+        Post.objects.count()
+        list(Post.objects.select_related('author').defer('text')[:10])
+
+    def write():
+        Post.objects.create(author_id=author_id, text='Пост')
+        Comment.objects.create(post_id=post_id, author_id=author_id,
+                               text='Текст')
+
+    threads = [
+        threading.Thread(target=loop, args=('reads', read))
+        for _ in range(READERS)
+    ] + [
+        threading.Thread(target=loop, args=('writes', write))
+        for _ in range(WRITERS)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return counts
+
+
+def main():
+    setup(db_name=os.path.join(tempfile.gettempdir(), 'yatube-pragmas.db'))
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.db import connection
+    from django.test import override_settings
+    from posts.models import Post
+
+    call_command('seed_yatube', posts=20000, users=500, stdout=StringIO())
+    post = Post.objects.first()
+    for name, pragmas in (
+        ('default', DEFAULT_PRAGMAS),
+        ('tuned', settings.SQLITE_PRAGMAS),
+    ):
+        connection.close()
+        with override_settings(SQLITE_PRAGMAS=pragmas):
+            counts = workload(post.author_id, post.pk)
+        print(
+            f'{name:<8} reads {counts["reads"] / DURATION:8.1f}/s   '
+            f'writes {counts["writes"] / DURATION:7.1f}/s   '
+            f'locked {counts["locked"]}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Популярные посты: annotate(Count) по всей таблице против Post.score.
+
+    python -m benchmarks.trending --db /tmp/bench-trending.sqlite3
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.utils import setup, throughput
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--posts', type=int, default=50000)
+    parser.add_argument('--db', help='файл базы, переиспользуется')
+    parser.add_argument('--requests', type=int, default=100)
+    args = parser.parse_args()
+    db_name = args.db or os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')
+    setup(db_name, keepdb=bool(args.db))
+
+    from django.db.models import Count
+
+    from benchmarks.dataset import seed
+    from posts import groups, trending
+    from posts.models import Post
+
+    if not Post.objects.exists():
+        seed(args.posts)
+    trending.rebuild()
+    group = groups.all_groups()[0]
+    runs = {
+        'annotate(Count)': lambda: list(
+            Post.objects.annotate(comments_count=Count('comments'))
+            .order_by('-comments_count')[:10]
+        ),
+        'score': lambda: list(trending.trending_posts()[:10]),
+        'annotate(Count), группа': lambda: list(
+            group.posts.annotate(comments_count=Count('comments'))
+            .order_by('-comments_count')[:10]
+        ),
+        'score, группа': lambda: list(
+            trending.trending_posts(group.posts.all())[:10]
+        ),
+    }
+    for name, func in runs.items():
+        rate = throughput(func, args.requests)
+        print(f'{name:25} {rate:9.1f} запросов/с')
+    for queryset in (
+        trending.trending_posts()[:10],
+        trending.trending_posts(group.posts.all())[:10],
+    ):
+        print(queryset.explain())
+    started = time.perf_counter()
+    count = trending.decay(600)
+    print(f'decay_trending: {count} постов за '
+          f'{(time.perf_counter() - started) * 1000:.1f} мс')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Общие помощники для скриптов из benchmarks/.
+
+Запуск из каталога с manage.py: python -m benchmarks.<имя_скрипта>
+Скрипты работают на отдельной тестовой базе и не трогают db.sqlite3.
+"""
+import os
+import time
+
+import django
+
+
+def setup(db_name=None, keepdb=False):
+    """Поднимает Django и создаёт тестовую базу.
+
+    Без db_name база в памяти; с db_name — файл, который при keepdb=True
+    переживает запуск, чтобы не засевать большой набор данных заново.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+    django.setup()
+    from django.conf import settings
+    from django.db import connection, connections
+
+    if db_name:
+        connection.settings_dict['TEST']['NAME'] = db_name
+    connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, keepdb=keepdb
+    )
+    if settings.DATABASE_READ_REPLICA:
+        # реплика — та же тестовая база только на чтение; база в памяти
+        # остаётся зеркалом default, и core.routers её не использует
+        connections[settings.DATABASE_READ_REPLICA].settings_dict['NAME'] = (
+            f'file:{db_name}?mode=ro' if db_name
+            else connection.settings_dict['NAME']
+        )
+
+
+def throughput(func, requests):
+    """Запросов в секунду для func, вызванной requests раз подряд."""
+    started = time.perf_counter()
+    for _ in range(requests):
+        func()
+    return requests / (time.perf_counter() - started)
+
+
+def percentile(ordered, percent):
+    """Перцентиль отсортированного списка с интерполяцией между соседями.
+
+    statistics.quantiles появился только в Python 3.8.
+    """
+    position = (len(ordered) - 1) * percent / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (
+        position - lower
+    )
+
+
+def latency_summary(latencies, wall_time):
+    """Пропускная способность и перцентили задержки в миллисекундах."""
+    ordered = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'throughput': len(latencies) / wall_time,
+        'p50': percentile(ordered, 50) * 1000,
+        'p95': percentile(ordered, 95) * 1000,
+        'p99': percentile(ordered, 99) * 1000,
+    }
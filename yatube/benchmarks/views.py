@@ -0,0 +1,155 @@
+"""Нагрузочный бенчмарк всех страниц yatube.
+
+    python -m benchmarks.views --posts 100000 --db /tmp/bench100k.sqlite3
+    python -m benchmarks.views --output new.json \
+        --baseline benchmarks/baseline.json
+
+Набор данных засевается один раз (benchmarks.dataset) и с --db
+переиспользуется между запусками. Каждая страница нагружается --clients
+параллельными клиентами; результат — пропускная способность и p50/p95/p99
+задержки по каждому view, при --output сохраняется в JSON, при --baseline
+сравнивается с сохранённым ранее прогоном.
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.dataset import zipf_cum_weights
+from benchmarks.utils import latency_summary, setup
+
+
+def make_scenarios(rnd):
+    from django.contrib.auth import get_user_model
+    from posts.models import Group, Post
+
+    users = list(
+        get_user_model().objects.order_by('pk').values_list('pk', 'username')
+    )
+    slugs = list(Group.objects.order_by('pk').values_list('slug', flat=True))
+    post_ids = list(Post.objects.values_list('pk', flat=True)[:1000])
+    user_weights = zipf_cum_weights(len(users))
+    group_weights = zipf_cum_weights(len(slugs))
+
+    def some_user():
+        return rnd.choices(users, cum_weights=user_weights)[0]
+
+    def page():
+        # в основном первые страницы, изредка глубокие
+        return rnd.choice((1, 1, 1, 2, 3, rnd.randint(1, 50)))
+
+    return {
+        'index': lambda client: client.get(f'/?page={page()}'),
+        'group_posts': lambda client: client.get(
+            f'/group/{rnd.choices(slugs, cum_weights=group_weights)[0]}/'
+            f'?page={page()}'
+        ),
+        'profile': lambda client: client.get(
+            f'/profile/{some_user()[1]}/?page={page()}'
+        ),
+        'post_detail': lambda client: client.get(
+            f'/posts/{rnd.choice(post_ids)}/'
+        ),
+        'follow_index': lambda client: client.get(f'/follow/?page={page()}'),
+        'post_create': lambda client: client.post(
+            '/create/', {'text': 'Новый пост из бенчмарка'}
+        ),
+        'add_comment': lambda client: client.post(
+            f'/posts/{rnd.choice(post_ids)}/comment/',
+            {'text': 'Комментарий из бенчмарка'}
+        ),
+    }, [user for user, _ in users]
+
+
+def run_scenario(scenario, user_ids, clients, requests):
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.test import Client
+
+    User = get_user_model()
+    latencies = []
+    errors = []
+
+    def worker(user_id):
+        client = Client()
+        client.force_login(User.objects.get(pk=user_id))
+        for _ in range(requests // clients):
+            started = time.perf_counter()
+            response = scenario(client)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+        connection.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(clients) as pool:
+        list(pool.map(worker, user_ids[:clients]))
+    summary = latency_summary(latencies, time.perf_counter() - started)
+    summary['errors'] = len(errors)
+    return summary
+
+
+def compare(results, baseline):
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]
+        print(
+            f'{name:<14} throughput '
+            f'{(result["throughput"] / before["throughput"] - 1) * 100:+6.1f}%'
+            f'   p95 {(result["p95"] / before["p95"] - 1) * 100:+6.1f}%'
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--posts', type=int, default=10000)
+    parser.add_argument('--db', help='файл базы, переиспользуется')
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--views', nargs='*')
+    parser.add_argument('--output')
+    parser.add_argument('--baseline')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    # база в файле: общая in-memory база SQLite блокирует таблицы целиком
+    # при параллельных клиентах
+    db_name = args.db or os.path.join(
+        tempfile.gettempdir(), 'yatube-bench.sqlite3'
+    )
+    setup(db_name=db_name, keepdb=bool(args.db))
+    from benchmarks.dataset import seed
+    from posts.models import Post
+
+    if not Post.objects.exists():
+        started = time.perf_counter()
+        seed(args.posts, seed=args.seed)
+        print(f'seeded {args.posts} posts in '
+              f'{time.perf_counter() - started:.1f}s')
+
+    scenarios, user_ids = make_scenarios(random.Random(args.seed))
+    results = {}
+    for name, scenario in scenarios.items():
+        if args.views and name not in args.views:
+            continue
+        result = run_scenario(scenario, user_ids, args.clients, args.requests)
+        results[name] = result
+        print(
+            f'{name:<14} {result["throughput"]:8.1f} req/s   '
+            f'p50 {result["p50"]:7.1f}   p95 {result["p95"]:7.1f}   '
+            f'p99 {result["p99"]:7.1f} ms   errors {result["errors"]}'
+        )
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(results, output, indent=2)
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            compare(results, json.load(baseline))
+
+
+if __name__ == '__main__':
+    main()
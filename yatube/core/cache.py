@@ -0,0 +1,100 @@
+import hashlib
+import math
+import random
+import time
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+
+from . import metrics
+
+
+def _lease_key(key):
+    return f'{key}:lease'
+
+
+def _release_lease(key, token):
+    # удаляем только свою аренду: если она истекла и её взял другой
+    # запрос, его аренда остаётся (get и delete не атомарны, но окно —
+    # между двумя обращениями к кэшу, а не весь пересчёт)
+    if cache.get(_lease_key(key)) == token:
+        cache.delete(_lease_key(key))
+
+
+def _wait_for_value(key):
+    # Пока кто-то другой держит аренду, ждём готовое значение,
+    # а не пересчитываем его параллельно.
+    deadline = time.monotonic() + settings.CACHE_LEASE_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+    return None
+
+
+def get_or_recompute(key, recompute, timeout, beta=1.0):
+    """Single-flight чтение из кэша с отдачей устаревшего значения.
+
+    Значение хранится вместе со временем пересчёта и мягким сроком жизни.
+    После мягкого срока (или чуть раньше — вероятностно, чтобы сроки разных
+    ключей не совпадали) пересчитывает только получивший аренду запрос,
+    остальные получают старое значение.
+    """
+    token = uuid.uuid4().hex
+    entry = cache.get(key)
+    if entry is not None:
+        value, delta, expires = entry
+        early = delta * beta * math.log(1.0 - random.random())
+        if time.time() - early < expires:
+            metrics.record_cache(hits=1)
+            return value
+        if not cache.add(_lease_key(key), token,
+                         settings.CACHE_LEASE_TIMEOUT):
+            metrics.record_cache(hits=1)
+            return value
+    elif not cache.add(_lease_key(key), token, settings.CACHE_LEASE_TIMEOUT):
+        entry = _wait_for_value(key)
+        if entry is not None:
+            metrics.record_cache(hits=1)
+            return entry[0]
+        # не дождались: считаем сами, но аренда остаётся у её владельца
+        token = None
+    metrics.record_cache(misses=1)
+    try:
+        started = time.time()
+        value = recompute()
+        delta = time.time() - started
+        cache.set(
+            key,
+            (value, delta, time.time() + timeout),
+            timeout + settings.CACHE_STALE_GRACE
+        )
+    finally:
+        if token is not None:
+            _release_lease(key, token)
+    return value
+
+
+def single_flight_cache_page(timeout, key_prefix='views'):
+    """Аналог cache_page на основе get_or_recompute."""
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(request, *args, **kwargs)
+            user_key = request.user.pk if request.user.is_authenticated else 0
+            path = hashlib.md5(
+                request.get_full_path().encode()
+            ).hexdigest()
+            key = f'sf:{key_prefix}:{view_func.__name__}:{user_key}:{path}'
+            response = get_or_recompute(
+                key, lambda: view_func(request, *args, **kwargs), timeout
+            )
+            patch_vary_headers(response, ('Cookie',))
+            return response
+        return wrapper
+    return decorator
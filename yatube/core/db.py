@@ -0,0 +1,79 @@
+"""Настройка соединений с базой.
+
+PRAGMA из SQLITE_PRAGMAS применяются при открытии соединения (сигнал
+connection_created): WAL, чтобы писатели не блокировали читателей,
+synchronous=NORMAL, mmap, размер кэша страниц и busy_timeout вместо
+немедленного «database is locked». Раз в SQLITE_OPTIMIZE_INTERVAL секунд
+процесс выполняет PRAGMA optimize. Соединение реплики (DATABASE_READ_REPLICA)
+журнал не переключает и получает query_only: писать через него нельзя.
+
+Соединения живут DATABASE_CONN_MAX_AGE секунд и переходят от запроса к запросу,
+сохраняя схему, кэш страниц и mmap. Перед каждым запросом
+check_connections откатывает брошенную транзакцию и проверяет соединение
+через is_usable(): у SQLite это без запроса, у серверных баз — ping драйвера
+мимо журнала запросов. Сломанное закрывается, и Django откроет новое.
+"""
+import time
+
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import DatabaseError, connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+_last_optimize = [time.monotonic()]
+
+
+def apply_pragmas(cursor, pragmas):
+    for name, value in pragmas.items():
+        cursor.execute(f'PRAGMA {name} = {value}')
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        if connection.alias == settings.DATABASE_READ_REPLICA:
+            pragmas = dict(settings.SQLITE_PRAGMAS, query_only='ON')
+            pragmas.pop('journal_mode', None)
+            apply_pragmas(cursor, pragmas)
+            return
+        apply_pragmas(cursor, settings.SQLITE_PRAGMAS)
+        optimize_if_due(cursor)
+
+
+def optimize_due():
+    now = time.monotonic()
+    if now - _last_optimize[0] > settings.SQLITE_OPTIMIZE_INTERVAL:
+        _last_optimize[0] = now
+        return True
+    return False
+
+
+def optimize_if_due(cursor):
+    if optimize_due():
+        cursor.execute('PRAGMA optimize')
+
+
+@receiver(request_started)
+def check_connections(sender, **kwargs):
+    # close_old_connections подключён раньше и уже закрыл устаревшие
+    for connection in connections.all():
+        if connection.connection is None or connection.in_atomic_block:
+            continue
+        sqlite = connection.vendor == 'sqlite'
+        primary = connection.alias != settings.DATABASE_READ_REPLICA
+        try:
+            # незакрытая транзакция прошлого запроса держит старый снимок
+            # WAL и не даёт сделать checkpoint
+            if sqlite and connection.connection.in_transaction:
+                connection.connection.rollback()
+            if not connection.is_usable():
+                connection.close()
+                continue
+            if sqlite and primary and optimize_due():
+                with connection.cursor() as cursor:
+                    cursor.execute('PRAGMA optimize')
+        except DatabaseError:
+            connection.close()
@@ -0,0 +1,47 @@
+import json
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Топ отпечатков SQL из журнала медленных запросов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--log', default=settings.SLOW_QUERY_LOG)
+        parser.add_argument('--top', type=int, default=10)
+
+    def handle(self, *args, **options):
+        stats = defaultdict(lambda: {
+            'count': 0, 'total': 0.0, 'max': 0.0, 'views': set()
+        })
+        samples = {}
+        with open(options['log']) as log:
+            for line in log:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                item = stats[record['fingerprint']]
+                item['count'] += 1
+                item['total'] += record['duration']
+                item['max'] = max(item['max'], record['duration'])
+                item['views'].add(record['view'] or '-')
+                samples.setdefault(record['fingerprint'], record)
+        top = sorted(
+            stats.items(), key=lambda item: item[1]['total'], reverse=True
+        )[:options['top']]
+        for fingerprint, item in top:
+            sample = samples[fingerprint]
+            self.stdout.write(self.style.WARNING(
+                f"{fingerprint}  total {item['total']:.3f}s  "
+                f"count {item['count']}  "
+                f"avg {item['total'] / item['count']:.3f}s  "
+                f"max {item['max']:.3f}s"
+            ))
+            self.stdout.write(f"  views: {', '.join(sorted(item['views']))}")
+            self.stdout.write(f"  sql:   {sample['sql']}")
+            self.stdout.write(f"  frame: {sample['frame']}")
+            for step in sample['plan'] or ():
+                self.stdout.write(f'  plan:  {step}')
@@ -0,0 +1,203 @@
+"""Метрики производительности по view: гистограммы и счётчики.
+
+Каждый процесс копит значения в памяти и раз в METRICS_FLUSH_INTERVAL
+секунд сбрасывает их в свой файл в METRICS_DIR. Эндпоинт /metrics
+складывает файлы всех процессов и отдаёт текстовый формат Prometheus.
+Файлы завершившихся процессов при этом удаляются, иначе их счётчики
+суммировались бы вечно. Потоков в процессе несколько, а файл один:
+срок сброса проверяется под _lock, а пишет файл один поток за раз.
+"""
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.template.base import Template
+
+from . import slow_queries
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+HISTOGRAMS = ('request', 'db', 'template')
+COUNTERS = ('queries', 'cache_hits', 'cache_misses')
+
+_local = threading.local()
+_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_stats = {}
+_last_flush = [time.monotonic()]
+
+
+class RequestMetrics:
+    __slots__ = ('queries', 'db', 'template', 'cache_hits', 'cache_misses')
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.template = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+
+def start():
+    _local.metrics = RequestMetrics()
+    _local.template_depth = 0
+    return _local.metrics
+
+
+def stop():
+    _local.metrics = None
+
+
+def current():
+    return getattr(_local, 'metrics', None)
+
+
+def record_cache(hits=0, misses=0):
+    metrics = current()
+    if metrics is not None:
+        metrics.cache_hits += hits
+        metrics.cache_misses += misses
+
+
+def _empty_view_stats():
+    stats = {name: [0] * (len(BUCKETS) + 1) + [0.0] for name in HISTOGRAMS}
+    stats.update((name, 0) for name in COUNTERS)
+    return stats
+
+
+def _observe_histogram(histogram, value):
+    # последние две ячейки: +Inf-корзина и сумма
+    histogram[bisect_left(BUCKETS, value)] += 1
+    histogram[-1] += value
+
+
+def observe(view_name, duration, metrics):
+    with _lock:
+        stats = _stats.setdefault(view_name, _empty_view_stats())
+        _observe_histogram(stats['request'], duration)
+        _observe_histogram(stats['db'], metrics.db)
+        _observe_histogram(stats['template'], metrics.template)
+        for name in COUNTERS:
+            stats[name] += getattr(metrics, name)
+        now = time.monotonic()
+        due = now - _last_flush[0] > settings.METRICS_FLUSH_INTERVAL
+        if due:
+            # срок забирает один поток, остальные не сбрасывают следом
+            _last_flush[0] = now
+    if due:
+        flush()
+
+
+def _stats_path(pid):
+    return os.path.join(settings.METRICS_DIR, f'{pid}.json')
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # процесс есть, но чужой
+        return True
+    return True
+
+
+def flush():
+    # общий .tmp процесса: два потока не должны писать и переименовывать
+    # его одновременно
+    with _flush_lock:
+        with _lock:
+            data = json.dumps(_stats)
+            _last_flush[0] = time.monotonic()
+        os.makedirs(settings.METRICS_DIR, exist_ok=True)
+        path = _stats_path(os.getpid())
+        with open(path + '.tmp', 'w') as stats_file:
+            stats_file.write(data)
+        os.replace(path + '.tmp', path)
+
+
+def collect():
+    """Сумма метрик всех процессов из METRICS_DIR."""
+    flush()
+    total = {}
+    for name in os.listdir(settings.METRICS_DIR):
+        if not name.endswith('.json'):
+            continue
+        path = os.path.join(settings.METRICS_DIR, name)
+        pid = name[:-len('.json')]
+        if pid.isdigit() and not _process_alive(int(pid)):
+            os.remove(path)
+            continue
+        with open(path) as stats_file:
+            process_stats = json.load(stats_file)
+        for view_name, stats in process_stats.items():
+            view_total = total.setdefault(view_name, _empty_view_stats())
+            for name in HISTOGRAMS:
+                view_total[name] = [
+                    a + b for a, b in zip(view_total[name], stats[name])
+                ]
+            for name in COUNTERS:
+                view_total[name] += stats[name]
+    return total
+
+
+def render_text(total):
+    lines = []
+    for name in HISTOGRAMS:
+        metric = f'yatube_{name}_seconds'
+        lines.append(f'# TYPE {metric} histogram')
+        for view_name, stats in sorted(total.items()):
+            histogram = stats[name]
+            cumulative = 0
+            for bound, count in zip(BUCKETS + ('+Inf',), histogram):
+                cumulative += count
+                lines.append(
+                    f'{metric}_bucket{{view="{view_name}",le="{bound}"}} '
+                    f'{cumulative}'
+                )
+            lines.append(f'{metric}_sum{{view="{view_name}"}} {histogram[-1]}')
+            lines.append(f'{metric}_count{{view="{view_name}"}} {cumulative}')
+    for name in COUNTERS:
+        metric = f'yatube_{name}_total'
+        lines.append(f'# TYPE {metric} counter')
+        for view_name, stats in sorted(total.items()):
+            lines.append(f'{metric}{{view="{view_name}"}} {stats[name]}')
+    return '\n'.join(lines) + '\n'
+
+
+def db_timer(execute, sql, params, many, context):
+    metrics = current()
+    # EXPLAIN журнала медленных запросов — не запрос страницы
+    if metrics is None or slow_queries.explaining():
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db += time.perf_counter() - started
+
+
+_template_render = Template.render
+
+
+def _timed_template_render(self, context):
+    metrics = current()
+    if metrics is None:
+        return _template_render(self, context)
+    # вложенные шаблоны (include) входят во время внешнего
+    _local.template_depth += 1
+    started = time.perf_counter()
+    try:
+        return _template_render(self, context)
+    finally:
+        _local.template_depth -= 1
+        if not _local.template_depth:
+            metrics.template += time.perf_counter() - started
+
+
+def install_template_timer():
+    Template.render = _timed_template_render
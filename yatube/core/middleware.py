@@ -0,0 +1,126 @@
+import random
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from . import metrics, profiling, routers, slow_queries
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+class MetricsMiddleware:
+    """Время запроса, SQL, шаблонов и обращения к кэшу по каждому view."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        metrics.install_template_timer()
+
+    def __call__(self, request):
+        request_metrics = metrics.start()
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(metrics.db_timer)
+                    )
+                response = self.get_response(request)
+        finally:
+            metrics.stop()
+        match = request.resolver_match
+        view_name = match.view_name if match else 'unresolved'
+        metrics.observe(
+            view_name, time.perf_counter() - started, request_metrics
+        )
+        return response
+
+
+class SlowQueryMiddleware:
+    """Пишет медленные запросы в журнал, см. core.slow_queries."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(
+                        slow_queries.SlowQueryLogger(connection)
+                    ))
+                return self.get_response(request)
+        finally:
+            slow_queries.set_view_name(None)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        slow_queries.set_view_name(request.resolver_match.view_name)
+
+
+class ReadReplicaMiddleware:
+    """Безопасные запросы читают с реплики, см. core.routers.
+
+    После записи клиент получает куку и DATABASE_PRIMARY_PIN секунд читает
+    с основной базы: редирект после создания поста покажет новый пост,
+    даже если реплика отстаёт.
+    """
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_READ_REPLICA:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        use_replica = (
+            request.method in SAFE_METHODS
+            and settings.DATABASE_PRIMARY_PIN_COOKIE not in request.COOKIES
+        )
+        with routers.reading_from_replica(use_replica):
+            response = self.get_response(request)
+        if request.method not in SAFE_METHODS:
+            response.set_cookie(
+                settings.DATABASE_PRIMARY_PIN_COOKIE, '1',
+                max_age=settings.DATABASE_PRIMARY_PIN, httponly=True
+            )
+        return response
+
+
+class ProfilingMiddleware:
+    """Профилирование запроса по заголовку от staff или по доле запросов.
+
+    При PROFILING_ENABLED = False Django исключает middleware из цепочки,
+    и профилирование ничего не стоит.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def should_profile(self, request):
+        if random.random() < settings.PROFILING_SAMPLE_RATE:
+            return True
+        return (
+            settings.PROFILING_HEADER in request.META
+            and request.user.is_staff
+        )
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+        sampler = profiling.Sampler(
+            threading.get_ident(), settings.PROFILING_INTERVAL
+        ).start()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            sampler.stop()
+        duration = time.perf_counter() - started
+        match = request.resolver_match
+        view_name = match.view_name if match else 'unresolved'
+        profiling.save(sampler, view_name, duration)
+        return response
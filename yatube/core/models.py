@@ -0,0 +1,10 @@
+from django.db import models
+
+
+class Version(models.Model):
+    # метка версии для ключей кэша, общая для всех процессов (core.versions)
+    name = models.CharField(max_length=100, unique=True)
+    value = models.CharField(max_length=32)
+
+    def __str__(self):
+        return f'{self.name}: {self.value}'
@@ -0,0 +1,68 @@
+"""Сэмплирующий профилировщик отдельного запроса.
+
+Фоновый поток раз в PROFILING_INTERVAL секунд снимает стек потока,
+обрабатывающего запрос, и считает одинаковые стеки. Результат пишется
+в формате collapsed stacks (строки «кадр;кадр;кадр число»), который
+понимают flamegraph.pl и speedscope.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    return f'{os.path.basename(code.co_filename)}:{code.co_name}'
+
+
+class Sampler:
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_name(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self):
+        return ''.join(
+            f'{stack} {count}\n' for stack, count in self.stacks.items()
+        )
+
+
+def profile_path(view_name, duration):
+    name = view_name.replace(':', '-')
+    return os.path.join(
+        settings.PROFILING_DIR,
+        f'{name}-{time.strftime("%Y%m%d-%H%M%S")}-{duration * 1000:.0f}ms'
+        f'.collapsed'
+    )
+
+
+def save(sampler, view_name, duration):
+    os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+    path = profile_path(view_name, duration)
+    with open(path, 'w') as profile_file:
+        profile_file.write(sampler.collapsed())
+    return path
@@ -0,0 +1,102 @@
+"""Журнал медленных SQL-запросов с планом выполнения.
+
+Запросы дольше SLOW_QUERY_THRESHOLD секунд пишутся в логгер
+yatube.slow_queries одной JSON-строкой: нормализованный отпечаток SQL,
+view, кадр стека в коде проекта и EXPLAIN QUERY PLAN. Сводку по журналу
+строит команда slow_queries_report.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import traceback
+
+from django.conf import settings
+
+logger = logging.getLogger('yatube.slow_queries')
+
+_local = threading.local()
+
+# кадры инструментирования запросов в журнал не попадают
+_SKIPPED_FILES = {
+    os.path.join(os.path.dirname(__file__), name)
+    for name in ('slow_queries.py', 'metrics.py', 'middleware.py')
+}
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PARAM_RE = re.compile(r'%s|\?')
+_IN_LIST_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """SQL без литералов и параметров: одинаков для запросов одной формы."""
+    sql = _STRING_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = _PARAM_RE.sub('?', sql)
+    sql = _IN_LIST_RE.sub('(...)', sql)
+    return _SPACE_RE.sub(' ', sql).strip()
+
+
+def set_view_name(view_name):
+    _local.view_name = view_name
+
+
+def _project_frame():
+    # ближайший к запросу кадр из кода проекта, а не из Django
+    for frame in reversed(traceback.extract_stack()[:-3]):
+        if (frame.filename.startswith(settings.BASE_DIR)
+                and frame.filename not in _SKIPPED_FILES):
+            return f'{frame.filename}:{frame.lineno} in {frame.name}'
+    return None
+
+
+def explaining():
+    """Идёт ли сейчас наш EXPLAIN: его не считают ни журнал, ни метрики."""
+    return getattr(_local, 'explaining', False)
+
+
+def _explain(connection, sql, params):
+    is_select = sql.lstrip().upper().startswith('SELECT')
+    if connection.vendor != 'sqlite' or not is_select:
+        return None
+    _local.explaining = True
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            return [row[-1] for row in cursor.fetchall()]
+    except Exception:
+        return None
+    finally:
+        _local.explaining = False
+
+
+class SlowQueryLogger:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __call__(self, execute, sql, params, many, context):
+        if explaining():
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            if duration >= settings.SLOW_QUERY_THRESHOLD:
+                self.log(sql, params, many, duration)
+
+    def log(self, sql, params, many, duration):
+        normalized = fingerprint(sql)
+        logger.warning(json.dumps({
+            'fingerprint': hashlib.md5(normalized.encode()).hexdigest()[:12],
+            'sql': normalized,
+            'duration': duration,
+            'view': getattr(_local, 'view_name', None),
+            'frame': _project_frame(),
+            'plan': None if many else _explain(self.connection, sql, params),
+        }, ensure_ascii=False))
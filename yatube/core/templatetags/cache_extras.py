@@ -0,0 +1,43 @@
+from django import template
+from django.core.cache.utils import make_template_fragment_key
+
+from core.cache import get_or_recompute
+
+register = template.Library()
+
+
+class SingleFlightCacheNode(template.Node):
+    def __init__(self, nodelist, expire_time, fragment_name, vary_on):
+        self.nodelist = nodelist
+        self.expire_time = expire_time
+        self.fragment_name = fragment_name
+        self.vary_on = vary_on
+
+    def render(self, context):
+        expire_time = int(self.expire_time.resolve(context))
+        vary_on = [var.resolve(context) for var in self.vary_on]
+        key = make_template_fragment_key(self.fragment_name, vary_on)
+        return get_or_recompute(
+            key, lambda: self.nodelist.render(context), expire_time
+        )
+
+
+@register.tag('sf_cache')
+def do_sf_cache(parser, token):
+    """То же, что {% cache %}, но с защитой от одновременного пересчёта.
+
+    {% sf_cache 20 index_page page_obj.number %} ... {% endsf_cache %}
+    """
+    nodelist = parser.parse(('endsf_cache',))
+    parser.delete_first_token()
+    tokens = token.split_contents()
+    if len(tokens) < 3:
+        raise template.TemplateSyntaxError(
+            f"'{tokens[0]}' tag requires at least 2 arguments."
+        )
+    return SingleFlightCacheNode(
+        nodelist,
+        parser.compile_filter(tokens[1]),
+        tokens[2],
+        [parser.compile_filter(token) for token in tokens[3:]],
+    )
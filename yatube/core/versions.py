@@ -0,0 +1,40 @@
+"""Версии ключей кэша, общие для всех процессов.
+
+Кэш (LocMemCache) у каждого процесса свой: удаление ключа в одном воркере
+или в management-команде остальные не видят. Поэтому то, что должно
+сбрасываться везде, кладётся в кэш под ключом с версией, а версии живут
+в таблице core_version. bump() записывает новую метку в БД; get() читает
+все метки одним запросом и держит их в локальном кэше
+VERSION_CHECK_INTERVAL секунд — дольше этого другой процесс старую
+версию не увидит, а свой видит новую сразу.
+"""
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Version
+
+CACHE_KEY = 'core:versions'
+
+
+def _load():
+    return dict(Version.objects.values_list('name', 'value'))
+
+
+def get(name):
+    versions = cache.get_or_set(
+        CACHE_KEY, _load, settings.VERSION_CHECK_INTERVAL
+    )
+    return versions.get(name, '')
+
+
+def bump(name):
+    # метка, а не счётчик: после отката транзакции номер не повторится
+    value = uuid.uuid4().hex
+    Version.objects.update_or_create(name=name, defaults={'value': value})
+    cache.delete(CACHE_KEY)
+    # и после фиксации, чтобы не закэшировать прочитанное до неё
+    transaction.on_commit(lambda: cache.delete(CACHE_KEY))
+    return value
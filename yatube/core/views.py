@@ -1,5 +1,9 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse
 from django.shortcuts import render
 
+from . import metrics
+
 
 def page_not_found(request, exception):
     template = 'core/404.html'
@@ -16,3 +20,21 @@ def csrf_failure(request, reason=''):
 def server_error(request, reason=''):
     template = 'core/500.html'
     return render(request, template, {'path': request.path}, status=500)
+
+
+def _client_ip(request):
+    # за обратным прокси REMOTE_ADDR — адрес прокси; настоящий адрес
+    # берём из заголовка, который прокси перезаписывает сам
+    header = settings.METRICS_CLIENT_IP_HEADER
+    if header and request.META.get(header):
+        return request.META[header].split(',')[-1].strip()
+    return request.META.get('REMOTE_ADDR')
+
+
+def metrics_view(request):
+    if _client_ip(request) not in settings.METRICS_ALLOWED_IPS:
+        raise Http404
+    return HttpResponse(
+        metrics.render_text(metrics.collect()),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
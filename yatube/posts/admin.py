@@ -2,6 +2,7 @@ from django.contrib import admin
 
 from .models import Follow, Group, Comment
 from .models import Post
+from .models import DailyAuthorStats, DailyGroupStats
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -17,3 +18,33 @@ admin.site.register(Post, PostAdmin)
 admin.site.register(Group)
 admin.site.register(Follow)
 admin.site.register(Comment)
+
+
+class StatsAdmin(admin.ModelAdmin):
+    # суточные итоги только для чтения: их пишет команда rollup_stats
+    date_hierarchy = 'day'
+    list_per_page = 50
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+class DailyGroupStatsAdmin(StatsAdmin):
+    list_display = ('day', 'group', 'posts', 'comments')
+    list_filter = ('group', )
+    ordering = ('-day', '-posts')
+    empty_value_display = '-без группы-'
+
+
+class DailyAuthorStatsAdmin(StatsAdmin):
+    list_display = ('day', 'author', 'posts', 'comments', 'followers')
+    list_select_related = ('author', )
+    search_fields = ('author__username', )
+    ordering = ('-day', '-posts')
+
+
+admin.site.register(DailyGroupStats, DailyGroupStatsAdmin)
+admin.site.register(DailyAuthorStats, DailyAuthorStatsAdmin)
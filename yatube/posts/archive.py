@@ -0,0 +1,153 @@
+"""Горячие и архивные посты.
+
+Команда archive_posts переносит посты старше ARCHIVE_AFTER_DAYS вместе с
+комментариями в ArchivedPost и ArchivedComment пачками по id: копия и
+удаление из Post в одной транзакции. id сохраняются, а AUTOINCREMENT не
+выдаёт их повторно, поэтому ссылки на посты не ломаются. Таблица Post и
+её индексы остаются маленькими.
+
+Чтение: post_detail ищет пост в архиве, если его нет среди горячих;
+ленты (Timeline) отдают сначала горячие посты, за ними архивные — в
+архиве всегда посты старше, поэтому первые страницы архив не трогают.
+Старше по дате, а не по id: import_posts ставит посты в прошлое, поэтому
+после каждой пачки переносит в архив горячие посты не новее архивных
+(archive_behind).
+
+Суточные итоги (posts.rollups) читают только горячие таблицы, поэтому
+пачка сначала досчитывает их по постам и комментариям, а потом переносит
+строки, — в той же транзакции.
+Число архивных постов не меняется между запусками команды и хранится в
+кэше под версией 'archive' (core.versions): пачка меняет её в своей
+транзакции, и новое число видят все процессы.
+"""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max
+from django.http import Http404
+from django.utils.functional import cached_property
+
+from core import versions
+
+from . import feeds, rollups
+from .models import ArchivedComment, ArchivedPost, Comment, Post
+
+VERSION = 'archive'
+
+POST_FIELDS = ('id', 'text', 'excerpt', 'is_truncated', 'text_html',
+               'excerpt_html',
+               'pub_date', 'author_id', 'group_id', 'image', 'version',
+               'updated')
+COMMENT_FIELDS = ('id', 'post_id', 'author_id', 'text', 'created')
+
+
+def current_version():
+    return versions.get(VERSION)
+
+
+def archive_batch(cutoff, batch_size):
+    """Переносит до batch_size старейших по id постов; (постов, комм.)."""
+    with transaction.atomic():
+        # rollup_stats архив не читает: учесть строки до переноса
+        rollups.roll_up_source('post')
+        rollups.roll_up_source('comment')
+        # чтение в той же транзакции и с блокировкой строк: правка поста
+        # не зафиксируется между копией и удалением и не потеряется
+        rows = list(
+            Post.objects.select_for_update().filter(pub_date__lt=cutoff)
+            .order_by('pk').values(*POST_FIELDS)[:batch_size]
+        )
+        if not rows:
+            return 0, 0
+        # предыдущие пачки уже удалены: это ровно посты из rows, без
+        # списка id, которых в SQLite не больше 999 на запрос
+        posts = Post.objects.filter(
+            pub_date__lt=cutoff, pk__lte=rows[-1]['id']
+        )
+        comments = Comment.objects.filter(post__in=posts.values('pk'))
+        ArchivedPost.objects.bulk_create(
+            ArchivedPost(**row) for row in rows
+        )
+        archived_comments = ArchivedComment.objects.bulk_create(
+            ArchivedComment(**row)
+            for row in comments.values(*COMMENT_FIELDS).iterator()
+        )
+        # без сборщика delete() и сигналов на каждый пост: ленты
+        # сбрасываются разом после прохода (archive_posts)
+        comments._raw_delete(comments.db)
+        posts._raw_delete(posts.db)
+        versions.bump(VERSION)
+    return len(rows), len(archived_comments)
+
+
+def archive(cutoff, batch_size=1000):
+    """Переносит все посты старше cutoff; (постов, комментариев)."""
+    total_posts = total_comments = 0
+    while True:
+        posts, comments = archive_batch(cutoff, batch_size)
+        if not posts:
+            break
+        total_posts += posts
+        total_comments += comments
+    if total_posts:
+        feeds.invalidate_all()
+    return total_posts, total_comments
+
+
+def archive_behind(batch_size=1000):
+    """Переносит горячие посты не новее архивных; (постов, комментариев)."""
+    newest = ArchivedPost.objects.aggregate(newest=Max('pub_date'))['newest']
+    if newest is None:
+        return 0, 0
+    # и посты с той же датой: горячие строго новее архива
+    return archive(newest + timedelta(microseconds=1), batch_size)
+
+
+def archived_count(archived, scope):
+    return cache.get_or_set(
+        f'archive:{current_version()}:count:{scope}', archived.count, None
+    )
+
+
+def get_post_or_archived_or_404(queryset, archived, post_id):
+    """(пост, в архиве ли он) для горячего или архивного id."""
+    post = queryset.filter(pk=post_id).first()
+    if post is not None:
+        return post, False
+    post = archived.filter(pk=post_id).first()
+    if post is None:
+        raise Http404('Пост не найден')
+    return post, True
+
+
+class Timeline:
+    """Горячие посты, за ними архивные; для Paginator.
+
+    scope — ключ числа архивных постов в кэше (all, group:<id>,
+    author:<id>).
+    """
+
+    def __init__(self, hot, archived, scope):
+        self.hot = hot
+        self.archived = archived
+        self.scope = scope
+
+    @cached_property
+    def hot_count(self):
+        return self.hot.count()
+
+    def count(self):
+        return self.hot_count + archived_count(self.archived, self.scope)
+
+    def __getitem__(self, index):
+        # Paginator берёт только срезы
+        start, stop = index.start or 0, index.stop
+        posts = []
+        if start < self.hot_count:
+            posts += self.hot[start:min(stop, self.hot_count)]
+        if stop > self.hot_count:
+            posts += self.archived[
+                max(start - self.hot_count, 0):stop - self.hot_count
+            ]
+        return posts
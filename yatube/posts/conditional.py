@@ -0,0 +1,173 @@
+"""Валидаторы для условных GET без запроса списка и рендера.
+
+Состояние ленты — самое позднее Post.updated и версии из core.versions:
+создание и правка поста меняют updated (MAX по индексам (updated),
+(author, updated) и (group, updated) — поиск по индексу, а не проход по
+ленте), удаление поста и правка пользователей (имя автора в карточках) —
+версии (posts.signals, users.signals). Версии в других процессах видны
+не позже VERSION_CHECK_INTERVAL.
+Состояние поста — его updated, число комментариев и время последнего.
+
+conditional_page подключает те же валидаторы к HTML-страницам: 304
+отдаётся до запроса списка и рендера шаблона. Страница для вошедшего
+пользователя персональная, поэтому в ETag входят его id и CSRF-кука, а
+Last-Modified отдаётся только анонимам. Фрагменты sf_cache на таких
+страницах добавляют к ключу request.page_version — те же части ETag, —
+иначе новый ETag пришёл бы со старым списком из кэша, и следующий
+запрос получил бы 304 на устаревшую страницу.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.db.models import (
+    Count, DateTimeField, Exists, Max, OuterRef, Subquery
+)
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from core import versions
+
+from . import groups, recommendations
+from .models import Comment, Follow, Post, User
+
+
+# удаление постов (posts.signals) и правка пользователей (users.signals)
+DELETED_VERSION = 'posts:deleted'
+USERS_VERSION = 'users'
+
+
+def content_versions():
+    return versions.get(DELETED_VERSION), versions.get(USERS_VERSION)
+
+
+def feed_state(posts):
+    """(время последнего изменения, *версии) для набора постов."""
+    last = posts.order_by().aggregate(last=Max('updated'))['last']
+    return (last, *content_versions())
+
+
+def post_state(post_id):
+    """(число комментариев, время последнего изменения) или None."""
+    updated = (
+        Post.objects.filter(pk=post_id)
+        .values_list('updated', flat=True).first()
+    )
+    if updated is None:
+        return None
+    comments = Comment.objects.filter(post_id=post_id).aggregate(
+        count=Count('pk'), last=Max('created')
+    )
+    return comments['count'], max(filter(None, (updated, comments['last'])))
+
+
+def make_etag(*parts):
+    return hashlib.md5(':'.join(map(str, parts)).encode()).hexdigest()
+
+
+def _count(related):
+    return Subquery(related.annotate(value=Count('pk')).values('value'))
+
+
+def _latest(related, field):
+    # без output_field SQLite вернёт строку, а не datetime
+    return Subquery(
+        related.annotate(value=Max(field)).values('value'),
+        output_field=DateTimeField()
+    )
+
+
+def group_page_state(request, slug):
+    group = groups.get_group_by_slug_or_404(slug)
+    state = feed_state(group.posts.all())
+    return (groups.current_version(), group.pk, *state), state[0]
+
+
+def profile_page_state(request, username):
+    posts = Post.objects.filter(author=OuterRef('pk')).order_by().values(
+        'author'
+    )
+    authors = User.objects.filter(username=username).annotate(
+        last=_latest(posts, 'updated')
+    )
+    fields = ['pk', 'first_name', 'last_name', 'last']
+    if request.user.is_authenticated:
+        authors = authors.annotate(is_followed=Exists(Follow.objects.filter(
+            user=request.user, author=OuterRef('pk')
+        )))
+        fields.append('is_followed')
+    state = authors.values_list(*fields).first()
+    if state is None:
+        return None
+    state = (*state, *content_versions())
+    if request.user.is_authenticated:
+        # в профиле блок рекомендаций, пересчитанных build_recommendations
+        return (*state, recommendations.current_version()), state[3]
+    return state, state[3]
+
+
+def post_page_state(request, post_id):
+    comments = Comment.objects.filter(post=OuterRef('pk')).order_by().values(
+        'post'
+    )
+    author_posts = Post.objects.filter(
+        author=OuterRef('author')
+    ).order_by().values('author')
+    # число постов автора на странице: новый пост меняет MAX(updated) по
+    # индексу (author, updated), удалённый — версию
+    state = Post.objects.filter(pk=post_id).annotate(
+        comments_count=_count(comments),
+        last_comment=_latest(comments, 'created'),
+        author_last=_latest(author_posts, 'updated'),
+    ).values_list(
+        'updated', 'author__first_name', 'author__last_name',
+        'comments_count', 'last_comment', 'author_last'
+    ).first()
+    if state is None:
+        return None
+    last = max(filter(None, (state[0], state[4])))
+    return (groups.current_version(), *state, *content_versions()), last
+
+
+def conditional_page(page_state):
+    """ETag и Last-Modified для HTML-страницы.
+
+    page_state(request, **kwargs) отдаёт (части ETag, Last-Modified)
+    одним дешёвым запросом или None, если страницы нет.
+    """
+    def validators(request, kwargs):
+        if not hasattr(request, 'page_state'):
+            request.page_state = page_state(request, **kwargs)
+            if request.page_state is not None:
+                request.page_version = make_etag(*request.page_state[0])
+        return request.page_state
+
+    def etag(request, **kwargs):
+        state = validators(request, kwargs)
+        if state is None:
+            return None
+        return make_etag(
+            request.user.pk or 0,
+            request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+            request.GET.urlencode(), *state[0]
+        )
+
+    def last_modified(request, **kwargs):
+        if request.user.is_authenticated:
+            return None
+        state = validators(request, kwargs)
+        return state[1] if state else None
+
+    def decorator(view_func):
+        view = condition(etag, last_modified)(view_func)
+
+        @wraps(view_func)
+        def wrapper(request, **kwargs):
+            response = view(request, **kwargs)
+            patch_cache_control(
+                response, no_cache=True,
+                private=request.user.is_authenticated
+            )
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,176 @@
+"""Потоковая выгрузка постов и их комментариев в NDJSON и CSV.
+
+Посты читаются через .iterator(chunk_size=EXPORT_CHUNK_SIZE) по
+возрастанию id, комментарии — одним запросом на пачку постов и тоже
+через iterator, частями по EXPORT_CHUNK_SIZE, поэтому в памяти не больше
+одной части, сколько бы ни написал автор и сколько бы ни было
+комментариев. Каждая запись — пост или комментарий (поле type),
+комментарии идут после своей пачки постов. Курсор — id последнего поста
+пачки, выгруженной вместе с комментариями: с него выгрузку можно
+продолжить (параметр after).
+
+Архивные посты и комментарии (posts.archive) выгружаются вместе с
+горячими: id у них общие, и два потока по id сливаются в один.
+"""
+import csv
+import heapq
+import json
+from operator import attrgetter
+
+from django.conf import settings
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
+
+from .groups import get_group
+from .models import ArchivedComment, Comment
+
+FIELDS = ('type', 'id', 'post', 'author', 'group', 'pub_date', 'text',
+          'image')
+
+
+def post_record(post):
+    group = get_group(post.group_id) if post.group_id else None
+    return {
+        'type': 'post',
+        'id': post.pk,
+        'author': post.author.username,
+        'group': group.slug if group else None,
+        'pub_date': post.pub_date.isoformat(),
+        'text': post.text,
+        'image': post.image.name or None,
+    }
+
+
+def comment_record(comment):
+    return {
+        'type': 'comment',
+        'id': comment.pk,
+        'post': comment.post_id,
+        'author': comment.author.username,
+        'pub_date': comment.created.isoformat(),
+        'text': comment.text,
+    }
+
+
+def batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _sources(posts, archived):
+    """Пары (посты, модель их комментариев): горячие и архивные."""
+    sources = [(posts, Comment)]
+    if archived is not None:
+        sources.append((archived, ArchivedComment))
+    return sources
+
+
+def _merged(querysets, key):
+    """Строки нескольких выборок, уже упорядоченных по key, одним потоком."""
+    return heapq.merge(*(
+        queryset.select_related('author')
+        .iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+        for queryset in querysets
+    ), key=key)
+
+
+def post_chunks(posts, after=0, archived=None):
+    return batches(
+        _merged(
+            [source.filter(pk__gt=after).order_by('pk')
+             for source, _ in _sources(posts, archived)],
+            attrgetter('pk'),
+        ),
+        settings.EXPORT_CHUNK_SIZE
+    )
+
+
+def records(posts, after=0, archived=None):
+    """Пары (курсор, записи) для постов с id больше after.
+
+    Курсор есть только у последней части пачки — когда выгружены и все
+    её комментарии, у остальных частей он None.
+    """
+    chunk_size = settings.EXPORT_CHUNK_SIZE
+    for chunk in post_chunks(posts, after, archived):
+        yield None, [post_record(post) for post in chunk]
+        # подзапрос вместо списка id: в SQLite не больше 999 параметров
+        pk_range = (chunk[0].pk, chunk[-1].pk)
+        comments = _merged(
+            [
+                model.objects.filter(
+                    post__in=source.filter(pk__range=pk_range).values('pk')
+                ).order_by('post_id', 'pk')
+                for source, model in _sources(posts, archived)
+            ],
+            attrgetter('post_id', 'pk'),
+        )
+        for batch in batches(comments, chunk_size):
+            yield None, [comment_record(comment) for comment in batch]
+        yield chunk[-1].pk, []
+
+
+def ndjson_text(rows, header=False):
+    return ''.join(
+        json.dumps(row, ensure_ascii=False) + '\n' for row in rows
+    )
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def csv_text(rows, header=False):
+    writer = csv.writer(_Echo())
+    lines = [writer.writerow(FIELDS)] if header else []
+    lines += [
+        writer.writerow(['' if row.get(field) is None else row[field]
+                         for field in FIELDS])
+        for row in rows
+    ]
+    return ''.join(lines)
+
+
+FORMATS = {
+    'ndjson': ('application/x-ndjson', ndjson_text),
+    'csv': ('text/csv', csv_text),
+}
+
+
+def export_chunks(posts, export_format, after=0, archived=None):
+    """Пары (курсор или None, текст части); заголовок CSV только с начала."""
+    _, serialize = FORMATS[export_format]
+    header = not after
+    for cursor, rows in records(posts, after, archived):
+        if rows:
+            yield cursor, serialize(rows, header)
+            header = False
+        elif cursor is not None:
+            yield cursor, ''
+    if header:
+        # пустая выгрузка: для CSV остаётся хотя бы заголовок
+        yield after, serialize([], header)
+
+
+def export_response(request, posts, name, archived=None):
+    export_format = request.GET.get('format', 'ndjson')
+    after = request.GET.get('after', '0')
+    if export_format not in FORMATS or not after.isdigit():
+        return HttpResponseBadRequest()
+    content_type, _ = FORMATS[export_format]
+    response = StreamingHttpResponse(
+        (text for _, text in export_chunks(
+            posts, export_format, int(after), archived
+        )),
+        content_type=f'{content_type}; charset=utf-8',
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{name}.{export_format}"'
+    )
+    return response
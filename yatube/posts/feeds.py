@@ -0,0 +1,188 @@
+"""RSS и Atom для главной, групп и авторов.
+
+В ленте последние FEED_ITEMS постов одним запросом с select_related.
+Готовый XML хранится в кэше по области ленты (all, group:<slug>,
+author:<username>), формату и состоянию области — MAX(updated) её постов
+и версиям удаления постов и правки пользователей (conditional.feed_state).
+Опрос читателями стоит одного запроса по индексу и обращения к кэшу, а
+совпавший ETag — ответ 304 без тела. Сохранение поста в любом процессе
+меняет состояние, сбрасывать кэш не нужно.
+
+Перенос в архив удаляет посты без сигналов и MAX(updated) не меняет,
+поэтому archive.archive() сбрасывает все ленты сменой поколения —
+версии 'feeds' в core.versions, её видят все процессы.
+"""
+import hashlib
+
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+from django.utils.http import parse_http_date_safe, quote_etag
+from django.utils.text import Truncator
+
+from core import versions
+
+from . import groups
+from .conditional import feed_state, make_etag
+from .models import Post, User
+
+GENERATION = 'feeds'
+
+FEED_TYPES = {'rss': Rss201rev2Feed, 'atom': Atom1Feed}
+
+
+def current_generation():
+    return versions.get(GENERATION)
+
+
+def cache_key(scope, feed_format, state):
+    return f'feeds:{current_generation()}:{scope}:{feed_format}:{state}'
+
+
+def invalidate_all():
+    versions.bump(GENERATION)
+
+
+class PostsFeed(Feed):
+    def posts(self, obj):
+        return Post.objects.all()
+
+    def items(self, obj):
+        return self.posts(obj).select_related('author')[:settings.FEED_ITEMS]
+
+    def item_title(self, post):
+        return Truncator(post.excerpt).chars(80)
+
+    def item_description(self, post):
+        return post.text
+
+    def item_link(self, post):
+        return reverse('posts:post_detail', kwargs={'post_id': post.pk})
+
+    def item_author_name(self, post):
+        return post.author.get_full_name() or post.author.username
+
+    def item_pubdate(self, post):
+        return post.pub_date
+
+    def item_updateddate(self, post):
+        return post.updated
+
+    def item_categories(self, post):
+        group = groups.get_group(post.group_id) if post.group_id else None
+        return [group.title] if group else []
+
+
+class IndexFeed(PostsFeed):
+    title = 'Yatube: последние обновления'
+    description = 'Последние посты на сайте'
+
+    def link(self):
+        return reverse('posts:index')
+
+    @staticmethod
+    def scope():
+        return 'all'
+
+    @staticmethod
+    def scope_posts():
+        return Post.objects.all()
+
+
+class GroupFeed(PostsFeed):
+    def get_object(self, request, slug):
+        return groups.get_group_by_slug_or_404(slug)
+
+    def posts(self, group):
+        return group.posts.all()
+
+    def title(self, group):
+        return f'Yatube: {group.title}'
+
+    def description(self, group):
+        return group.description
+
+    def link(self, group):
+        return reverse('posts:group_list', kwargs={'slug': group.slug})
+
+    @staticmethod
+    def scope(slug):
+        return f'group:{slug}'
+
+    @staticmethod
+    def scope_posts(slug):
+        return groups.get_group_by_slug_or_404(slug).posts.all()
+
+
+class AuthorFeed(PostsFeed):
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def posts(self, author):
+        return author.posts.all()
+
+    def title(self, author):
+        return f'Yatube: {author.get_full_name() or author.username}'
+
+    def description(self, author):
+        return f'Посты пользователя {author.username}'
+
+    def link(self, author):
+        return reverse(
+            'posts:profile', kwargs={'username': author.username}
+        )
+
+    @staticmethod
+    def scope(username):
+        return f'author:{username}'
+
+    @staticmethod
+    def scope_posts(username):
+        return Post.objects.filter(author__username=username)
+
+
+def cached_feed(feed_class):
+    """View ленты в формате ?format=rss|atom с XML из кэша."""
+    feeds = {
+        feed_format: type(feed_class.__name__, (feed_class,), {
+            'feed_type': feed_type,
+        })()
+        for feed_format, feed_type in FEED_TYPES.items()
+    }
+
+    def view(request, **kwargs):
+        feed_format = request.GET.get('format', 'rss')
+        if feed_format not in feeds:
+            raise Http404('Нет такого формата')
+        key = cache_key(
+            feed_class.scope(**kwargs), feed_format,
+            make_etag(*feed_state(feed_class.scope_posts(**kwargs))),
+        )
+        cached = cache.get(key)
+        if cached is None:
+            rendered = feeds[feed_format](request, **kwargs)
+            cached = (
+                rendered.content,
+                rendered['Content-Type'],
+                quote_etag(hashlib.md5(rendered.content).hexdigest()),
+                rendered.get('Last-Modified'),
+            )
+            cache.set(key, cached, settings.FEED_CACHE_TIMEOUT)
+        content, content_type, etag, last_modified = cached
+        response = HttpResponse(content, content_type=content_type)
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = last_modified
+        patch_cache_control(response, public=True,
+                            max_age=settings.FEED_MAX_AGE)
+        return get_conditional_response(
+            request, etag=etag,
+            last_modified=parse_http_date_safe(last_modified or ''),
+            response=response,
+        )
+    return view
@@ -1,8 +1,25 @@
 from django import forms
 
+from . import groups
 from .models import Post, Comment
 
 
+class GroupChoiceIterator(forms.models.ModelChoiceIterator):
+    """Варианты групп из реестра posts.groups, без запросов к БД."""
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        for group in groups.all_groups():
+            yield self.choice(group)
+
+    def __len__(self):
+        return (
+            len(groups.all_groups())
+            + (self.field.empty_label is not None)
+        )
+
+
 class PostForm(forms.ModelForm):
     class Meta:
         model = Post
@@ -13,6 +30,12 @@ class PostForm(forms.ModelForm):
             'image': ('Картинка поста')
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        group_field = self.fields['group']
+        group_field.iterator = GroupChoiceIterator
+        group_field.widget.choices = group_field.choices
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
@@ -0,0 +1,52 @@
+"""Реестр групп в памяти процесса.
+
+Групп мало и меняются они редко, поэтому все они загружаются одним
+запросом и хранятся в процессе. Актуальность проверяется по версии в БД
+(core.versions): при сохранении или удалении группы (posts.signals)
+версия меняется, и каждый воркер перечитывает реестр не позже чем через
+VERSION_CHECK_INTERVAL.
+"""
+from django.http import Http404
+
+from core import versions
+
+from .models import Group
+
+VERSION = 'groups'
+
+_registry = {'version': None, 'by_id': {}, 'by_slug': {}}
+
+
+def current_version():
+    return versions.get(VERSION)
+
+
+def _registry_for_version():
+    version = current_version()
+    if _registry['version'] != version:
+        groups = list(Group.objects.order_by('pk'))
+        _registry.update(
+            version=version,
+            by_id={group.pk: group for group in groups},
+            by_slug={group.slug: group for group in groups},
+        )
+    return _registry
+
+
+def invalidate():
+    versions.bump(VERSION)
+
+
+def all_groups():
+    return list(_registry_for_version()['by_id'].values())
+
+
+def get_group(pk):
+    return _registry_for_version()['by_id'].get(pk)
+
+
+def get_group_by_slug_or_404(slug):
+    group = _registry_for_version()['by_slug'].get(slug)
+    if group is None:
+        raise Http404('Группа не найдена')
+    return group
@@ -0,0 +1,141 @@
+"""Новые посты без перезагрузки страницы.
+
+Лента (?feed=all, group с ?group=<slug> или follow) отдаёт набор постов и
+проверку, относится ли к ней новый пост. since_posts — посты новее
+курсора (id последнего показанного); страница спрашивает since раз в
+LIVE_CHECK_INTERVAL секунд — короткий запрос, воркер не держится.
+
+event_stream — поток SSE с id новых постов, только при LIVE_SSE_ENABLED
+(нужен сервер с потоками или async, см. settings) и не больше
+LIVE_MAX_STREAMS на процесс. Новый пост после коммита публикуется
+подписчикам процесса (posts.signals) и будит их потоки. Источник правды —
+база: разбуженный поток выбирает посты новее курсора, а посты из других
+процессов pub/sub не видит, поэтому поток ещё и опрашивает базу раз в
+LIVE_POLL_INTERVAL секунд.
+"""
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+
+from .groups import get_group_by_slug_or_404
+from .models import Follow, Post
+
+_subscribers = {}
+_lock = threading.Lock()
+_streams = {'active': 0}
+
+
+class StreamSlot:
+    """Место в LIVE_MAX_STREAMS; освобождается при закрытии ответа."""
+
+    def __init__(self):
+        self.held = True
+
+    def close(self):
+        with _lock:
+            if self.held:
+                self.held = False
+                _streams['active'] -= 1
+
+
+def acquire_stream():
+    """StreamSlot или None, если все места заняты."""
+    with _lock:
+        if _streams['active'] >= settings.LIVE_MAX_STREAMS:
+            return None
+        _streams['active'] += 1
+    return StreamSlot()
+
+
+@contextmanager
+def subscribe(matches):
+    """Event, который взводится при публикации подходящего поста."""
+    wakeup = threading.Event()
+    with _lock:
+        _subscribers[wakeup] = matches
+    try:
+        yield wakeup
+    finally:
+        with _lock:
+            _subscribers.pop(wakeup, None)
+
+
+def publish(post):
+    with _lock:
+        subscribers = list(_subscribers.items())
+    for wakeup, matches in subscribers:
+        if matches(post):
+            wakeup.set()
+
+
+def resolve_feed(request):
+    """(набор постов ленты, проверка нового поста); ValueError — нет ленты.
+    """
+    feed = request.GET.get('feed', 'all')
+    if feed == 'all':
+        return Post.objects.all(), lambda post: True
+    if feed == 'group':
+        group = get_group_by_slug_or_404(request.GET.get('group', ''))
+        return group.posts.all(), lambda post: post.group_id == group.pk
+    if feed == 'follow':
+        if not request.user.is_authenticated:
+            raise PermissionDenied
+        # авторы на момент подключения: новая подписка — новое подключение
+        author_ids = set(Follow.objects.filter(
+            user=request.user
+        ).values_list('author_id', flat=True))
+        return (
+            Post.objects.filter(author__following__user=request.user),
+            lambda post: post.author_id in author_ids,
+        )
+    raise ValueError(f'нет ленты {feed!r}')
+
+
+def parse_cursor(value):
+    if not value:
+        return 0
+    if not value.isdigit():
+        raise ValueError('неверный курсор')
+    return int(value)
+
+
+def since_posts(posts, after):
+    return list(
+        posts.filter(pk__gt=after).order_by('pk')
+        .select_related('author').defer('text', 'text_html')
+        [:settings.LIVE_SINCE_LIMIT]
+    )
+
+
+def event_stream(posts, matches, after):
+    """Строки text/event-stream; поток закрывается через
+    LIVE_STREAM_TIMEOUT секунд, и браузер переподключается с
+    Last-Event-ID."""
+    deadline = time.monotonic() + settings.LIVE_STREAM_TIMEOUT
+    with subscribe(matches) as wakeup:
+        yield f'retry: {settings.LIVE_RETRY_MS}\n\n'
+        while True:
+            wakeup.clear()
+            ids = list(
+                posts.filter(pk__gt=after).order_by('pk')
+                .values_list('pk', flat=True)[:settings.LIVE_SINCE_LIMIT]
+            )
+            if ids:
+                after = ids[-1]
+                yield (
+                    f'id: {after}\nevent: posts\n'
+                    f'data: {json.dumps({"ids": ids})}\n\n'
+                )
+            else:
+                # комментарий SSE, чтобы прокси не закрыли тихое соединение
+                yield ': ping\n\n'
+            timeout = min(
+                settings.LIVE_POLL_INTERVAL, deadline - time.monotonic()
+            )
+            if timeout <= 0:
+                return
+            wakeup.wait(timeout)
@@ -0,0 +1,27 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts import archive
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит посты старше ARCHIVE_AFTER_DAYS дней вместе с '
+        'комментариями в архивные таблицы. Запускается по расписанию.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int,
+                            default=settings.ARCHIVE_AFTER_DAYS,
+                            help='возраст поста в днях')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        posts, comments = archive.archive(cutoff, options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово: в архиве {posts} постов и {comments} комментариев'
+        ))
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F
+from django.utils import timezone
+
+from posts.models import Post, make_excerpt
+
+
+class Command(BaseCommand):
+    help = 'Заполняет Post.excerpt для постов, у которых его ещё нет.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--all', action='store_true',
+            help='пересчитать все посты, а не только пустые'
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.order_by('pk').only('pk', 'text')
+        if not options['all']:
+            posts = posts.filter(excerpt='')
+        last_pk = 0
+        total = 0
+        now = timezone.now()
+        while True:
+            batch = list(
+                posts.filter(pk__gt=last_pk)[:options['batch_size']]
+            )
+            if not batch:
+                break
+            for post in batch:
+                post.excerpt = make_excerpt(post.text)
+                post.is_truncated = post.excerpt != post.text
+                # новая версия, чтобы сбросить закэшированную карточку
+                post.version = F('version') + 1
+                # bulk_update не трогает auto_now, а по updated строятся ETag
+                post.updated = now
+            Post.objects.bulk_update(
+                batch, ['excerpt', 'is_truncated', 'version', 'updated']
+            )
+            last_pk = batch[-1].pk
+            total += len(batch)
+            self.stdout.write(f'{total} постов обработано')
+        self.stdout.write(self.style.SUCCESS(f'Готово: {total}'))
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts import recommendations
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает рекомендации «кого почитать» по графу подписок. '
+        'Запускается по расписанию, например раз в сутки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='пользователей в одной транзакции записи')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        graph = recommendations.FollowGraph.load()
+        self.stdout.write(
+            f'граф: {len(graph.ids)} пользователей, {len(graph.out)} '
+            f'подписок за {time.monotonic() - started:.1f} с'
+        )
+        rows = recommendations.store(
+            recommendations.compute(graph), options['batch_size']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово: {rows} рекомендаций за '
+            f'{time.monotonic() - started:.1f} с'
+        ))
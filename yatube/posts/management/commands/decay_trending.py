@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from posts import trending
+
+
+class Command(BaseCommand):
+    help = (
+        'Затухание популярности постов за время с прошлого запуска. '
+        'Запускается по расписанию раз в TRENDING_DECAY_INTERVAL секунд; '
+        '--rebuild пересчитывает счёт по недавним комментариям.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--rebuild', action='store_true',
+                            help='пересчитать счёт с нуля')
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            count = trending.rebuild()
+            self.stdout.write(self.style.SUCCESS(
+                f'Готово: счёт пересчитан у {count} постов'
+            ))
+            return
+        elapsed, count = trending.decay_due(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово: затухание за {elapsed:.0f} с для {count} постов'
+        ))
@@ -0,0 +1,79 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.http import Http404
+
+from posts.export import FORMATS, export_chunks
+from posts.groups import get_group_by_slug_or_404
+from posts.models import User
+
+
+def read_checkpoint(path):
+    """Курсор и размер файла выгрузки на момент последней пачки."""
+    try:
+        with open(path) as checkpoint:
+            cursor, offset = checkpoint.read().split()
+    except FileNotFoundError:
+        return 0, 0
+    return int(cursor), int(offset)
+
+
+def write_checkpoint(path, cursor, offset):
+    # через временный файл, чтобы при падении не остался обрывок курсора
+    with open(path + '.tmp', 'w') as checkpoint:
+        checkpoint.write(f'{cursor} {offset}')
+    os.replace(path + '.tmp', path)
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает посты и комментарии автора или группы в NDJSON или CSV. '
+        'После каждой пачки курсор пишется в <output>.cursor, '
+        '--resume продолжает с него.'
+    )
+
+    def add_arguments(self, parser):
+        # required=True в группе не работает с call_command в Django 2.2
+        source = parser.add_mutually_exclusive_group()
+        source.add_argument('--author', help='username автора')
+        source.add_argument('--group', help='slug группы')
+        parser.add_argument('--format', choices=FORMATS, default='ndjson')
+        parser.add_argument('--output', required=True)
+        parser.add_argument('--resume', action='store_true',
+                            help='продолжить с сохранённого курсора')
+
+    def handle(self, *args, **options):
+        if options['author']:
+            author = User.objects.filter(username=options['author']).first()
+            if author is None:
+                raise CommandError(f'Нет автора {options["author"]}')
+            posts = author.posts.all()
+            archived = author.archived_posts.all()
+        elif options['group']:
+            try:
+                group = get_group_by_slug_or_404(options['group'])
+            except Http404:
+                raise CommandError(f'Нет группы {options["group"]}')
+            posts = group.posts.all()
+            archived = group.archived_posts.all()
+        else:
+            raise CommandError('Нужен --author или --group')
+        output = options['output']
+        checkpoint = output + '.cursor'
+        cursor, offset = 0, 0
+        if options['resume'] and os.path.exists(output):
+            cursor, offset = read_checkpoint(checkpoint)
+        with open(output, 'a+b') as out:
+            # всё, что записано после последнего курсора, выгрузится заново
+            out.truncate(offset)
+            for cursor, text in export_chunks(
+                posts, options['format'], cursor, archived
+            ):
+                out.write(text.encode())
+                if cursor is None:
+                    # пачка ещё не выгружена целиком
+                    continue
+                out.flush()
+                write_checkpoint(checkpoint, cursor, out.tell())
+                self.stdout.write(f'выгружено до поста {cursor}')
+        self.stdout.write(self.style.SUCCESS(f'Готово, курсор {cursor}'))
@@ -0,0 +1,235 @@
+import csv
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts import archive, groups as group_registry
+from posts.models import (
+    ImportCheckpoint, Post, User, make_excerpt, make_excerpt_html,
+    manual_pub_date,
+)
+from posts.rendering import render_many
+
+
+def read_checkpoint(path):
+    checkpoint = ImportCheckpoint.objects.filter(path=path).first()
+    return checkpoint.line if checkpoint else 0
+
+
+def write_checkpoint(path, line):
+    # вызывается в транзакции пачки: отметка и посты фиксируются вместе
+    ImportCheckpoint.objects.update_or_create(
+        path=path, defaults={'line': line}
+    )
+
+
+def clean_pub_date(value):
+    if not value:
+        return timezone.now()
+    try:
+        pub_date = parse_datetime(value)
+    except ValueError:
+        pub_date = None
+    if pub_date is None:
+        raise ValueError(f'неверная дата {value!r}')
+    if timezone.is_naive(pub_date):
+        pub_date = timezone.make_aware(pub_date)
+    return pub_date
+
+
+def ndjson_rows(source):
+    for line_number, line in enumerate(source, 1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError:
+            yield line_number, None
+
+
+def csv_rows(source):
+    reader = csv.DictReader(source)
+    for row in reader:
+        yield reader.line_num, row
+
+
+class Command(BaseCommand):
+    help = (
+        'Импортирует посты из NDJSON или CSV (формат export_posts) '
+        'пачками через bulk_create. Номер последней строки пачки '
+        'сохраняется в БД в той же транзакции, --resume продолжает с него.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=('ndjson', 'csv'),
+                            help='по умолчанию по расширению файла')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--images', help='каталог с картинками постов')
+        parser.add_argument('--image-workers', type=int, default=8)
+        parser.add_argument('--create-authors', action='store_true',
+                            help='создать недостающих авторов')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='только проверить, ничего не записывая')
+        parser.add_argument('--resume', action='store_true',
+                            help='пропустить строки до сохранённой отметки')
+
+    def handle(self, *args, **options):
+        self.options = options
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f'Нет файла {path}')
+        export_format = options['format'] or (
+            'csv' if path.endswith('.csv') else 'ndjson'
+        )
+        checkpoint = os.path.abspath(path)
+        start = read_checkpoint(checkpoint) if options['resume'] else 0
+        # авторы и группы один раз в память, а не запрос на каждую строку
+        self.authors = dict(User.objects.values_list('username', 'pk'))
+        self.groups = {
+            group.slug: group.pk for group in group_registry.all_groups()
+        }
+        self.counts = {'imported': 0, 'invalid': 0, 'skipped': 0}
+        parse = csv_rows if export_format == 'csv' else ndjson_rows
+        with open(path, encoding='utf-8', newline='') as source:
+            batch = []
+            for line_number, row in parse(source):
+                if line_number <= start:
+                    continue
+                batch.append((line_number, row))
+                if len(batch) >= options['batch_size']:
+                    self.import_batch(batch, checkpoint)
+                    batch = []
+            if batch:
+                self.import_batch(batch, checkpoint)
+        if self.counts['imported'] and connection.vendor == 'sqlite':
+            # статистика планировщика после большой вставки
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA optimize')
+        verb = 'проверено' if options['dry_run'] else 'импортировано'
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово: {verb} {self.counts["imported"]}, с ошибками '
+            f'{self.counts["invalid"]}, пропущено {self.counts["skipped"]}'
+        ))
+
+    def import_batch(self, batch, checkpoint):
+        if self.options['create_authors'] and not self.options['dry_run']:
+            self.create_authors(batch)
+        posts = []
+        for line_number, row in batch:
+            try:
+                post = self.build_post(row)
+            except ValueError as error:
+                self.counts['invalid'] += 1
+                self.stderr.write(f'строка {line_number}: {error}')
+                continue
+            if post is None:
+                self.counts['skipped'] += 1
+            else:
+                posts.append(post)
+        self.counts['imported'] += len(posts)
+        if self.options['dry_run']:
+            return
+        if self.options['images']:
+            self.store_images([post for post in posts if post.image])
+        # bulk_create не вызывает save(): HTML с одной проверкой имён
+        # на всю пачку
+        for post, text_html in zip(
+            posts, render_many([post.text for post in posts])
+        ):
+            post.text_html = text_html
+            post.excerpt_html = make_excerpt_html(text_html)
+        with transaction.atomic():
+            with manual_pub_date():
+                Post.objects.bulk_create(posts)
+            # посты с прошлой датой — в архив, иначе Timeline покажет их
+            # раньше более новых архивных
+            archive.archive_behind(self.options['batch_size'])
+            write_checkpoint(checkpoint, batch[-1][0])
+        self.stdout.write(f'строка {batch[-1][0]}: {self.counts}')
+
+    def create_authors(self, batch):
+        names = {
+            row.get('author') for _, row in batch
+            if row and row.get('author')
+        } - set(self.authors)
+        if not names:
+            return
+        password = make_password(None)
+        User.objects.bulk_create(
+            [User(username=name, password=password) for name in names],
+            ignore_conflicts=True,
+        )
+        self.authors.update(
+            User.objects.filter(username__in=names)
+            .values_list('username', 'pk')
+        )
+
+    def build_post(self, row):
+        """Пост без сохранения или None, если запись не пост.
+
+        Ошибка в строке — ValueError с текстом для отчёта.
+        """
+        if row is None:
+            raise ValueError('не разобрать строку')
+        if row.get('type') not in (None, '', 'post'):
+            return None
+        text = (row.get('text') or '').strip()
+        if not text:
+            raise ValueError('пустой текст')
+        excerpt = make_excerpt(text)
+        return Post(
+            text=text,
+            excerpt=excerpt,
+            is_truncated=excerpt != text,
+            author_id=self.author_id(row.get('author')),
+            group_id=self.group_id(row.get('group')),
+            pub_date=clean_pub_date(row.get('pub_date')),
+            image=self.image_name(row.get('image')),
+        )
+
+    def author_id(self, username):
+        author_id = self.authors.get(username)
+        # при --dry-run недостающие авторы ещё не созданы
+        if author_id is None and not (
+            username and self.options['create_authors']
+            and self.options['dry_run']
+        ):
+            raise ValueError(f'нет автора {username!r}')
+        return author_id
+
+    def group_id(self, slug):
+        if not slug:
+            return None
+        if slug not in self.groups:
+            raise ValueError(f'нет группы {slug!r}')
+        return self.groups[slug]
+
+    def image_name(self, name):
+        if not name:
+            return ''
+        if not self.options['images']:
+            raise ValueError('картинка без --images')
+        if not os.path.isfile(os.path.join(self.options['images'], name)):
+            raise ValueError(f'нет файла картинки {name!r}')
+        return name
+
+    def store_images(self, posts):
+        def store(name):
+            with open(os.path.join(self.options['images'], name), 'rb') as f:
+                return default_storage.save(
+                    f'posts/{os.path.basename(name)}', File(f)
+                )
+
+        with ThreadPoolExecutor(self.options['image_workers']) as pool:
+            names = pool.map(store, [post.image.name for post in posts])
+            for post, name in zip(posts, names):
+                post.image = name
@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F, Q
+from django.utils import timezone
+
+from posts.models import ArchivedPost, Post, make_excerpt_html
+from posts.rendering import render_many
+
+
+class Command(BaseCommand):
+    help = ('Рендерит HTML текста и его начала (text_html, excerpt_html) '
+            'для постов, у которых его ещё нет, или для всех после смены '
+            'правил (posts.rendering).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--all', action='store_true',
+            help='перерисовать все посты, а не только пустые'
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        for model in (Post, ArchivedPost):
+            total += self.render(model, options)
+        self.stdout.write(self.style.SUCCESS(f'Готово: {total}'))
+
+    def render(self, model, options):
+        posts = model.objects.order_by('pk').only('pk', 'text')
+        if not options['all']:
+            posts = posts.filter(Q(text_html='') | Q(excerpt_html=''))
+        last_pk = 0
+        total = 0
+        now = timezone.now()
+        while True:
+            batch = list(
+                posts.filter(pk__gt=last_pk)[:options['batch_size']]
+            )
+            if not batch:
+                break
+            # одна проверка упомянутых имён на всю пачку
+            rendered = render_many([post.text for post in batch])
+            for post, text_html in zip(batch, rendered):
+                post.text_html = text_html
+                post.excerpt_html = make_excerpt_html(text_html)
+                # новая версия и updated: сбросить кэш карточки и ETag
+                post.version = F('version') + 1
+                post.updated = now
+            model.objects.bulk_update(
+                batch, ['text_html', 'excerpt_html', 'version', 'updated']
+            )
+            last_pk = batch[-1].pk
+            total += len(batch)
+            self.stdout.write(
+                f'{model._meta.verbose_name_plural}: {total} обработано'
+            )
+        return total
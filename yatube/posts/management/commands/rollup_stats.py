@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from posts import rollups
+
+
+class Command(BaseCommand):
+    help = (
+        'Добавляет новые посты, комментарии и подписки в суточные итоги. '
+        'Запускается по расписанию, например раз в несколько минут.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--rebuild', action='store_true',
+                            help='пересчитать итоги с нуля')
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            counts = rollups.rebuild(options['batch_size'])
+        else:
+            counts = rollups.roll_up(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS('Готово: ' + ', '.join(
+            f'{source} {count}' for source, count in counts.items()
+        )))
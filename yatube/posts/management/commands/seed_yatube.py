@@ -0,0 +1,267 @@
+import os
+import random
+import time
+from datetime import timedelta
+from itertools import accumulate
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+from faker import Faker
+from PIL import Image
+
+from posts import groups as group_registry
+from posts.models import (
+    Comment, Follow, Group, Post, make_excerpt, make_excerpt_html,
+    manual_pub_date,
+)
+from posts.rendering import render_many
+
+User = get_user_model()
+
+TEXT_POOL_SIZE = 1000
+PLACEHOLDER_IMAGES = 5
+SEED_TABLES = ('posts_post', 'posts_comment', 'posts_follow')
+BULK_PRAGMAS = (
+    'PRAGMA synchronous = OFF',
+    'PRAGMA journal_mode = MEMORY',
+    'PRAGMA temp_store = MEMORY',
+    'PRAGMA cache_size = -262144',
+)
+
+
+def power_law_cum_weights(count, exponent):
+    return list(accumulate(
+        1 / rank ** exponent for rank in range(1, count + 1)
+    ))
+
+
+class Command(BaseCommand):
+    help = (
+        'Быстро заполняет базу синтетическими пользователями, группами, '
+        'постами, комментариями и подписками.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--groups', type=int, default=50)
+        parser.add_argument('--posts', type=int, default=100000)
+        parser.add_argument('--comments', type=int, default=None,
+                            help='по умолчанию пятая часть постов')
+        parser.add_argument('--follows-per-user', type=int, default=20)
+        parser.add_argument('--author-exponent', type=float, default=1.1,
+                            help='показатель степенного закона для авторов')
+        parser.add_argument('--follow-exponent', type=float, default=1.1,
+                            help='показатель степенного закона подписок')
+        parser.add_argument('--images', type=float, default=0.0,
+                            help='доля постов с картинкой-заглушкой')
+        parser.add_argument('--days', type=int, default=365)
+        parser.add_argument('--batch-size', type=int, default=20000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.rnd = random.Random(options['seed'])
+        fake = Faker('ru_RU')
+        Faker.seed(options['seed'])
+        self.texts = [
+            fake.paragraph(nb_sentences=self.rnd.randint(1, 12))
+            for _ in range(TEXT_POOL_SIZE)
+        ]
+        started = time.perf_counter()
+        indexes = []
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                # внутри транзакции (например, в тестах) PRAGMA недоступны
+                if not connection.in_atomic_block:
+                    for pragma in BULK_PRAGMAS:
+                        cursor.execute(pragma)
+                indexes = self.drop_indexes(cursor)
+        try:
+            user_ids = self.step('users', self.seed_users, fake)
+            group_ids = self.step('groups', self.seed_groups, fake)
+            self.step('posts', self.seed_posts, user_ids, group_ids)
+            self.step('follows', self.seed_follows, user_ids)
+            self.step('comments', self.seed_comments, user_ids)
+        finally:
+            if indexes:
+                self.step('indexes', self.rebuild_indexes, indexes)
+        group_registry.invalidate()
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {time.perf_counter() - started:.1f} с'
+        ))
+
+    def step(self, name, func, *args):
+        started = time.perf_counter()
+        result = func(*args)
+        self.stdout.write(f'{name}: {time.perf_counter() - started:.1f} с')
+        return result
+
+    def drop_indexes(self, cursor):
+        placeholders = ', '.join(['%s'] * len(SEED_TABLES))
+        cursor.execute(
+            'SELECT name, sql FROM sqlite_master WHERE type = %s '
+            f'AND sql IS NOT NULL AND tbl_name IN ({placeholders})',
+            ['index', *SEED_TABLES]
+        )
+        indexes = cursor.fetchall()
+        for name, _ in indexes:
+            cursor.execute(f'DROP INDEX "{name}"')
+        return indexes
+
+    def rebuild_indexes(self, indexes):
+        with connection.cursor() as cursor:
+            for _, sql in indexes:
+                cursor.execute(sql)
+            cursor.execute('ANALYZE')
+
+    def in_batches(self, model, objects):
+        batch_size = self.options['batch_size']
+        batch = []
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) >= batch_size:
+                with transaction.atomic():
+                    model.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            with transaction.atomic():
+                model.objects.bulk_create(batch)
+
+    def new_ids(self, model, first_pk):
+        return list(
+            model.objects.filter(pk__gte=first_pk)
+            .order_by('pk').values_list('pk', flat=True)
+        )
+
+    def next_pk(self, model):
+        last = model.objects.order_by('-pk').values_list('pk', flat=True)
+        return (last.first() or 0) + 1
+
+    def seed_users(self, fake):
+        first_pk = self.next_pk(User)
+        # хэширование пароля дорогое, у всех один и тот же непригодный
+        password = make_password(None)
+        self.in_batches(User, (
+            User(
+                username=f'seed{first_pk + i}',
+                first_name=fake.first_name(),
+                last_name=fake.last_name(),
+                password=password,
+            )
+            for i in range(self.options['users'])
+        ))
+        return self.new_ids(User, first_pk)
+
+    def seed_groups(self, fake):
+        first_pk = self.next_pk(Group)
+        self.in_batches(Group, (
+            Group(
+                title=fake.catch_phrase()[:200],
+                slug=f'seed-{first_pk + i}',
+                description=self.rnd.choice(self.texts),
+            )
+            for i in range(self.options['groups'])
+        ))
+        return self.new_ids(Group, first_pk)
+
+    def placeholder_images(self):
+        names = []
+        os.makedirs(os.path.join(settings.MEDIA_ROOT, 'posts'), exist_ok=True)
+        for i in range(PLACEHOLDER_IMAGES):
+            name = f'posts/seed_placeholder_{i}.png'
+            color = tuple(self.rnd.randrange(256) for _ in range(3))
+            Image.new('RGB', (960, 339), color).save(
+                os.path.join(settings.MEDIA_ROOT, name)
+            )
+            names.append(name)
+        return names
+
+    def seed_posts(self, user_ids, group_ids):
+        rnd = self.rnd
+        author_weights = power_law_cum_weights(
+            len(user_ids), self.options['author_exponent']
+        )
+        group_weights = power_law_cum_weights(len(group_ids), 1.0)
+        images = self.placeholder_images() if self.options['images'] else []
+        excerpts = {text: make_excerpt(text) for text in self.texts}
+        rendered = dict(zip(self.texts, render_many(self.texts)))
+        excerpt_html = {
+            text: make_excerpt_html(html) for text, html in rendered.items()
+        }
+        total = self.options['posts']
+        start = timezone.now() - timedelta(days=self.options['days'])
+        step = self.options['days'] * 24 * 60 * 60 / max(total, 1)
+
+        def posts():
+            # даты растут вместе с id, как на живом сайте
+            for i in range(total):
+                text = rnd.choice(self.texts)
+                yield Post(
+                    text=text,
+                    excerpt=excerpts[text],
+                    is_truncated=excerpts[text] != text,
+                    text_html=rendered[text],
+                    excerpt_html=excerpt_html[text],
+                    pub_date=start + timedelta(
+                        seconds=(i + rnd.random()) * step
+                    ),
+                    author_id=rnd.choices(
+                        user_ids, cum_weights=author_weights
+                    )[0],
+                    group_id=(
+                        rnd.choices(group_ids, cum_weights=group_weights)[0]
+                        if group_ids and rnd.random() > 0.3 else None
+                    ),
+                    image=(
+                        rnd.choice(images)
+                        if images and rnd.random() < self.options['images']
+                        else ''
+                    ),
+                )
+
+        with manual_pub_date():
+            self.in_batches(Post, posts())
+
+    def seed_follows(self, user_ids):
+        rnd = self.rnd
+        weights = power_law_cum_weights(
+            len(user_ids), self.options['follow_exponent']
+        )
+
+        def follows():
+            for user_id in user_ids:
+                count = rnd.randint(0, self.options['follows_per_user'] * 2)
+                authors = set(
+                    rnd.choices(user_ids, cum_weights=weights, k=count)
+                )
+                authors.discard(user_id)
+                for author_id in authors:
+                    yield Follow(user_id=user_id, author_id=author_id)
+
+        self.in_batches(Follow, follows())
+
+    def seed_comments(self, user_ids):
+        rnd = self.rnd
+        comments = self.options['comments']
+        if comments is None:
+            comments = self.options['posts'] // 5
+        last_post = Post.objects.order_by('-pk').values_list('pk', flat=True)
+        last_pk = last_post.first()
+        if not last_pk or not comments:
+            return
+        first_pk = max(1, last_pk - self.options['posts'] + 1)
+        # обсуждают в основном свежие посты: ближе к концу диапазона id
+        post_weights = power_law_cum_weights(last_pk - first_pk + 1, 0.8)
+        post_ids = range(last_pk, first_pk - 1, -1)
+        self.in_batches(Comment, (
+            Comment(
+                post_id=rnd.choices(post_ids, cum_weights=post_weights)[0],
+                author_id=rnd.choice(user_ids),
+                text=rnd.choice(self.texts)[:300],
+            )
+            for _ in range(comments)
+        ))
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_auto_20220422_1957'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
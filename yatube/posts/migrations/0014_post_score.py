@@ -0,0 +1,22 @@
+# Generated by Django 2.2.16 on 2026-10-19 11:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_post_updated'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='score',
+            field=models.FloatField(db_index=True, default=0),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['group', 'score'], name='posts_post_group_score'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 2.2.16 on 2026-10-19 11:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0017_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedpost',
+            name='text_html',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 2.2.16 on 2026-10-19 11:50
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_is_truncated(apps, schema_editor):
+    # excerpt без обрезки совпадает с текстом; пустой ещё не посчитан
+    for name in ('Post', 'ArchivedPost'):
+        apps.get_model('posts', name).objects.exclude(excerpt='').exclude(
+            excerpt=F('text')
+        ).update(is_truncated=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0018_text_html'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedpost',
+            name='is_truncated',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='is_truncated',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunPython(fill_is_truncated, migrations.RunPython.noop),
+    ]
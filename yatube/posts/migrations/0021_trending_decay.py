@@ -0,0 +1,20 @@
+# Generated by Django 2.2.16 on 2026-10-19 11:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0020_import_checkpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingDecay',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('decayed_at', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 2.2.16 on 2026-10-19 12:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0021_trending_decay'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedpost',
+            name='excerpt_html',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='excerpt_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+    ]
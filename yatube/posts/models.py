@@ -1,6 +1,11 @@
+from contextlib import contextmanager
+
+from django.conf import settings
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils.text import Truncator
 
+from .rendering import render_text
 
 User = get_user_model()
 
@@ -14,9 +19,31 @@ class Group(models.Model):
         return self.title
 
 
+def make_excerpt(text):
+    return Truncator(text).chars(settings.POST_EXCERPT_LENGTH)
+
+
+def make_excerpt_html(text_html):
+    # те же POST_EXCERPT_LENGTH символов текста, теги не считаются и
+    # закрываются
+    return Truncator(text_html).chars(settings.POST_EXCERPT_LENGTH, html=True)
+
+
 class Post(models.Model):
     text = models.TextField()
-    pub_date = models.DateTimeField(auto_now_add=True)
+    # начало текста для списков, считается в save(); полный текст в списках
+    # не загружается (defer('text', 'text_html')), см. posts.views
+    excerpt = models.TextField(blank=True, editable=False)
+    # обрезан ли excerpt; по '…' в конце не понять: им может кончаться и
+    # сам текст
+    is_truncated = models.BooleanField(default=False, editable=False)
+    # готовый HTML текста для страницы поста, считается в save()
+    # (posts.rendering)
+    text_html = models.TextField(blank=True, editable=False)
+    # начало text_html для карточек в списках, считается в save()
+    excerpt_html = models.TextField(blank=True, editable=False)
+    # индекс для ORDER BY -pub_date лент и курсоров API (api.pagination)
+    pub_date = models.DateTimeField(auto_now_add=True, db_index=True)
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -35,13 +62,55 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True
     )
+    # растёт при каждом save() существующего поста (в том числе из
+    # админки), входит в ключ кэша карточки
+    version = models.PositiveIntegerField(default=0)
+    # время последнего изменения; по нему и числу постов строятся ETag
+    # лент без запроса списка (posts.conditional)
+    updated = models.DateTimeField(auto_now=True, db_index=True)
+    # популярность: растёт от комментариев и новых подписчиков автора,
+    # затухает командой decay_trending (posts.trending)
+    score = models.FloatField(default=0, db_index=True)
 
     class Meta:
         ordering = ('-pub_date',)
+        indexes = [
+            models.Index(fields=['author', 'updated'],
+                         name='posts_post_author_updated'),
+            models.Index(fields=['group', 'updated'],
+                         name='posts_post_group_updated'),
+            models.Index(fields=['group', 'score'],
+                         name='posts_post_group_score'),
+        ]
 
     def __str__(self):
         return self.text[:15]
 
+    def save(self, *args, **kwargs):
+        if 'text' not in self.get_deferred_fields():
+            self.excerpt = make_excerpt(self.text)
+            self.is_truncated = self.excerpt != self.text
+            self.text_html = render_text(self.text)
+            self.excerpt_html = make_excerpt_html(self.text_html)
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            self.version += 1
+        super().save(*args, **kwargs)
+
+
+@contextmanager
+def manual_pub_date():
+    # bulk_create вызывает pre_save, и auto_now_add затёр бы
+    # заданные заранее даты публикации. Поле меняется для всего процесса:
+    # Post.save() в другом потоке внутри блока останется без pub_date,
+    # поэтому блок — только вокруг bulk_create и только в командах
+    # (import_posts, seed_yatube), не в веб-воркерах
+    field = Post._meta.get_field('pub_date')
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
 
 class Comment(models.Model):
     post = models.ForeignKey(
@@ -71,3 +140,135 @@ class Follow(models.Model):
         on_delete=models.CASCADE,
         related_name='following'
     )
+
+
+class Recommendation(models.Model):
+    # «кого почитать»: лучшие K авторов для пользователя, таблица целиком
+    # пересчитывается командой build_recommendations (posts.recommendations)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='recommendations'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    score = models.FloatField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-score'],
+                         name='posts_recommendation_score'),
+        ]
+
+
+class DailyGroupStats(models.Model):
+    # суточные итоги по группам (posts.rollups); group=None — посты без
+    # группы и комментарии к ним
+    day = models.DateField()
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        related_name='+'
+    )
+    posts = models.PositiveIntegerField(default=0)
+    comments = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('day', 'group')
+
+
+class DailyAuthorStats(models.Model):
+    # суточные итоги по авторам: написанные посты и комментарии и новые
+    # подписчики (posts.rollups)
+    day = models.DateField()
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    posts = models.PositiveIntegerField(default=0)
+    comments = models.PositiveIntegerField(default=0)
+    followers = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('day', 'author')
+
+
+class RollupWatermark(models.Model):
+    # последний id строки источника, уже учтённый в суточных итогах
+    source = models.CharField(max_length=20, unique=True)
+    last_id = models.PositiveIntegerField(default=0)
+
+
+class TrendingDecay(models.Model):
+    # когда счёт популярности последний раз затухал (decay_trending);
+    # одна строка, от неё отсчитывается прошедшее время
+    decayed_at = models.DateTimeField()
+
+
+class ImportCheckpoint(models.Model):
+    # последняя импортированная строка файла (import_posts --resume);
+    # пишется в той же транзакции, что и посты пачки
+    path = models.CharField(max_length=500, unique=True)
+    line = models.PositiveIntegerField(default=0)
+
+
+class ArchivedPost(models.Model):
+    # пост старше ARCHIVE_AFTER_DAYS, перенесённый из Post командой
+    # archive_posts (posts.archive); id сохраняется, ссылки не меняются
+    id = models.IntegerField(primary_key=True)
+    text = models.TextField()
+    excerpt = models.TextField(blank=True)
+    is_truncated = models.BooleanField(default=False)
+    text_html = models.TextField(blank=True)
+    excerpt_html = models.TextField(blank=True)
+    pub_date = models.DateTimeField(db_index=True)
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_posts'
+    )
+    group = models.ForeignKey(
+        Group,
+        blank=True,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name='archived_posts'
+    )
+    image = models.ImageField(upload_to='posts/', blank=True)
+    version = models.PositiveIntegerField(default=0)
+    updated = models.DateTimeField()
+
+    class Meta:
+        ordering = ('-pub_date',)
+        indexes = [
+            models.Index(fields=['author', 'pub_date'],
+                         name='posts_archived_author_date'),
+            models.Index(fields=['group', 'pub_date'],
+                         name='posts_archived_group_date'),
+        ]
+
+    def __str__(self):
+        return self.text[:15]
+
+
+class ArchivedComment(models.Model):
+    # комментарий архивного поста, переносится вместе с ним
+    id = models.IntegerField(primary_key=True)
+    post = models.ForeignKey(
+        ArchivedPost,
+        on_delete=models.CASCADE,
+        related_name='comments'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_comments'
+    )
+    text = models.TextField()
+    created = models.DateTimeField()
@@ -0,0 +1,78 @@
+"""HTML текста поста, рендерится при сохранении.
+
+Текст экранируется целиком, затем ссылки становятся <a rel="nofollow">
+(urlize), @имя существующего пользователя — ссылкой на его профиль, пустые
+строки делят абзацы, одиночные переводы строк — <br>. Результат хранится
+в Post.text_html, его начало для карточек списков — в Post.excerpt_html;
+шаблоны выводят их без обработки. При смене правил посты перерисовывает
+команда render_posts --all.
+"""
+import re
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils.html import escape, format_html, linebreaks, urlize
+
+User = get_user_model()
+
+# @ после буквы, точки или слэша — почта или часть адреса, не упоминание;
+# точка в конце — конец предложения, а не имени
+MENTION_RE = re.compile(r'(?<![\w@./])@(\w(?:[\w.+-]*\w)?)')
+# SQLite принимает не больше 999 параметров в запросе
+LOOKUP_CHUNK = 500
+
+
+def mentions(text):
+    return set(MENTION_RE.findall(text))
+
+
+def existing_usernames(names):
+    """Какие из имён есть среди пользователей: запрос на LOOKUP_CHUNK имён."""
+    names = sorted(names)
+    found = set()
+    for start in range(0, len(names), LOOKUP_CHUNK):
+        found.update(
+            User.objects.filter(
+                username__in=names[start:start + LOOKUP_CHUNK]
+            ).values_list('username', flat=True)
+        )
+    return found
+
+
+def _link_mention(username):
+    return format_html(
+        '<a href="{}">@{}</a>',
+        reverse('posts:profile', kwargs={'username': username}), username
+    )
+
+
+def render(text, usernames):
+    """HTML текста; usernames — существующие имена из упоминаний."""
+    parts = []
+    position = 0
+    for match in MENTION_RE.finditer(text):
+        parts.append(urlize(text[position:match.start()], nofollow=True,
+                            autoescape=True))
+        username = match.group(1)
+        parts.append(
+            _link_mention(username) if username in usernames
+            else escape(match.group())
+        )
+        position = match.end()
+    parts.append(urlize(text[position:], nofollow=True, autoescape=True))
+    # всё уже экранировано выше
+    return linebreaks(''.join(parts), autoescape=False)
+
+
+def render_text(text):
+    names = mentions(text)
+    return render(text, existing_usernames(names) if names else set())
+
+
+def render_many(texts):
+    """HTML для списка текстов с одной проверкой имён на всех."""
+    names = set()
+    for text in texts:
+        names |= mentions(text)
+    usernames = existing_usernames(names) if names else set()
+    return [render(text, usernames) for text in texts]
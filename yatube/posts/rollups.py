@@ -0,0 +1,223 @@
+"""Суточные итоги по группам и авторам.
+
+Команда rollup_stats читает только новые строки Post, Comment и Follow —
+с id больше отметки источника (RollupWatermark) — пачками по id,
+складывает их GROUP BY по дню и группе или автору и прибавляет к
+DailyGroupStats и DailyAuthorStats. Прибавка и новая отметка пишутся в
+одной транзакции, поэтому прерванный запуск ничего не учтёт дважды.
+Пачку забирает сдвиг отметки с условием на её старое значение: если
+параллельный запуск уже сдвинул отметку, пачка пропускается. К строкам
+итогов прибавляется F(), и запуски по разным источникам не затирают
+прибавки друг друга. Недостающие строки вставляются пустыми с
+ignore_conflicts: одновременная вставка той же строки другим запуском не
+роняет пачку.
+
+Отчёты (group_activity, top_authors) читают только итоги. Правки и
+удаления уже учтённых строк итоги не меняют, для этого есть --rebuild.
+У подписок нет даты, новые подписчики относятся ко дню запуска.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Max, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from . import groups
+from .models import (
+    Comment, DailyAuthorStats, DailyGroupStats, Follow, Post,
+    RollupWatermark
+)
+
+
+def _post_rows(rows):
+    rows = rows.annotate(day=TruncDate('pub_date')).order_by().values(
+        'day', 'group_id', 'author_id'
+    ).annotate(count=Count('pk'))
+    for row in rows:
+        yield row['count'], [
+            (DailyGroupStats, (row['day'], row['group_id']), 'posts'),
+            (DailyAuthorStats, (row['day'], row['author_id']), 'posts'),
+        ]
+
+
+def _comment_rows(rows):
+    rows = rows.annotate(day=TruncDate('created')).order_by().values(
+        'day', 'post__group_id', 'author_id'
+    ).annotate(count=Count('pk'))
+    for row in rows:
+        yield row['count'], [
+            (DailyGroupStats, (row['day'], row['post__group_id']),
+             'comments'),
+            (DailyAuthorStats, (row['day'], row['author_id']), 'comments'),
+        ]
+
+
+def _follow_rows(rows):
+    today = timezone.localdate()
+    rows = rows.order_by().values('author_id').annotate(count=Count('pk'))
+    for row in rows:
+        yield row['count'], [
+            (DailyAuthorStats, (today, row['author_id']), 'followers'),
+        ]
+
+
+SOURCES = {
+    'post': (Post, _post_rows),
+    'comment': (Comment, _comment_rows),
+    'follow': (Follow, _follow_rows),
+}
+
+KEY_FIELDS = {
+    DailyGroupStats: 'group_id',
+    DailyAuthorStats: 'author_id',
+}
+
+# пар (день, id) в одной выборке строк итогов
+LOOKUP_CHUNK = 400
+
+
+def _lookup(model, keys):
+    """Строки итогов для пар (день, id) пачки: {(день, id): строка}."""
+    key_field = KEY_FIELDS[model]
+    keys = list(keys)
+    rows = {}
+    # IN по дням и id пачки, а не все строки диапазона дней; кусками,
+    # чтобы не упереться в предел параметров SQLite
+    for start in range(0, len(keys), LOOKUP_CHUNK):
+        chunk = set(keys[start:start + LOOKUP_CHUNK])
+        ids = {key for _, key in chunk}
+        match = Q(**{f'{key_field}__in': ids - {None}})
+        if None in ids:
+            # IN не находит NULL: посты без группы
+            match |= Q(**{f'{key_field}__isnull': True})
+        queryset = model.objects.filter(
+            match, day__in={day for day, _ in chunk}
+        )
+        for row in queryset:
+            key = (row.day, getattr(row, key_field))
+            if key in chunk:
+                rows[key] = row
+    return rows
+
+
+def _merge(model, increments):
+    """Прибавляет {(день, id): {поле: число}} к строкам итогов."""
+    key_field = KEY_FIELDS[model]
+    rows = _lookup(model, increments)
+    missing = [key for key in increments if key not in rows]
+    if missing:
+        # сначала пустые строки: ту же строку мог только что вставить
+        # запуск по другому источнику, тогда вставка пропускается, а
+        # прибавка ниже идёт к его строке
+        model.objects.bulk_create(
+            [model(day=day, **{key_field: key}) for day, key in missing],
+            ignore_conflicts=True,
+        )
+        rows.update(_lookup(model, missing))
+    fields = set()
+    for key, counts in increments.items():
+        row = rows[key]
+        for field, count in counts.items():
+            setattr(row, field, F(field) + count)
+            fields.add(field)
+    model.objects.bulk_update(list(rows.values()), sorted(fields))
+
+
+def _roll_up_rows(aggregate, rows):
+    """Прибавляет строки источника к итогам; число строк."""
+    total = 0
+    increments = {}
+    for count, targets in aggregate(rows):
+        total += count
+        for stats, key, field in targets:
+            counts = increments.setdefault(stats, {}).setdefault(key, {})
+            counts[field] = counts.get(field, 0) + count
+    for stats, stats_increments in increments.items():
+        _merge(stats, stats_increments)
+    return total
+
+
+def roll_up_source(source, batch_size=5000):
+    """Учитывает новые строки источника; число учтённых строк."""
+    model, aggregate = SOURCES[source]
+    watermark, _ = RollupWatermark.objects.get_or_create(source=source)
+    watermarks = RollupWatermark.objects.filter(source=source)
+    # строки, добавленные во время запуска, дождутся следующего
+    last = model.objects.aggregate(last=Max('pk'))['last'] or 0
+    start = watermark.last_id
+    total = 0
+    while start < last:
+        upper = min(start + batch_size, last)
+        with transaction.atomic():
+            # UPDATE держит строку отметки до конца транзакции: второй
+            # запуск ждёт и после фиксации не находит старого значения
+            claimed = watermarks.filter(last_id=start).update(last_id=upper)
+            if claimed:
+                total += _roll_up_rows(
+                    aggregate,
+                    model.objects.filter(pk__gt=start, pk__lte=upper),
+                )
+        # пачку учёл параллельный запуск: дальше от его отметки
+        start = upper if claimed else watermarks.get().last_id
+    return total
+
+
+def roll_up(batch_size=5000):
+    return {
+        source: roll_up_source(source, batch_size) for source in SOURCES
+    }
+
+
+def rebuild(batch_size=5000):
+    with transaction.atomic():
+        DailyGroupStats.objects.all().delete()
+        DailyAuthorStats.objects.all().delete()
+        RollupWatermark.objects.all().delete()
+    return roll_up(batch_size)
+
+
+def state():
+    """Отметки всех источников: меняются, только когда меняются итоги."""
+    return tuple(
+        RollupWatermark.objects.order_by('source')
+        .values_list('source', 'last_id')
+    )
+
+
+def group_activity(days):
+    """Посты и комментарии по группам за последние days дней по дням."""
+    since = timezone.localdate() - timedelta(days=days - 1)
+    rows = DailyGroupStats.objects.filter(day__gte=since).order_by(
+        'day', 'group_id'
+    ).values_list('day', 'group_id', 'posts', 'comments')
+    result = []
+    for day, group_id, posts, comments in rows:
+        group = groups.get_group(group_id) if group_id else None
+        result.append({
+            'day': day.isoformat(),
+            'group': group.slug if group else None,
+            'posts': posts,
+            'comments': comments,
+        })
+    return result
+
+
+def top_authors(days, limit):
+    """Самые активные авторы за последние days дней."""
+    since = timezone.localdate() - timedelta(days=days - 1)
+    rows = DailyAuthorStats.objects.filter(day__gte=since).values_list(
+        'author__username'
+    ).annotate(
+        Sum('posts'), Sum('comments'), Sum('followers'),
+        activity=Sum(F('posts') + F('comments')),
+    ).order_by('-activity', 'author__username')[:limit]
+    return [
+        {
+            'author': author,
+            'posts': posts,
+            'comments': comments,
+            'followers': followers,
+        }
+        for author, posts, comments, followers, _ in rows
+    ]
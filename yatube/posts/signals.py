@@ -0,0 +1,39 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core import versions
+
+from . import conditional, groups, live, trending
+from .models import Comment, Follow, Group, Post
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_group_registry(sender, **kwargs):
+    groups.invalidate()
+
+
+@receiver(post_save, sender=Post)
+def publish_new_post(sender, instance, created, **kwargs):
+    if created:
+        # подписчики читают базу: до коммита поста там ещё нет
+        transaction.on_commit(lambda: live.publish(instance))
+
+
+@receiver(post_delete, sender=Post)
+def bump_deleted_version(sender, **kwargs):
+    # MAX(updated) удаления не заметит, ETag лент меняет версия
+    versions.bump(conditional.DELETED_VERSION)
+
+
+@receiver(post_save, sender=Comment)
+def bump_commented_post(sender, instance, created, **kwargs):
+    if created and instance.post_id:
+        trending.bump_post(instance.post_id)
+
+
+@receiver(post_save, sender=Follow)
+def bump_followed_author(sender, instance, created, **kwargs):
+    if created:
+        trending.bump_author(instance.author_id)
@@ -0,0 +1,60 @@
+import zlib
+
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from core import metrics
+from posts.groups import current_version, get_group
+
+register = template.Library()
+
+
+@register.filter
+def cached_group(group_id):
+    """Группа из реестра posts.groups вместо запроса через post.group."""
+    if group_id is None:
+        return None
+    return get_group(group_id)
+
+
+def card_cache_key(post):
+    # версия реестра групп в ключе: карточка содержит ссылку на группу;
+    # имя автора берётся из select_related('author') без запроса, и его
+    # смена тоже меняет ключ
+    author = post.author
+    author_key = zlib.crc32(
+        f'{author.username}\0{author.get_full_name()}'.encode()
+    )
+    return (f'post_card:{post.pk}:{post.version}:{current_version()}:'
+            f'{author_key:x}')
+
+
+@register.simple_tag
+def post_cards(posts):
+    """Карточки постов из кэша: один get_many, рендерятся только промахи."""
+    posts = list(posts)
+    keys = [card_cache_key(post) for post in posts]
+    cards = cache.get_many(keys)
+    missed = {}
+    for key, post in zip(keys, posts):
+        if key not in cards:
+            missed[key] = render_to_string(
+                'posts/includes/post_card.html', {'post': post}
+            )
+    metrics.record_cache(hits=len(cards), misses=len(missed))
+    if missed:
+        cache.set_many(missed, settings.POST_CARD_TIMEOUT)
+        cards.update(missed)
+    return [mark_safe(cards[key]) for key in keys]
+
+
+@register.simple_tag
+def live_config():
+    """Настройки новых постов без перезагрузки для includes/live.html."""
+    return {
+        'check_ms': settings.LIVE_CHECK_INTERVAL * 1000,
+        'stream': settings.LIVE_SSE_ENABLED,
+    }
@@ -0,0 +1,75 @@
+"""Бюджеты SQL-запросов для страниц posts.
+
+Страница рендерится с N и 10·N строками (посты или комментарии) при
+пустом кэше; число запросов должно совпасть и уложиться в бюджет, иначе
+в шаблон или view вернулся N+1. Бюджеты объявлены здесь, проверка
+запускается и из posts/tests (unittest), и из tests/ (pytest).
+"""
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Post
+
+ROWS = 3
+
+# view: (бюджет, что размножаем, kwargs для reverse); у group_list,
+# profile и post_detail +1 запрос на валидаторы условного GET
+# (posts.conditional), зато на 304 остаётся только он; у profile ещё +1
+# на блок рекомендаций (posts.recommendations); у всех, кроме
+# follow_index, +1 на число архивных постов (posts.archive), при тёплом
+# кэше его нет; у всех +1 на таблицу версий (core.versions), её читает
+# ключ кэша пользователя и сессии
+QUERY_BUDGETS = {
+    'posts:index': (7, 'posts', lambda data: {}),
+    'posts:group_list': (8, 'posts', lambda data: {
+        'slug': data['group'].slug
+    }),
+    'posts:profile': (11, 'posts', lambda data: {
+        'username': data['author'].username
+    }),
+    'posts:post_detail': (9, 'comments', lambda data: {
+        'post_id': data['post'].pk
+    }),
+    'posts:follow_index': (6, 'posts', lambda data: {}),
+}
+
+
+def add_rows(data, kind, count):
+    if kind == 'posts':
+        Post.objects.bulk_create(
+            Post(
+                text=f'Пост {i}', excerpt=f'Пост {i}',
+                author=data['author'], group=data['group']
+            )
+            for i in range(count)
+        )
+    else:
+        Comment.objects.bulk_create(
+            Comment(post=data['post'], author=data['reader'], text='Текст')
+            for _ in range(count)
+        )
+
+
+def count_queries(client, url):
+    cache.clear()
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200, (url, response.status_code)
+    return len(queries)
+
+
+def measure(client, data, view_name):
+    """Число запросов страницы при N и 10·N строках и её бюджет."""
+    budget, kind, url_kwargs = QUERY_BUDGETS[view_name]
+    Follow.objects.get_or_create(user=data['reader'], author=data['author'])
+    url = reverse(view_name, kwargs=url_kwargs(data))
+    add_rows(data, kind, ROWS)
+    # прогрев памяти процесса (реестр групп posts.groups): её cache.clear
+    # не сбрасывает, и первый замер иначе заплатил бы за неё один
+    count_queries(client, url)
+    small = count_queries(client, url)
+    add_rows(data, kind, ROWS * 9)
+    large = count_queries(client, url)
+    return small, large, budget
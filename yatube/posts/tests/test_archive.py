@@ -0,0 +1,188 @@
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models import Sum
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core import versions
+from core.models import Version
+from posts import archive, feeds, rollups
+from posts.models import (
+    ArchivedComment, ArchivedPost, Comment, DailyAuthorStats, Group, Post,
+    User
+)
+
+
+@override_settings(ARCHIVE_AFTER_DAYS=30)
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Группа', slug='archive', description='Описание'
+        )
+        cls.old = [
+            Post.objects.create(
+                text=f'Старый {i}', author=cls.author, group=cls.group
+            )
+            for i in range(settings.POSTS_ON_PAGE)
+        ]
+        Post.objects.filter(pk__in=[post.pk for post in cls.old]).update(
+            pub_date=timezone.now() - timedelta(days=60)
+        )
+        Comment.objects.create(post=cls.old[0], author=cls.author, text='!')
+        cls.new = [
+            Post.objects.create(
+                text=f'Новый {i}', author=cls.author, group=cls.group
+            )
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.guest = Client()
+
+    def archive(self):
+        call_command('archive_posts', batch_size=4, stdout=StringIO())
+
+    def test_moves_old_posts_with_comments(self):
+        """Старые посты и комментарии переезжают в архив с теми же id."""
+        self.archive()
+        self.assertEqual(
+            set(Post.objects.values_list('pk', flat=True)),
+            {post.pk for post in self.new}
+        )
+        self.assertEqual(
+            set(ArchivedPost.objects.values_list('pk', flat=True)),
+            {post.pk for post in self.old}
+        )
+        comment = ArchivedComment.objects.get()
+        self.assertEqual(comment.post_id, self.old[0].pk)
+        self.assertFalse(Comment.objects.exists())
+        post = Post.objects.create(text='После архива', author=self.author)
+        self.assertGreater(post.pk, self.new[-1].pk)
+
+    def test_archive_versions_shared_between_processes(self):
+        """Команда меняет версии архива и лент в БД, а не в своём кэше."""
+        timeline = archive.Timeline(
+            Post.objects.all(), ArchivedPost.objects.all(), 'all'
+        )
+        self.assertEqual(timeline.count(), len(self.old) + 3)
+        before = (archive.current_version(), feeds.current_generation())
+        self.archive()
+        stored = dict(Version.objects.values_list('name', 'value'))
+        self.assertNotEqual(stored[archive.VERSION], before[0])
+        self.assertNotEqual(stored[feeds.GENERATION], before[1])
+        # другой процесс видит новые версии, когда истекает его память
+        cache.delete(versions.CACHE_KEY)
+        self.assertEqual(archive.current_version(), stored[archive.VERSION])
+        self.assertEqual(
+            archive.archived_count(ArchivedPost.objects.all(), 'all'),
+            len(self.old)
+        )
+
+    def test_rollup_counts_rows_before_they_move(self):
+        """Посты и комментарии, ещё не попавшие в итоги, учитываются."""
+        self.archive()
+        rollups.roll_up()
+        self.assertEqual(
+            DailyAuthorStats.objects.filter(author=self.author).aggregate(
+                posts=Sum('posts'), comments=Sum('comments')
+            ),
+            {'posts': len(self.old) + 3, 'comments': 1}
+        )
+
+    def test_edit_does_not_resurrect_archived_post(self):
+        """Правка поста, ушедшего в архив после чтения, — 404, не вставка."""
+        stale = Post.objects.get(pk=self.old[0].pk)
+        self.archive()
+        client = Client()
+        client.force_login(self.author)
+        with mock.patch('posts.views.get_object_or_404', return_value=stale):
+            response = client.post(
+                reverse('posts:post_edit', kwargs={'post_id': stale.pk}),
+                {'text': 'Правка'}
+            )
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Post.objects.filter(pk=stale.pk).exists())
+
+    def test_post_detail_falls_back_to_archive(self):
+        """Архивный пост открывается по старому адресу без формы."""
+        self.archive()
+        client = Client()
+        client.force_login(self.author)
+        response = client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.old[0].pk})
+        )
+        self.assertContains(response, 'Старый 0')
+        self.assertTrue(response.context['archived'])
+        self.assertEqual(len(response.context['comments']), 1)
+        self.assertNotContains(response, 'Добавить комментарий')
+        self.assertEqual(response.context['count_posts'], len(self.old) + 3)
+
+    def test_pagination_crosses_into_archive(self):
+        """Страницы идут от горячих постов к архивным без пропусков."""
+        self.archive()
+        for url in (
+            reverse('posts:profile', kwargs={'username': 'author'}),
+            reverse('posts:group_list', kwargs={'slug': 'archive'}),
+            reverse('posts:index'),
+        ):
+            with self.subTest(url=url):
+                first = self.guest.get(url)
+                second = self.guest.get(url, {'page': 2})
+                posts = list(first.context['posts'])
+                posts += list(second.context['posts'])
+                self.assertEqual(
+                    [post.pk for post in posts],
+                    [post.pk for post in self.new[::-1]]
+                    + [post.pk for post in self.old[::-1]]
+                )
+                self.assertIsInstance(posts[-1], ArchivedPost)
+
+    def test_api_cursor_crosses_into_archive(self):
+        """Курсор API ведёт из горячих постов в архив."""
+        self.archive()
+        url = '/api/v1/profiles/author/posts/'
+        ids, cursor = [], None
+        while True:
+            params = {'limit': 4}
+            if cursor:
+                params['cursor'] = cursor
+            data = self.guest.get(url, params).json()
+            ids += [post['id'] for post in data['results']]
+            cursor = data['next']
+            if not cursor:
+                break
+        self.assertEqual(
+            ids, [post.pk for post in self.new[::-1] + self.old[::-1]]
+        )
+
+    def test_import_keeps_archive_older_than_hot(self):
+        """Импорт с прошлой датой уходит в архив, порядок ленты не ломается."""
+        self.archive()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'posts.ndjson')
+        pub_date = timezone.now() - timedelta(days=90)
+        with open(path, 'w') as source:
+            source.write(json.dumps({
+                'author': 'author', 'group': 'archive',
+                'pub_date': pub_date.isoformat(), 'text': 'Из прошлого',
+            }) + '\n')
+        call_command('import_posts', path, stdout=StringIO())
+        self.assertFalse(Post.objects.filter(text='Из прошлого').exists())
+        imported = ArchivedPost.objects.get(text='Из прошлого')
+        response = self.guest.get(reverse('posts:index'), {'page': 2})
+        self.assertEqual(list(response.context['posts'])[-1], imported)
@@ -0,0 +1,137 @@
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from core.cache import get_or_recompute, single_flight_cache_page
+from posts.models import Post
+from posts.templatetags.post_filters import card_cache_key, post_cards
+
+User = get_user_model()
+
+
+class SingleFlightCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_fresh_value_is_not_recomputed(self):
+        """Свежее значение берётся из кэша без пересчёта."""
+        recompute = mock.Mock(return_value='page')
+        get_or_recompute('key', recompute, 60)
+        self.assertEqual(get_or_recompute('key', recompute, 60), 'page')
+        self.assertEqual(recompute.call_count, 1)
+
+    def test_stale_value_served_while_lease_is_taken(self):
+        """Пока пересчёт идёт в другом запросе, отдаётся старое значение."""
+        cache.set('key', ('old', 0, time.time() - 1), 60)
+        cache.add('key:lease', 1, 10)
+        recompute = mock.Mock(return_value='new')
+        self.assertEqual(get_or_recompute('key', recompute, 60), 'old')
+        recompute.assert_not_called()
+
+    def test_stale_value_recomputed_by_lease_holder(self):
+        """Получивший аренду запрос пересчитывает и освобождает её."""
+        cache.set('key', ('old', 0, time.time() - 1), 60)
+        self.assertEqual(get_or_recompute('key', lambda: 'new', 60), 'new')
+        self.assertIsNone(cache.get('key:lease'))
+        self.assertEqual(cache.get('key')[0], 'new')
+
+    @override_settings(CACHE_LEASE_WAIT=0)
+    def test_waiter_does_not_release_foreign_lease(self):
+        """Не дождавшийся значения запрос не снимает чужую аренду."""
+        cache.add('key:lease', 'holder', 10)
+        self.assertEqual(get_or_recompute('key', lambda: 'new', 60), 'new')
+        self.assertEqual(cache.get('key:lease'), 'holder')
+
+
+class SingleFlightCachePageTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = []
+
+        @single_flight_cache_page(60)
+        def view(request):
+            self.calls.append(request.method)
+            return HttpResponse(f'ответ {len(self.calls)}')
+
+        self.view = view
+        self.factory = RequestFactory()
+
+    def get(self, path='/page/', user=None):
+        request = self.factory.get(path)
+        request.user = user or AnonymousUser()
+        return self.view(request)
+
+    def test_get_is_cached(self):
+        """Повторный GET отдаётся из кэша с Vary: Cookie."""
+        first, second = self.get(), self.get()
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(self.calls, ['GET'])
+        self.assertIn('Cookie', second['Vary'])
+
+    def test_key_depends_on_user_and_path(self):
+        """У разных пользователей и адресов свои записи."""
+        user = User.objects.create_user(username='sf')
+        self.get()
+        self.get(user=user)
+        self.get('/page/?page=2')
+        self.assertEqual(len(self.calls), 3)
+
+    def test_post_is_not_cached(self):
+        """Небезопасные методы идут мимо кэша."""
+        for _ in range(2):
+            request = self.factory.post('/page/')
+            request.user = AnonymousUser()
+            self.view(request)
+        self.assertEqual(self.calls, ['POST', 'POST'])
+
+
+class PostCardCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Card')
+        cls.post = Post.objects.create(author=cls.user, text='Старый текст')
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_cards_cached_between_renders(self):
+        """Повторный рендер берёт карточку из кэша."""
+        self.assertEqual(post_cards([self.post]), post_cards([self.post]))
+        self.assertIsNotNone(cache.get(card_cache_key(self.post)))
+
+    def test_edit_refreshes_card(self):
+        """Редактирование поста меняет ключ и содержимое карточки."""
+        post_cards([self.post])
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.pk}),
+            data={'text': 'Новый текст'}
+        )
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertEqual(post.version, self.post.version + 1)
+        self.assertIn('Новый текст', post_cards([post])[0])
+
+    def test_save_outside_edit_view_refreshes_card(self):
+        """save() из админки или shell тоже меняет версию карточки."""
+        post_cards([self.post])
+        post = Post.objects.select_related('author').get(pk=self.post.pk)
+        post.text = 'Правка в админке'
+        post.save()
+        self.assertEqual(post.version, self.post.version + 1)
+        self.assertIn('Правка в админке', post_cards([post])[0])
+
+    def test_author_rename_refreshes_card(self):
+        """Новое имя автора попадает в карточку."""
+        post_cards([self.post])
+        self.user.first_name = 'Новое'
+        self.user.save()
+        post = Post.objects.select_related('author').get(pk=self.post.pk)
+        self.assertIn('Новое', post_cards([post])[0])
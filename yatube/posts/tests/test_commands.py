@@ -0,0 +1,93 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from posts.models import Comment, Follow, Group, Post, User
+
+
+class SeedCommandTests(TestCase):
+    def test_seed_creates_requested_rows(self):
+        """seed_yatube создаёт заданное число строк с excerpt и датами."""
+        call_command(
+            'seed_yatube', users=20, groups=3, posts=300, comments=50,
+            batch_size=100, stdout=StringIO()
+        )
+        self.assertEqual(User.objects.count(), 20)
+        self.assertEqual(Group.objects.count(), 3)
+        self.assertEqual(Post.objects.count(), 300)
+        self.assertEqual(Comment.objects.count(), 50)
+        self.assertTrue(Follow.objects.exists())
+        self.assertFalse(Post.objects.filter(excerpt='').exists())
+        first, last = Post.objects.order_by('pk')[::299]
+        self.assertLess(first.pub_date, last.pub_date)
+
+
+class ImportCommandTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        Group.objects.create(title='Группа', slug='news', description='')
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'posts.ndjson')
+        rows = [
+            {'type': 'post', 'author': 'author', 'group': 'news',
+             'pub_date': '2020-01-02T03:04:05+00:00', 'text': 'Первый'},
+            {'type': 'comment', 'post': 1, 'author': 'author', 'text': 'К'},
+            {'type': 'post', 'author': 'nobody', 'text': 'Чужой'},
+            {'type': 'post', 'author': 'author', 'text': 'Второй'},
+        ]
+        with open(self.path, 'w') as source:
+            source.writelines(json.dumps(row) + '\n' for row in rows)
+            source.write('{broken\n')
+
+    def import_posts(self, **options):
+        stderr = StringIO()
+        call_command('import_posts', self.path, batch_size=2,
+                     stdout=StringIO(), stderr=stderr, **options)
+        return stderr.getvalue()
+
+    def test_import_skips_invalid_rows(self):
+        """Импорт создаёт посты, а ошибки пишет с номером строки."""
+        errors = self.import_posts()
+        first = Post.objects.get(text='Первый')
+        self.assertEqual(first.group.slug, 'news')
+        self.assertEqual(first.pub_date.year, 2020)
+        self.assertEqual(first.excerpt, 'Первый')
+        self.assertTrue(Post.objects.filter(text='Второй').exists())
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertIn('строка 3', errors)
+        self.assertIn('строка 5', errors)
+
+    def test_dry_run_writes_nothing(self):
+        """--dry-run только проверяет файл."""
+        self.import_posts(dry_run=True, create_authors=True)
+        self.assertFalse(Post.objects.exists())
+        self.assertFalse(User.objects.filter(username='nobody').exists())
+
+    def test_resume_continues_after_checkpoint(self):
+        """--resume не импортирует уже загруженные строки заново."""
+        self.import_posts()
+        self.import_posts(resume=True)
+        self.assertEqual(Post.objects.count(), 2)
+
+    def test_checkpoint_committed_with_batch(self):
+        """Отметка пишется в транзакции пачки: сбой откатывает и посты."""
+        with mock.patch(
+            'posts.management.commands.import_posts.write_checkpoint',
+            side_effect=RuntimeError
+        ):
+            with self.assertRaises(RuntimeError):
+                self.import_posts()
+        self.assertFalse(Post.objects.exists())
+        self.import_posts(resume=True)
+        self.assertEqual(Post.objects.count(), 2)
@@ -0,0 +1,101 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post, User
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='cond', description='Описание'
+        )
+        cls.post = Post.objects.create(
+            text='Пост', author=cls.author, group=cls.group
+        )
+        cls.urls = {
+            'group': reverse('posts:group_list', kwargs={'slug': 'cond'}),
+            'profile': reverse(
+                'posts:profile', kwargs={'username': 'author'}
+            ),
+            'post': reverse(
+                'posts:post_detail', kwargs={'post_id': cls.post.pk}
+            ),
+        }
+
+    def setUp(self):
+        cache.clear()
+        self.guest = Client()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def test_matching_etag_returns_304_after_one_query(self):
+        """Совпавший ETag — 304 без списка и рендера."""
+        for name, url in self.urls.items():
+            with self.subTest(page=name):
+                response = self.guest.get(url)
+                self.assertIn('Last-Modified', response)
+                with self.assertNumQueries(1):
+                    response = self.guest.get(
+                        url, HTTP_IF_NONE_MATCH=response['ETag']
+                    )
+                self.assertEqual(response.status_code, 304)
+
+    def test_changes_invalidate_etag(self):
+        """Новый пост и новый комментарий меняют ETag страниц."""
+        etags = {
+            name: self.guest.get(url)['ETag']
+            for name, url in self.urls.items()
+        }
+        Post.objects.create(text='Ещё', author=self.author, group=self.group)
+        Comment.objects.create(post=self.post, author=self.reader, text='К')
+        for name, url in self.urls.items():
+            with self.subTest(page=name):
+                self.assertNotEqual(self.guest.get(url)['ETag'], etags[name])
+
+    def test_new_etag_comes_with_new_body(self):
+        """С новым ETag приходит новый список, а не фрагмент из кэша."""
+        for name in ('group', 'profile'):
+            with self.subTest(page=name):
+                url = self.urls[name]
+                self.guest.get(url)
+                text = f'Свежий пост {name}'
+                Post.objects.create(
+                    text=text, author=self.author, group=self.group
+                )
+                response = self.guest.get(url)
+                self.assertContains(response, text)
+                response = self.guest.get(
+                    url, HTTP_IF_NONE_MATCH=response['ETag']
+                )
+                self.assertEqual(response.status_code, 304)
+
+    def test_delete_invalidates_etag(self):
+        """Удаление другого поста автора меняет ETag всех страниц."""
+        post = Post.objects.create(
+            text='Лишний', author=self.author, group=self.group
+        )
+        etags = {
+            name: self.guest.get(url)['ETag']
+            for name, url in self.urls.items()
+        }
+        post.delete()
+        for name, url in self.urls.items():
+            with self.subTest(page=name):
+                self.assertNotEqual(self.guest.get(url)['ETag'], etags[name])
+
+    def test_personalized_validators(self):
+        """У вошедшего свой ETag, без Last-Modified; подписка его меняет."""
+        url = self.urls['profile']
+        response = self.reader_client.get(url)
+        self.assertNotIn('Last-Modified', response)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertNotEqual(response['ETag'], self.guest.get(url)['ETag'])
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.assertNotEqual(
+            self.reader_client.get(url)['ETag'], response['ETag']
+        )
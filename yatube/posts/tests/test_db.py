@@ -0,0 +1,73 @@
+from unittest import mock
+
+from django.db import connection, connections, router, transaction
+from django.test import Client, SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from core.db import check_connections
+from core.routers import reading_from_replica
+from posts.models import Post
+
+
+class SqlitePragmasTests(SimpleTestCase):
+    databases = {'default'}
+
+    def test_pragmas_applied_to_connection(self):
+        """Новое соединение получает PRAGMA из SQLITE_PRAGMAS."""
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 5000)
+            cursor.execute('PRAGMA temp_store')
+            # 2 — MEMORY
+            self.assertEqual(cursor.fetchone()[0], 2)
+
+    def test_check_connections_rolls_back_leaked_transaction(self):
+        """Перед запросом брошенная транзакция откатывается."""
+        connection.ensure_connection()
+        connection.connection.execute('BEGIN')
+        check_connections(sender=None)
+        self.assertFalse(connection.connection.in_transaction)
+
+    def test_check_connections_runs_no_queries(self):
+        """Проверка живого соединения не добавляет запросов к странице."""
+        connection.ensure_connection()
+        with CaptureQueriesContext(connection) as queries:
+            check_connections(sender=None)
+        self.assertEqual(len(queries), 0)
+
+    def test_check_connections_closes_unusable(self):
+        """Сломанное соединение закрывается до запроса."""
+        connection.ensure_connection()
+        with mock.patch.object(connection, 'is_usable', return_value=False), \
+                mock.patch.object(connection, 'close') as close:
+            check_connections(sender=None)
+        close.assert_called_once_with()
+
+
+@mock.patch.dict(
+    connections['replica'].settings_dict, NAME='file:replica.db?mode=ro'
+)
+class ReadReplicaRouterTests(SimpleTestCase):
+    databases = {'default'}
+
+    def test_reads_go_to_replica_only_when_enabled(self):
+        """Чтение с реплики только внутри reading_from_replica."""
+        self.assertEqual(router.db_for_read(Post), 'default')
+        with reading_from_replica():
+            self.assertEqual(router.db_for_read(Post), 'replica')
+            self.assertEqual(router.db_for_write(Post), 'default')
+
+    def test_transaction_reads_from_default(self):
+        """Внутри транзакции чтение остаётся на default."""
+        with reading_from_replica(), transaction.atomic():
+            self.assertEqual(router.db_for_read(Post), 'default')
+
+
+class ReadReplicaMiddlewareTests(TestCase):
+    def test_write_pins_client_to_default(self):
+        """После POST клиент получает куку чтения с основной базы."""
+        client = Client()
+        response = client.get('/')
+        self.assertNotIn('primary_pin', response.cookies)
+        response = client.post('/create/')
+        self.assertIn('primary_pin', response.cookies)
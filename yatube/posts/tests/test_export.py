@@ -0,0 +1,126 @@
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts import archive
+from posts.export import records
+from posts.models import ArchivedPost, Comment, Group, Post, User
+
+
+@override_settings(EXPORT_CHUNK_SIZE=2)
+class ExportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Группа', slug='export-group', description='Описание'
+        )
+        cls.posts = [
+            Post.objects.create(
+                text=f'Пост {i}', author=cls.user, group=cls.group
+            )
+            for i in range(5)
+        ]
+        Comment.objects.create(
+            post=cls.posts[0], author=cls.user, text='Комментарий'
+        )
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def export(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_profile_export_ndjson(self):
+        """Выгрузка профиля — все посты по id и их комментарии."""
+        lines = self.export(reverse(
+            'posts:profile_export', kwargs={'username': 'author'}
+        )).splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual(
+            [row['id'] for row in rows if row['type'] == 'post'],
+            [post.pk for post in self.posts]
+        )
+        comment = next(row for row in rows if row['type'] == 'comment')
+        self.assertEqual(comment['post'], self.posts[0].pk)
+        self.assertEqual(rows[0]['group'], 'export-group')
+
+    def test_export_includes_archive(self):
+        """Архивные посты и комментарии выгружаются вместе с горячими."""
+        old = [self.posts[0].pk, self.posts[3].pk]
+        Post.objects.filter(pk__in=old).update(
+            pub_date=timezone.now() - timedelta(days=60)
+        )
+        archive.archive(timezone.now() - timedelta(days=30))
+        self.assertEqual(ArchivedPost.objects.count(), 2)
+        for url in (
+            reverse('posts:profile_export', kwargs={'username': 'author'}),
+            reverse('posts:group_export', kwargs={'slug': 'export-group'}),
+        ):
+            with self.subTest(url=url):
+                rows = [
+                    json.loads(line)
+                    for line in self.export(url).splitlines()
+                ]
+                self.assertEqual(
+                    [row['id'] for row in rows if row['type'] == 'post'],
+                    [post.pk for post in self.posts]
+                )
+                comment = next(
+                    row for row in rows if row['type'] == 'comment'
+                )
+                self.assertEqual(comment['post'], self.posts[0].pk)
+
+    def test_comments_streamed_in_parts(self):
+        """Комментарии идут частями, курсор — только после всей пачки."""
+        Comment.objects.bulk_create(
+            Comment(post=self.posts[1], author=self.user, text=str(i))
+            for i in range(5)
+        )
+        parts = list(records(self.user.posts.all()))
+        self.assertLessEqual(max(len(rows) for _, rows in parts), 2)
+        self.assertEqual(
+            [cursor for cursor, _ in parts if cursor is not None],
+            [self.posts[1].pk, self.posts[3].pk, self.posts[4].pk]
+        )
+        self.assertEqual(
+            sum(row['type'] == 'comment' for _, rows in parts for row in rows),
+            6
+        )
+
+    def test_group_export_csv_from_cursor(self):
+        """CSV после курсора — без заголовка и только новые посты."""
+        text = self.export(
+            reverse('posts:group_export', kwargs={'slug': 'export-group'}),
+            format='csv', after=self.posts[2].pk,
+        )
+        lines = text.splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].startswith(f'post,{self.posts[3].pk},'))
+
+    def test_command_resumes_from_checkpoint(self):
+        """--resume дописывает только посты после сохранённого курсора."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        output = os.path.join(directory, 'export.ndjson')
+        call_command('export_posts', author='author', output=output,
+                     stdout=StringIO())
+        new_post = Post.objects.create(text='Новый', author=self.user)
+        call_command('export_posts', author='author', output=output,
+                     resume=True, stdout=StringIO())
+        with open(output) as exported:
+            rows = [json.loads(line) for line in exported]
+        self.assertEqual(len(rows), 7)
+        self.assertEqual(rows[-1]['id'], new_post.pk)
@@ -0,0 +1,98 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core import versions
+from posts import conditional
+from posts.models import Group, Post, User
+
+
+class FeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Группа', slug='feeds', description='Описание'
+        )
+        cls.other = Group.objects.create(
+            title='Другая', slug='other', description='Описание'
+        )
+        Post.objects.create(
+            text='Пост в ленте', author=cls.author, group=cls.group
+        )
+        cls.urls = {
+            'index': reverse('posts:index_feed'),
+            'group': reverse('posts:group_feed', kwargs={'slug': 'feeds'}),
+            'author': reverse(
+                'posts:profile_feed', kwargs={'username': 'author'}
+            ),
+        }
+
+    def setUp(self):
+        cache.clear()
+        self.guest = Client()
+
+    def test_rss_and_atom(self):
+        """Ленты в RSS и Atom содержат посты своей области."""
+        for name, url in self.urls.items():
+            for feed_format, root in (('rss', b'<rss'), ('atom', b'<feed')):
+                with self.subTest(feed=name, format=feed_format):
+                    response = self.guest.get(url, {'format': feed_format})
+                    self.assertIn(root, response.content)
+                    self.assertIn('Пост в ленте'.encode(), response.content)
+        response = self.guest.get(
+            reverse('posts:group_feed', kwargs={'slug': 'other'})
+        )
+        self.assertNotIn('Пост в ленте'.encode(), response.content)
+        self.assertEqual(
+            self.guest.get(self.urls['index'], {'format': 'x'}).status_code,
+            404
+        )
+
+    def test_cached_feed_costs_one_query(self):
+        """Повторный опрос — состояние области и XML из кэша."""
+        for name, url in self.urls.items():
+            with self.subTest(feed=name):
+                etag = self.guest.get(url)['ETag']
+                with self.assertNumQueries(1):
+                    response = self.guest.get(url)
+                self.assertEqual(response.status_code, 200)
+                with self.assertNumQueries(1):
+                    response = self.guest.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+
+    def test_new_post_invalidates_its_feeds(self):
+        """Новый пост сбрасывает свои ленты и не трогает чужую группу."""
+        other_url = reverse('posts:group_feed', kwargs={'slug': 'other'})
+        etags = {
+            url: self.guest.get(url)['ETag']
+            for url in [*self.urls.values(), other_url]
+        }
+        Post.objects.create(
+            text='Новый пост', author=self.author, group=self.group
+        )
+        for url in self.urls.values():
+            with self.subTest(url=url):
+                response = self.guest.get(url)
+                self.assertNotEqual(response['ETag'], etags[url])
+                self.assertIn('Новый пост'.encode(), response.content)
+        self.assertEqual(self.guest.get(other_url)['ETag'], etags[other_url])
+
+    def test_changes_from_other_processes(self):
+        """Правка, удаление и имя автора видны без сброса кэша процесса."""
+        post = Post.objects.create(text='Черновик', author=self.author)
+        url = self.urls['author']
+        self.assertIn('Черновик'.encode(), self.guest.get(url).content)
+        # сохранение в другом процессе: без сигналов, только строка в БД
+        Post.objects.filter(pk=post.pk).update(
+            text='Исправленный', updated=timezone.now()
+        )
+        content = self.guest.get(url).content
+        self.assertIn('Исправленный'.encode(), content)
+        post.delete()
+        self.assertNotIn('Исправленный'.encode(), self.guest.get(url).content)
+        User.objects.filter(pk=self.author.pk).update(first_name='Лев')
+        versions.bump(conditional.USERS_VERSION)
+        self.assertIn('Лев'.encode(), self.guest.get(url).content)
@@ -0,0 +1,58 @@
+from django.core.cache import cache
+from django.http import Http404
+from django.test import TestCase
+
+from core import versions
+from core.models import Version
+from posts import groups
+from posts.forms import PostForm
+from posts.models import Group
+
+
+class GroupRegistryTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_lookup_without_queries(self):
+        """После загрузки реестра группы берутся без запросов."""
+        groups.all_groups()
+        with self.assertNumQueries(0):
+            self.assertEqual(groups.get_group(self.group.pk), self.group)
+            self.assertEqual(
+                groups.get_group_by_slug_or_404('test-slug'), self.group
+            )
+            PostForm()['group'].as_widget()
+
+    def test_unknown_slug_raises_404(self):
+        with self.assertRaises(Http404):
+            groups.get_group_by_slug_or_404('unknown')
+
+    def test_group_save_invalidates_registry(self):
+        """Новая группа видна сразу после сохранения."""
+        groups.all_groups()
+        group = Group.objects.create(title='Новая', slug='new-slug')
+        self.assertEqual(groups.get_group_by_slug_or_404('new-slug'), group)
+
+    def test_change_in_other_process_reloads_registry(self):
+        """Группа, изменённая другим процессом, видна после смены версии."""
+        groups.all_groups()
+        # другой процесс: запись в БД и новая версия, сигналы здесь не
+        # срабатывают, а копия версий в нашем кэше истекает
+        Group.objects.filter(pk=self.group.pk).update(title='Другая')
+        Version.objects.filter(name=groups.VERSION).update(value='other')
+        cache.delete(versions.CACHE_KEY)
+        self.assertEqual(groups.get_group(self.group.pk).title, 'Другая')
+
+    def test_form_accepts_group(self):
+        form = PostForm(data={'text': 'Текст', 'group': self.group.pk})
+        self.assertTrue(form.is_valid())
+        self.assertEqual(form.cleaned_data['group'], self.group)
@@ -0,0 +1,97 @@
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts import live
+from posts.models import Group, Post, User
+
+
+class LiveTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Группа', slug='live', description='Описание'
+        )
+        cls.old = Post.objects.create(text='Старый', author=cls.author)
+
+    def setUp(self):
+        self.guest = Client()
+
+    def test_since_returns_only_new_cards(self):
+        """since отдаёт посты новее курсора и сдвигает курсор."""
+        new = Post.objects.create(
+            text='Новый', author=self.author, group=self.group
+        )
+        url = reverse('posts:since')
+        data = self.guest.get(url, {'after': self.old.pk}).json()
+        self.assertEqual(data['ids'], [new.pk])
+        self.assertEqual(data['cursor'], new.pk)
+        self.assertIn('Новый', data['cards'][0])
+        data = self.guest.get(url, {'after': new.pk}).json()
+        self.assertEqual(data, {'ids': [], 'cursor': new.pk, 'cards': []})
+        data = self.guest.get(
+            url, {'feed': 'group', 'group': 'live', 'after': 0}
+        ).json()
+        self.assertEqual(data['ids'], [new.pk])
+
+    def test_bad_requests(self):
+        """Неизвестная лента и курсор — 400, лента подписок гостю — 403."""
+        url = reverse('posts:since')
+        self.assertEqual(
+            self.guest.get(url, {'feed': 'nope'}).status_code, 400
+        )
+        self.assertEqual(
+            self.guest.get(url, {'after': 'x'}).status_code, 400
+        )
+        self.assertEqual(
+            self.guest.get(url, {'feed': 'follow'}).status_code, 403
+        )
+
+    def test_page_polls_without_stream_by_default(self):
+        """По умолчанию страница опрашивает since, а потока SSE нет."""
+        response = self.guest.get(reverse('posts:index'))
+        self.assertContains(response, 'data-check="30000"')
+        self.assertNotContains(response, 'data-stream=')
+        self.assertEqual(
+            self.guest.get(reverse('posts:live')).status_code, 404
+        )
+
+    @override_settings(LIVE_SSE_ENABLED=True, LIVE_MAX_STREAMS=1)
+    def test_streams_capped(self):
+        """Сверх LIVE_MAX_STREAMS — 503, закрытый поток освобождает место."""
+        first = self.guest.get(reverse('posts:live'))
+        self.assertEqual(first.status_code, 200)
+        second = self.guest.get(reverse('posts:live'))
+        self.assertEqual(second.status_code, 503)
+        self.assertIn('Retry-After', second)
+        first.close()
+        third = self.guest.get(reverse('posts:live'))
+        self.assertEqual(third.status_code, 200)
+        third.close()
+
+    @override_settings(LIVE_SSE_ENABLED=True, LIVE_POLL_INTERVAL=0.01,
+                       LIVE_STREAM_TIMEOUT=0.05)
+    def test_stream_sends_new_ids(self):
+        """Поток SSE присылает id новых постов и Last-Event-ID."""
+        new = Post.objects.create(text='Новый', author=self.author)
+        response = self.guest.get(
+            reverse('posts:live'), HTTP_LAST_EVENT_ID=str(self.old.pk)
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = b''.join(response.streaming_content).decode()
+        self.assertIn(
+            f'id: {new.pk}\nevent: posts\ndata: {{"ids": [{new.pk}]}}', body
+        )
+        self.assertEqual(body.count('event: posts'), 1)
+        response.close()
+
+    def test_publish_wakes_matching_subscribers(self):
+        """Пост будит только подписчиков своей ленты."""
+        post = Post(text='Пост', author=self.author, group=self.group)
+        with live.subscribe(lambda p: p.group_id == self.group.pk) as group, \
+                live.subscribe(lambda p: p.group_id is None) as other:
+            live.publish(post)
+            self.assertTrue(group.is_set())
+            self.assertFalse(other.is_set())
+        self.assertEqual(live._subscribers, {})
@@ -0,0 +1,89 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+
+from core import metrics
+
+TEMP_METRICS_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(METRICS_DIR=TEMP_METRICS_DIR)
+class MetricsTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_METRICS_DIR, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        metrics._stats.clear()
+
+    def test_request_recorded_per_view(self):
+        """Запрос к странице попадает в гистограмму своего view."""
+        Client().get('/')
+        stats = metrics.collect()['posts:index']
+        self.assertEqual(sum(stats['request'][:-1]), 1)
+        self.assertGreater(stats['queries'], 0)
+        self.assertGreater(stats['template'][-1], 0)
+
+    def test_metrics_endpoint(self):
+        Client().get('/')
+        response = Client().get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(
+            'yatube_request_seconds_count{view="posts:index"} 1',
+            response.content.decode()
+        )
+
+    def test_metrics_endpoint_hidden_from_outside(self):
+        response = Client(REMOTE_ADDR='10.0.0.1').get('/metrics')
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(METRICS_CLIENT_IP_HEADER='HTTP_X_FORWARDED_FOR')
+    def test_metrics_endpoint_behind_proxy(self):
+        """За прокси адрес берётся из заголовка, который дописал прокси."""
+        client = Client(REMOTE_ADDR='10.0.0.2')
+        response = client.get(
+            '/metrics', HTTP_X_FORWARDED_FOR='10.0.0.1, 127.0.0.1'
+        )
+        self.assertEqual(response.status_code, 200)
+        response = client.get(
+            '/metrics', HTTP_X_FORWARDED_FOR='127.0.0.1, 10.0.0.1'
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_dead_process_files_pruned(self):
+        """Файл завершившегося процесса не суммируется и удаляется."""
+        # pid больше pid_max Linux: такого процесса нет
+        path = os.path.join(TEMP_METRICS_DIR, '99999999.json')
+        with open(path, 'w') as stats_file:
+            json.dump({'dead': metrics._empty_view_stats()}, stats_file)
+        self.assertNotIn('dead', metrics.collect())
+        self.assertFalse(os.path.exists(path))
+
+    @override_settings(METRICS_FLUSH_INTERVAL=0)
+    def test_concurrent_flushes(self):
+        """Потоки, сбрасывающие метрики одновременно, не мешают друг другу."""
+        errors = []
+
+        def work():
+            try:
+                for _ in range(50):
+                    metrics.observe('threads', 0.01, metrics.RequestMetrics())
+            except OSError as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        stats = metrics.collect()['threads']
+        self.assertEqual(sum(stats['request'][:-1]), 8 * 50)
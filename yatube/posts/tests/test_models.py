@@ -1,4 +1,8 @@
+from io import StringIO
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.test import TestCase
 
 from posts.models import Group, Post
@@ -29,3 +33,36 @@ class PostModelTest(TestCase):
         title = group.title
         self.assertEqual(expected_object_name, str(post))
         self.assertEqual(str(group), title)
+
+
+class PostExcerptTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='excerpt')
+
+    def test_excerpt_computed_on_save(self):
+        """Короткий текст целиком попадает в excerpt."""
+        post = Post.objects.create(author=self.user, text='Короткий пост')
+        self.assertEqual(post.excerpt, 'Короткий пост')
+        self.assertFalse(post.is_truncated)
+
+    def test_long_text_truncated(self):
+        post = Post.objects.create(author=self.user, text='слово ' * 1000)
+        self.assertLessEqual(
+            len(post.excerpt), settings.POST_EXCERPT_LENGTH
+        )
+        self.assertTrue(post.is_truncated)
+
+    def test_text_ending_with_ellipsis_is_not_truncated(self):
+        """Многоточие в конце самого текста — не признак обрезки."""
+        post = Post.objects.create(author=self.user, text='Ну что ж…')
+        self.assertFalse(post.is_truncated)
+
+    def test_backfill_command(self):
+        """Команда заполняет excerpt у постов, созданных через bulk_create."""
+        Post.objects.bulk_create(
+            Post(author=self.user, text=f'Пост {i}') for i in range(5)
+        )
+        call_command('backfill_excerpts', batch_size=2, stdout=StringIO())
+        self.assertFalse(Post.objects.filter(excerpt='').exists())
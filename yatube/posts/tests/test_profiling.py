@@ -0,0 +1,44 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+
+TEMP_PROFILING_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+User = get_user_model()
+
+
+@override_settings(PROFILING_ENABLED=True, PROFILING_DIR=TEMP_PROFILING_DIR)
+class ProfilingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.staff = User.objects.create_user(username='staff', is_staff=True)
+        cls.user = User.objects.create_user(username='user')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_PROFILING_DIR, ignore_errors=True)
+
+    def setUp(self):
+        shutil.rmtree(TEMP_PROFILING_DIR, ignore_errors=True)
+
+    def get_profile(self, user):
+        client = Client()
+        client.force_login(user)
+        client.get(f'/profile/{user.username}/', HTTP_X_PROFILE='1')
+        if not os.path.isdir(TEMP_PROFILING_DIR):
+            return []
+        return os.listdir(TEMP_PROFILING_DIR)
+
+    def test_staff_header_writes_profile(self):
+        """Заголовок от staff-пользователя включает профилирование."""
+        files = self.get_profile(self.staff)
+        self.assertEqual(len(files), 1)
+        self.assertTrue(files[0].startswith('posts-profile-'))
+
+    def test_header_ignored_for_regular_user(self):
+        self.assertEqual(self.get_profile(self.user), [])
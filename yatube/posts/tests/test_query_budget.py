@@ -0,0 +1,36 @@
+from django.test import Client, TestCase
+
+from posts.models import Group, Post, User
+from posts.tests.query_budget import QUERY_BUDGETS, measure
+
+
+class QueryBudgetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(title='Группа', slug='budget')
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group, text='Пост'
+        )
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.reader)
+        self.data = {
+            'author': self.author,
+            'reader': self.reader,
+            'group': self.group,
+            'post': self.post,
+        }
+
+    def test_views_fit_query_budget(self):
+        """Число запросов не растёт с числом строк и укладывается в бюджет."""
+        for view_name in QUERY_BUDGETS:
+            with self.subTest(view_name=view_name):
+                small, large, budget = measure(
+                    self.client, self.data, view_name
+                )
+                self.assertEqual(small, large)
+                self.assertLessEqual(large, budget)
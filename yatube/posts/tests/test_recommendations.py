@@ -0,0 +1,86 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import versions
+from core.models import Version
+from posts import recommendations
+from posts.models import Follow, Recommendation, User
+from posts.recommendations import FollowGraph, compute, csr
+
+
+@override_settings(RECOMMENDATIONS_PER_USER=3)
+class RecommendationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.users = {
+            name: User.objects.create_user(username=name)
+            for name in ('reader', 'friend', 'fof', 'fan', 'alike', 'new')
+        }
+        for user, author in (
+            ('reader', 'friend'),
+            # друг читателя читает fof
+            ('friend', 'fof'),
+            # fan читает и friend, и alike: авторы похожи
+            ('fan', 'friend'),
+            ('fan', 'alike'),
+        ):
+            Follow.objects.create(
+                user=cls.users[user], author=cls.users[author]
+            )
+
+    def suggestions(self, name):
+        return [
+            author.username for author in User.objects.filter(
+                pk__in=Recommendation.objects.filter(
+                    user=self.users[name]
+                ).values('author')
+            )
+        ]
+
+    def test_csr(self):
+        """Соседи вершины — срез indices между indptr[i] и indptr[i+1]."""
+        indptr, indices = csr([0, 2, 0], [1, 0, 2], 3)
+        self.assertEqual(list(indptr), [0, 2, 2, 3])
+        self.assertEqual(list(indices), [1, 2, 0])
+
+    def test_friends_of_friends_and_co_follows(self):
+        """Друзья друзей и похожие авторы, без себя и уже прочитанных."""
+        results = dict(compute(FollowGraph.load()))
+        ids = {user.pk: name for name, user in self.users.items()}
+        reader = [ids[pk] for pk, _ in results[self.users['reader'].pk]]
+        self.assertCountEqual(reader, ['fof', 'alike'])
+        # без подписок — самые читаемые авторы
+        new = [ids[pk] for pk, _ in results[self.users['new'].pk]]
+        self.assertEqual(new[0], 'friend')
+
+    def test_command_replaces_table_and_profile_shows_it(self):
+        """Команда заменяет таблицу, профиль показывает подборку."""
+        for _ in range(2):
+            call_command('build_recommendations', stdout=StringIO())
+        self.assertCountEqual(self.suggestions('reader'), ['fof', 'alike'])
+        client = Client()
+        client.force_login(self.users['reader'])
+        response = client.get(
+            reverse('posts:profile', kwargs={'username': 'friend'})
+        )
+        self.assertEqual(
+            [rec.author.username for rec in response.context[
+                'recommendations'
+            ]][:1],
+            ['alike'],
+        )
+
+    def test_build_changes_shared_version(self):
+        """Версия подборки в БД: другой процесс видит новую сборку."""
+        before = recommendations.current_version()
+        call_command('build_recommendations', stdout=StringIO())
+        stored = Version.objects.get(name=recommendations.VERSION).value
+        self.assertNotEqual(stored, before)
+        # локальная память версий другого процесса истекла
+        cache.delete(versions.CACHE_KEY)
+        self.assertEqual(recommendations.current_version(), stored)
@@ -0,0 +1,74 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+
+from posts.models import Post, User
+from posts.rendering import render, render_many
+
+
+class RenderingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(
+            text='Привет, @author и @nobody!\n\nhttp://example.com',
+            author=cls.author,
+        )
+
+    def test_render(self):
+        """Текст экранируется, ссылки и упоминания становятся <a>."""
+        html = render(
+            '<script>@bob</script> https://example.com\nпочта a@b.ru\n\n'
+            'Абзац @bob.',
+            {'bob'}
+        )
+        self.assertNotIn('<script>', html)
+        self.assertIn('&lt;script&gt;<a href="/profile/bob/">@bob</a>', html)
+        self.assertIn('rel="nofollow"', html)
+        self.assertIn('<br>', html)
+        self.assertIn('<p>Абзац <a href="/profile/bob/">@bob</a>.</p>', html)
+        self.assertNotIn('/profile/b.ru/', html)
+
+    def test_render_many_looks_up_names_once(self):
+        """Имена из всех текстов проверяются одним запросом."""
+        with self.assertNumQueries(1):
+            rendered = render_many(['@author', '@nobody', '@author @reader'])
+        self.assertIn('/profile/author/', rendered[0])
+        self.assertNotIn('<a', rendered[1])
+
+    def test_post_detail_outputs_stored_html(self):
+        """save() хранит HTML, страница поста выводит его как есть."""
+        self.assertIn('/profile/author/', self.post.text_html)
+        self.assertNotIn('/profile/nobody/', self.post.text_html)
+        response = Client().get(f'/posts/{self.post.pk}/')
+        self.assertContains(response, '<a href="/profile/author/">@author</a>')
+        self.assertContains(response, 'href="http://example.com"')
+
+    @override_settings(POST_EXCERPT_LENGTH=20)
+    def test_list_card_outputs_stored_excerpt_html(self):
+        """Карточка в списке — начало HTML со ссылками и закрытыми тегами."""
+        cache.clear()
+        post = Post.objects.create(
+            text='Привет, @author!\n\nОчень длинный второй абзац текста',
+            author=self.author,
+        )
+        self.assertIn('/profile/author/', post.excerpt_html)
+        self.assertTrue(post.excerpt_html.endswith('</p>'))
+        self.assertLess(len(post.excerpt_html), len(post.text_html))
+        response = Client().get('/')
+        self.assertContains(response, '<a href="/profile/author/">@author</a>')
+        self.assertContains(response, 'читать далее')
+
+    def test_render_posts_command(self):
+        """render_posts --all перерисовывает посты по новым правилам."""
+        User.objects.create_user(username='nobody')
+        call_command('render_posts', stdout=StringIO())
+        self.post.refresh_from_db()
+        self.assertNotIn('/profile/nobody/', self.post.text_html)
+        call_command('render_posts', '--all', stdout=StringIO())
+        self.post.refresh_from_db()
+        self.assertIn('/profile/nobody/', self.post.text_html)
+        self.assertEqual(self.post.version, 1)
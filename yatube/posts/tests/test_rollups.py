@@ -0,0 +1,133 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.db.models.signals import post_init
+from django.test import Client, TestCase
+from django.utils import timezone
+
+from posts import rollups
+from posts.models import (
+    Comment, DailyAuthorStats, DailyGroupStats, Follow, Group, Post,
+    RollupWatermark, User
+)
+
+
+class RollupTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='stats', description='Описание'
+        )
+        cls.post = Post.objects.create(
+            text='Пост', author=cls.author, group=cls.group
+        )
+        Post.objects.create(text='Без группы', author=cls.author)
+        Comment.objects.create(post=cls.post, author=cls.reader, text='!')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def stats(self):
+        today = timezone.localdate()
+        return {
+            'group': dict(
+                DailyGroupStats.objects.filter(day=today)
+                .values_list('group__slug', 'posts')
+            ),
+            'author': set(
+                DailyAuthorStats.objects.filter(day=today).values_list(
+                    'author__username', 'posts', 'comments', 'followers'
+                )
+            ),
+        }
+
+    def test_roll_up_is_incremental(self):
+        """Новые строки прибавляются, учтённые второй раз не считаются."""
+        self.assertEqual(
+            rollups.roll_up(batch_size=1),
+            {'post': 2, 'comment': 1, 'follow': 1}
+        )
+        self.assertEqual(rollups.roll_up(), {
+            'post': 0, 'comment': 0, 'follow': 0
+        })
+        Post.objects.create(text='Ещё', author=self.author, group=self.group)
+        self.assertEqual(rollups.roll_up()['post'], 1)
+        self.assertEqual(self.stats(), {
+            'group': {'stats': 2, None: 1},
+            'author': {('author', 3, 0, 1), ('reader', 0, 1, 0)},
+        })
+        incremental = self.stats()
+        rollups.rebuild()
+        self.assertEqual(self.stats(), incremental)
+
+    def test_moved_watermark_skips_batch(self):
+        """Пачку, которую уже учёл параллельный запуск, второй пропускает."""
+        rollups.roll_up()
+        counted = self.stats()
+        # второй запуск прочитал отметку до того, как первый её сдвинул
+        stale = (RollupWatermark(source='post', last_id=0), False)
+        with mock.patch.object(
+            RollupWatermark.objects, 'get_or_create', return_value=stale
+        ):
+            self.assertEqual(rollups.roll_up_source('post', batch_size=1), 0)
+        self.assertEqual(self.stats(), counted)
+
+    def test_merge_reads_only_batch_rows(self):
+        """Строки итогов других групп и авторов за те же дни не читаются."""
+        rollups.roll_up()
+        other = User.objects.create_user(username='other')
+        Post.objects.create(text='Другой', author=other)
+        loaded = []
+
+        def count_rows(instance, **kwargs):
+            loaded.append(instance)
+
+        post_init.connect(count_rows, sender=DailyAuthorStats)
+        try:
+            rollups.roll_up_source('post')
+        finally:
+            post_init.disconnect(count_rows, sender=DailyAuthorStats)
+        # только строка нового автора: вставленная и прочитанная после
+        self.assertEqual(len(loaded), 2)
+
+    def test_merge_adds_to_row_inserted_concurrently(self):
+        """Строку, вставленную параллельным запуском, пачка дополняет."""
+        rollups.roll_up()
+        Post.objects.create(text='Ещё', author=self.author, group=self.group)
+        lookup = rollups._lookup
+        calls = []
+
+        def stale_first_lookup(model, keys):
+            # первая выборка прошла до вставки строки другим запуском
+            calls.append(model)
+            if calls.count(model) == 1:
+                return {}
+            return lookup(model, keys)
+
+        with mock.patch.object(rollups, '_lookup', stale_first_lookup):
+            self.assertEqual(rollups.roll_up_source('post'), 1)
+        self.assertEqual(self.stats()['group'], {'stats': 2, None: 1})
+
+    def test_old_pub_date_goes_to_its_day(self):
+        """Пост с прошлой датой учитывается в своём дне."""
+        yesterday = timezone.now() - timedelta(days=1)
+        Post.objects.filter(pk=self.post.pk).update(pub_date=yesterday)
+        rollups.roll_up()
+        row = DailyGroupStats.objects.get(group=self.group, posts=1)
+        self.assertEqual(row.day, timezone.localdate(yesterday))
+
+    def test_admin_dashboard(self):
+        """Итоги видны в админке и только для чтения."""
+        rollups.roll_up()
+        admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password'
+        )
+        client = Client()
+        client.force_login(admin)
+        for url in ('/admin/posts/dailygroupstats/',
+                    '/admin/posts/dailyauthorstats/'):
+            with self.subTest(url=url):
+                response = client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotContains(response, 'addlink')
@@ -0,0 +1,66 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+
+from core import metrics
+from core.slow_queries import fingerprint
+
+
+class FingerprintTests(SimpleTestCase):
+    def test_literals_and_params_normalized(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE a = 5 AND b = 'x'"),
+            fingerprint('SELECT *  FROM t\nWHERE a = %s AND b = %s'),
+        )
+
+    def test_in_lists_collapsed(self):
+        self.assertEqual(
+            fingerprint('SELECT * FROM t WHERE id IN (%s, %s, %s)'),
+            'SELECT * FROM t WHERE id IN (...)',
+        )
+
+
+@override_settings(SLOW_QUERY_THRESHOLD=0)
+class SlowQueryLogTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_slow_queries_logged_with_view_and_plan(self):
+        """Запросы выше порога пишутся в журнал с view и планом."""
+        with self.assertLogs('yatube.slow_queries') as logs:
+            Client().get('/')
+        records = [json.loads(record.getMessage()) for record in logs.records]
+        selects = [
+            record for record in records
+            if record['sql'].startswith('SELECT')
+        ]
+        self.assertTrue(selects)
+        self.assertEqual(selects[0]['view'], 'posts:index')
+        self.assertTrue(selects[0]['plan'])
+
+    def test_explain_not_counted_in_metrics(self):
+        """EXPLAIN журнала не попадает в число запросов страницы."""
+        counts = []
+        for threshold in (60, 0):
+            cache.clear()
+            metrics._stats.clear()
+            with override_settings(SLOW_QUERY_THRESHOLD=threshold):
+                Client().get('/')
+            counts.append(metrics._stats['posts:index']['queries'])
+        self.assertEqual(counts[0], counts[1])
+
+    def test_report_command(self):
+        with self.assertLogs('yatube.slow_queries') as logs:
+            Client().get('/')
+        with tempfile.TemporaryDirectory() as temp_dir:
+            log_path = os.path.join(temp_dir, 'slow.log')
+            with open(log_path, 'w') as log:
+                log.write('\n'.join(r.getMessage() for r in logs.records))
+            out = StringIO()
+            call_command('slow_queries_report', log=log_path, stdout=out)
+        self.assertIn('posts:index', out.getvalue())
@@ -0,0 +1,102 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts import trending
+from posts.models import (
+    Comment, Follow, Group, Post, TrendingDecay, User,
+)
+
+
+@override_settings(TRENDING_COMMENT_WEIGHT=1.0, TRENDING_FOLLOW_WEIGHT=0.5,
+                   TRENDING_HALF_LIFE=60, TRENDING_MIN_SCORE=0.3)
+class TrendingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='trend', description='Описание'
+        )
+        cls.quiet = Post.objects.create(text='Тихий', author=cls.author)
+        cls.hot = Post.objects.create(
+            text='Обсуждаемый', author=cls.reader, group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def score(self, post):
+        post.refresh_from_db(fields=['score'])
+        return post.score
+
+    def test_comments_and_follows_bump_score(self):
+        """Комментарий поднимает пост, подписка — посты автора."""
+        Comment.objects.create(post=self.hot, author=self.author, text='!')
+        self.assertEqual(self.score(self.hot), 1.0)
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.assertEqual(self.score(self.quiet), 0.5)
+        self.assertEqual(self.score(self.hot), 1.0)
+
+    def test_decay_halves_and_drops_low_scores(self):
+        """Затухание за период полураспада, слабый счёт обнуляется."""
+        Post.objects.filter(pk=self.hot.pk).update(score=2.0)
+        Post.objects.filter(pk=self.quiet.pk).update(score=0.5)
+        TrendingDecay.objects.create(
+            decayed_at=timezone.now() - timedelta(seconds=60)
+        )
+        call_command('decay_trending', stdout=StringIO())
+        self.assertAlmostEqual(self.score(self.hot), 1.0, places=2)
+        self.assertEqual(self.score(self.quiet), 0)
+
+    def test_decay_counts_from_last_run(self):
+        """Прошедшее время — от прошлого затухания, не от расписания."""
+        Post.objects.filter(pk=self.hot.pk).update(score=4.0)
+        now = timezone.now()
+        TrendingDecay.objects.create(decayed_at=now - timedelta(seconds=120))
+        self.assertEqual(trending.decay_due(now)[0], 120)
+        self.assertAlmostEqual(self.score(self.hot), 1.0)
+        # повторный запуск за тот же промежуток ничего не меняет
+        self.assertEqual(trending.decay_due(now), (0, 0))
+        self.assertAlmostEqual(self.score(self.hot), 1.0)
+        self.assertEqual(TrendingDecay.objects.get().decayed_at, now)
+
+    def test_trending_pages(self):
+        """Популярное упорядочено по счёту, в группе — только её посты."""
+        Post.objects.filter(pk=self.hot.pk).update(score=2.0)
+        Post.objects.filter(pk=self.quiet.pk).update(score=1.0)
+        response = Client().get(reverse('posts:trending'))
+        self.assertEqual(
+            list(response.context['posts']), [self.hot, self.quiet]
+        )
+        response = Client().get(
+            reverse('posts:group_trending', kwargs={'slug': 'trend'})
+        )
+        self.assertEqual(list(response.context['posts']), [self.hot])
+
+    def test_rebuild_from_recent_comments(self):
+        """Пересчёт с нуля учитывает комментарии, а не старый счёт."""
+        Post.objects.filter(pk=self.quiet.pk).update(score=5.0)
+        Comment.objects.create(post=self.hot, author=self.author, text='!')
+        Post.objects.filter(pk=self.hot.pk).update(score=0)
+        self.assertEqual(trending.rebuild(), 1)
+        self.assertAlmostEqual(self.score(self.hot), 1.0, places=2)
+        self.assertEqual(self.score(self.quiet), 0)
+
+    def test_rebuild_is_atomic(self):
+        """Сбой при записи нового счёта оставляет старый."""
+        Post.objects.filter(pk=self.quiet.pk).update(score=5.0)
+        Comment.objects.create(post=self.hot, author=self.author, text='!')
+        with mock.patch.object(
+            Post.objects, 'bulk_update', side_effect=RuntimeError
+        ), self.assertRaises(RuntimeError):
+            trending.rebuild()
+        self.assertEqual(self.score(self.quiet), 5.0)
+        self.assertFalse(TrendingDecay.objects.exists())
@@ -0,0 +1,125 @@
+"""Популярные посты по Post.score.
+
+Счёт поддерживается инкрементально: новый комментарий прибавляет посту
+TRENDING_COMMENT_WEIGHT, новый подписчик — TRENDING_FOLLOW_WEIGHT каждому
+посту автора за последние TRENDING_FOLLOW_WINDOW секунд (posts.signals).
+Прибавка — UPDATE с F(), без чтения строки и гонок между запросами.
+
+Затухание — команда decay_trending раз в TRENDING_DECAY_INTERVAL секунд:
+счёт умножается на 0.5 ** (прошло / TRENDING_HALF_LIFE) одним UPDATE
+на диапазон id, а счёт ниже TRENDING_MIN_SCORE обнуляется, чтобы
+выпасть из индекса популярных (score > 0). Сколько прошло, считается от
+времени прошлого затухания в TrendingDecay, а не от расписания: пропущенный
+или запоздавший запуск не меняет скорость затухания.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Max, Min
+from django.utils import timezone
+
+from .models import Comment, Post, TrendingDecay
+
+
+def bump(posts, amount):
+    return posts.update(score=F('score') + amount)
+
+
+def bump_post(post_id):
+    return bump(
+        Post.objects.filter(pk=post_id), settings.TRENDING_COMMENT_WEIGHT
+    )
+
+
+def bump_author(author_id):
+    since = timezone.now() - timedelta(
+        seconds=settings.TRENDING_FOLLOW_WINDOW
+    )
+    return bump(
+        Post.objects.filter(author_id=author_id, pub_date__gte=since),
+        settings.TRENDING_FOLLOW_WEIGHT,
+    )
+
+
+def trending_posts(posts=None):
+    """Популярные посты; порядок (-score, -id) читается прямо из индекса."""
+    posts = Post.objects.all() if posts is None else posts
+    return posts.filter(score__gt=0).order_by('-score', '-pk')
+
+
+def decay_factor(elapsed):
+    return 0.5 ** (elapsed / settings.TRENDING_HALF_LIFE)
+
+
+def decay(elapsed, batch_size=5000):
+    """Затухание за elapsed секунд; число затронутых постов."""
+    factor = decay_factor(elapsed)
+    floor = settings.TRENDING_MIN_SCORE / factor
+    scored = Post.objects.filter(score__gt=0)
+    bounds = scored.aggregate(first=Min('pk'), last=Max('pk'))
+    if bounds['first'] is None:
+        return 0
+    total = 0
+    for start in range(bounds['first'], bounds['last'] + 1, batch_size):
+        batch = scored.filter(pk__gte=start, pk__lt=start + batch_size)
+        # короткие транзакции: прибавки из запросов не ждут всю таблицу
+        with transaction.atomic():
+            total += batch.filter(score__lt=floor).update(score=0)
+            total += batch.update(score=F('score') * factor)
+    return total
+
+
+def claim_elapsed(now):
+    """Секунды с прошлого затухания; отметка сразу сдвигается на now.
+
+    Отметка забирается под блокировкой строки, поэтому два запуска не
+    применят один и тот же промежуток дважды. Первый запуск затухает на
+    TRENDING_DECAY_INTERVAL.
+    """
+    with transaction.atomic():
+        state = TrendingDecay.objects.select_for_update().first()
+        if state is None:
+            TrendingDecay.objects.create(decayed_at=now)
+            return settings.TRENDING_DECAY_INTERVAL
+        elapsed = (now - state.decayed_at).total_seconds()
+        if elapsed > 0:
+            state.decayed_at = now
+            state.save(update_fields=['decayed_at'])
+        return elapsed
+
+
+def decay_due(now=None, batch_size=5000):
+    """Затухание за время с прошлого запуска; (прошло секунд, постов)."""
+    elapsed = claim_elapsed(now or timezone.now())
+    if elapsed <= 0:
+        return elapsed, 0
+    return elapsed, decay(elapsed, batch_size)
+
+
+def rebuild(now=None):
+    """Счёт заново по комментариям за TRENDING_FOLLOW_WINDOW секунд.
+
+    Подписки времени не хранят и в пересчёт не входят. Обнуление и
+    запись одной транзакцией: лента не видит пустых популярных. Счёт
+    затухает до now, и отметка затухания ставится на now.
+    """
+    now = now or timezone.now()
+    window = timedelta(seconds=settings.TRENDING_FOLLOW_WINDOW)
+    scores = {}
+    comments = Comment.objects.filter(
+        created__gte=now - window, post__isnull=False
+    ).values_list('post_id', 'created')
+    for post_id, created in comments.iterator():
+        age = (now - created).total_seconds()
+        scores[post_id] = scores.get(post_id, 0) + (
+            settings.TRENDING_COMMENT_WEIGHT * decay_factor(age)
+        )
+    posts = [Post(pk=pk, score=score) for pk, score in scores.items()]
+    with transaction.atomic():
+        Post.objects.filter(score__gt=0).update(score=0)
+        # в SQLite не больше 999 параметров на запрос
+        Post.objects.bulk_update(posts, ['score'], batch_size=300)
+        TrendingDecay.objects.all().delete()
+        TrendingDecay.objects.create(decayed_at=now)
+    return len(posts)
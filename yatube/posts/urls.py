@@ -6,8 +6,18 @@ app_name = 'posts'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('feed/', views.index_feed, name='index_feed'),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
+    path('group/<slug:slug>/export/', views.group_export,
+         name='group_export'),
+    path('group/<slug:slug>/feed/', views.group_feed, name='group_feed'),
+    path('group/<slug:slug>/trending/', views.group_trending,
+         name='group_trending'),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path('profile/<str:username>/export/', views.profile_export,
+         name='profile_export'),
+    path('profile/<str:username>/feed/', views.profile_feed,
+         name='profile_feed'),
     path('posts/<int:post_id>/', views.post_detail,
          name='post_detail'),
     path('create/', views.post_create, name='post_create'),
@@ -16,6 +26,9 @@ urlpatterns = [
     path('posts/<int:post_id>/comment/', views.add_comment,
          name='add_comment'),
     path('follow/', views.follow_index, name='follow_index'),
+    path('trending/', views.trending, name='trending'),
+    path('since/', views.since, name='since'),
+    path('live/', views.live, name='live'),
     path('profile/<str:username>/follow/',
          views.profile_follow, name='profile_follow'),
     path(
@@ -1,15 +1,35 @@
 from django.shortcuts import render, get_object_or_404, redirect
+from django.conf import settings
+from django.http import (
+    Http404, HttpResponse, HttpResponseBadRequest, HttpResponseForbidden,
+    JsonResponse, StreamingHttpResponse,
+)
 from django.core.paginator import Paginator
 from django.contrib.auth.decorators import login_required
-from django.views.decorators.cache import cache_page
+from django.core.exceptions import PermissionDenied
+from django.db import DatabaseError, transaction
 
+from core.cache import single_flight_cache_page
 from yatube.settings import POSTS_ON_PAGE
 from .models import get_user_model
-from .models import Group
 from .models import User
 from .models import Post
+from .models import ArchivedPost
 from .models import Follow
 from .forms import PostForm, CommentForm
+from .export import export_response
+from .feeds import AuthorFeed, GroupFeed, IndexFeed, cached_feed
+from .conditional import (
+    conditional_page, group_page_state, post_page_state, profile_page_state
+)
+from .groups import get_group, get_group_by_slug_or_404
+from .live import (
+    acquire_stream, event_stream, parse_cursor, resolve_feed, since_posts,
+)
+from .trending import trending_posts
+from .recommendations import recommendations_for
+from .archive import Timeline, archived_count, get_post_or_archived_or_404
+from .templatetags.post_filters import post_cards
 
 
 def paginate(request, post_list):
@@ -18,9 +38,15 @@ def paginate(request, post_list):
     return paginator.get_page(page_number)
 
 
-@cache_page(60 * 15)
+@single_flight_cache_page(60 * 15)
 def index(request):
-    post_list = Post.objects.all()
+    post_list = Timeline(
+        Post.objects.select_related('author').defer('text', 'text_html'),
+        ArchivedPost.objects.select_related('author').defer(
+            'text', 'text_html'
+        ),
+        'all',
+    )
     page_obj = paginate(request, post_list)
     template = 'posts/index.html'
     context = {
@@ -30,10 +56,46 @@ def index(request):
     return render(request, template, context)
 
 
+@single_flight_cache_page(60)
+def trending(request):
+    post_list = trending_posts().select_related('author').defer(
+        'text', 'text_html'
+    )
+    page_obj = paginate(request, post_list)
+    context = {
+        'page_obj': page_obj,
+        'posts': page_obj.object_list,
+        'trending': True,
+    }
+    return render(request, 'posts/trending.html', context)
+
+
+@single_flight_cache_page(60)
+def group_trending(request, slug):
+    group = get_group_by_slug_or_404(slug)
+    post_list = trending_posts(group.posts.all()).select_related(
+        'author'
+    ).defer('text', 'text_html')
+    page_obj = paginate(request, post_list)
+    context = {
+        'group': group,
+        'page_obj': page_obj,
+        'posts': page_obj.object_list,
+    }
+    return render(request, 'posts/trending.html', context)
+
+
+@conditional_page(group_page_state)
 def group_posts(request, slug):
     template = 'posts/group_list.html'
-    group = get_object_or_404(Group, slug=slug)
-    post_list = group.posts.all()
+    group = get_group_by_slug_or_404(slug)
+    post_list = Timeline(
+        group.posts.select_related('author').defer('text', 'text_html'),
+        group.archived_posts.select_related('author').defer(
+            'text', 'text_html'
+        ),
+        f'group:{group.pk}',
+    )
     page_obj = paginate(request, post_list)
     context = {
         'group': group,
@@ -43,49 +105,86 @@ def group_posts(request, slug):
     return render(request, template, context)
 
 
+@conditional_page(profile_page_state)
 def profile(request, username):
     template = 'posts/profile.html'
     author = get_user_model()
     user = get_object_or_404(author, username=username)
-    posts = user.posts.all()
+    posts = Timeline(
+        user.posts.select_related('author').defer('text', 'text_html'),
+        user.archived_posts.select_related('author').defer(
+            'text', 'text_html'
+        ),
+        f'author:{user.pk}',
+    )
     page_obj = paginate(request, posts)
-    count_posts = posts.count()
+    count_posts = page_obj.paginator.count
     if request.user.is_authenticated:
         follows = Follow.objects.filter(user=request.user,
                                         author=user).exists()
+        suggestions = recommendations_for(request.user)
     else:
         follows = False
+        suggestions = ()
     # Здесь код запроса к модели и создание словаря контекста
     context = {
         'author': user,
         'posts': page_obj.object_list,
         'page_obj': page_obj,
         'count_posts': count_posts,
-        'following': follows
+        'following': follows,
+        'recommendations': suggestions,
     }
     return render(request, template, context)
 
 
+@conditional_page(post_page_state)
 def post_detail(request, post_id):
     template = 'posts/post_detail.html'
-    post = get_object_or_404(Post, pk=post_id)
+    post, archived = get_post_or_archived_or_404(
+        Post.objects.select_related('author'),
+        ArchivedPost.objects.select_related('author'),
+        post_id,
+    )
+    if post.group_id is not None:
+        post.group = get_group(post.group_id)
     form = CommentForm(request.POST or None)
-    comments = post.comments.all()
+    comments = post.comments.select_related('author')
     if request.method == 'POST':
         return redirect('posts:add_comment')
     author = post.author
     author_posts = author.posts
-    count_posts = author_posts.count()
+    count_posts = author_posts.count() + archived_count(
+        author.archived_posts, f'author:{author.pk}'
+    )
     context = {
         'author': author,
         'post': post,
         'count_posts': count_posts,
         'form': form,
         'comments': comments,
+        # архивный пост только для чтения
+        'archived': archived,
     }
     return render(request, template, context)
 
 
+@login_required
+def profile_export(request, username):
+    author = get_object_or_404(User, username=username)
+    return export_response(
+        request, author.posts.all(), username, author.archived_posts.all()
+    )
+
+
+@login_required
+def group_export(request, slug):
+    group = get_group_by_slug_or_404(slug)
+    return export_response(
+        request, group.posts.all(), slug, group.archived_posts.all()
+    )
+
+
 @login_required()
 def post_create(request):
     is_edit = False
@@ -113,7 +212,14 @@ def post_edit(request, post_id):
             request.POST or None, files=request.FILES or None, instance=post
         )
         if form.is_valid():
-            form.save()
+            post = form.save(commit=False)
+            try:
+                # пост, перенесённый в архив после чтения, UPDATE не найдёт;
+                # без force_update save() вставил бы его обратно
+                with transaction.atomic():
+                    post.save(force_update=True)
+            except DatabaseError:
+                raise Http404('Пост перенесён в архив')
             return redirect('posts:post_detail', post_id=post_id)
     context = {
         'post_id': post_id,
@@ -137,15 +243,69 @@ def add_comment(request, post_id):
 
 @login_required
 def follow_index(request):
-    posts = Post.objects.filter(author__following__user=request.user)
+    posts = Post.objects.filter(
+        author__following__user=request.user
+    ).select_related('author').defer('text', 'text_html')
     page_obj = paginate(request, posts)
     context = {
         'page_obj': page_obj,
-        'posts': posts
+        'posts': page_obj.object_list
     }
     return render(request, 'posts/follow.html', context)
 
 
+index_feed = cached_feed(IndexFeed)
+group_feed = cached_feed(GroupFeed)
+profile_feed = cached_feed(AuthorFeed)
+
+
+def since(request):
+    try:
+        posts, _ = resolve_feed(request)
+        after = parse_cursor(request.GET.get('after'))
+    except PermissionDenied:
+        return HttpResponseForbidden()
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
+    new_posts = since_posts(posts, after)
+    return JsonResponse({
+        'ids': [post.pk for post in new_posts],
+        'cursor': new_posts[-1].pk if new_posts else after,
+        'cards': [str(card) for card in post_cards(new_posts)],
+    })
+
+
+def live(request):
+    if not settings.LIVE_SSE_ENABLED:
+        raise Http404
+    try:
+        posts, matches = resolve_feed(request)
+        # при переподключении браузер присылает id последнего события
+        after = parse_cursor(
+            request.META.get('HTTP_LAST_EVENT_ID')
+            or request.GET.get('after')
+        )
+    except PermissionDenied:
+        return HttpResponseForbidden()
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
+    slot = acquire_stream()
+    if slot is None:
+        # страница перейдёт на опрос since
+        response = HttpResponse(status=503)
+        response['Retry-After'] = settings.LIVE_STREAM_TIMEOUT
+        return response
+    response = StreamingHttpResponse(
+        event_stream(posts, matches, after), content_type='text/event-stream'
+    )
+    # закрытие ответа закрывает и генератор, и место
+    response._closable_objects.append(slot)
+    response['Cache-Control'] = 'no-cache'
+    # nginx не должен копить события в буфере
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 @login_required
 def profile_follow(request, username):
     user = request.user
@@ -0,0 +1,32 @@
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+from core import metrics, versions
+
+USER_CACHE_TIMEOUT = 60 * 15
+VERSION = 'users'
+
+
+def user_cache_key(user_id):
+    # кэш у процесса свой: изменение пользователя в другом воркере
+    # меняет общую версию (users.signals), и запись перестаёт читаться
+    return f'auth_user:{versions.get(VERSION)}:{user_id}'
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend, который отдаёт request.user из кэша.
+
+    Ключ записи содержит версию из core.versions, её меняют сигналы в
+    users.signals при сохранении и удалении пользователя и смене его
+    прав — во всех процессах не позже VERSION_CHECK_INTERVAL.
+    """
+
+    def get_user(self, user_id):
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        metrics.record_cache(hits=user is not None, misses=user is None)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, USER_CACHE_TIMEOUT)
+        return user if self.user_can_authenticate(user) else None
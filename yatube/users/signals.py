@@ -0,0 +1,34 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from core import versions
+
+from . import backends
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, created=False,
+                           update_fields=None, **kwargs):
+    if created:
+        # общую версию не меняем: нового пользователя в кэшах воркеров нет.
+        # Запись под тем же id могла остаться от отменённой транзакции
+        cache.delete(backends.user_cache_key(instance.pk))
+        return
+    # вход меняет только last_login
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    versions.bump(backends.VERSION)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+@receiver(m2m_changed, sender=Group.permissions.through)
+def invalidate_cached_permissions(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        versions.bump(backends.VERSION)
@@ -0,0 +1,77 @@
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.backends.cached_db import SessionStore
+from django.core.cache import cache, caches
+from django.test import Client, TestCase
+
+from core import versions
+from core.models import Version
+
+User = get_user_model()
+
+
+class CachedUserTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Cached')
+
+    def setUp(self):
+        cache.clear()
+        caches['sessions'].clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_logged_in_page_without_session_and_user_queries(self):
+        """Повторный запрос не читает сессию и пользователя из БД."""
+        self.authorized_client.get('/about/author/')
+        with self.assertNumQueries(0):
+            self.authorized_client.get('/about/author/')
+
+    def test_user_save_invalidates_cache(self):
+        """После сохранения пользователя request.user не устаревает."""
+        self.authorized_client.get('/about/author/')
+        self.user.first_name = 'Новое'
+        self.user.save()
+        response = self.authorized_client.get('/about/author/')
+        self.assertEqual(response.context['user'].first_name, 'Новое')
+
+    def other_process_bumps(self, name):
+        # другой процесс меняет версию в БД, наш кэш об этом не знает,
+        # пока не истечёт VERSION_CHECK_INTERVAL
+        Version.objects.update_or_create(
+            name=name, defaults={'value': 'other'}
+        )
+        cache.delete(versions.CACHE_KEY)
+
+    def test_deactivation_in_other_process(self):
+        """Отключённый в другом процессе пользователь выходит из кэша."""
+        self.authorized_client.get('/about/author/')
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.other_process_bumps('users')
+        response = self.authorized_client.get('/about/author/')
+        self.assertFalse(response.context['user'].is_authenticated)
+
+    def test_signup_keeps_cached_users(self):
+        """Регистрация не сбрасывает кэш пользователей и ETag страниц."""
+        before = versions.get('users')
+        User.objects.create_user(username='Newcomer')
+        self.assertEqual(versions.get('users'), before)
+
+    def test_logout_in_other_process(self):
+        """Выход в другом процессе убирает сессию из общего кэша.
+
+        Сессии остальных пользователей остаются в кэше.
+        """
+        other = User.objects.create_user(username='Other')
+        other_client = Client()
+        other_client.force_login(other)
+        self.authorized_client.get('/about/author/')
+        other_client.get('/about/author/')
+        # выход другого процесса: его SessionStore удаляет сессию из БД и
+        # из кэша 'sessions', общего для процессов
+        session_key = self.authorized_client.session.session_key
+        SessionStore(session_key).delete()
+        response = self.authorized_client.get('/about/author/')
+        self.assertFalse(response.context['user'].is_authenticated)
+        with self.assertNumQueries(0):
+            other_client.get('/about/author/')
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/2.2/ref/settings/
 """
 
 import os
+import tempfile
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -36,6 +37,52 @@ ALLOWED_HOSTS = [
 ]
 
 POSTS_ON_PAGE = 10
+POST_EXCERPT_LENGTH = 300
+# по сколько постов читает потоковая выгрузка (posts.export)
+EXPORT_CHUNK_SIZE = 2000
+# размер страницы JSON API по умолчанию и наибольший (?limit=)
+API_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 100
+# наибольшее окно суточной статистики в API (?days=)
+API_STATS_MAX_DAYS = 366
+# новые посты без перезагрузки (posts.live): сколько постов за раз и как
+# часто страница спрашивает since
+LIVE_SINCE_LIMIT = 50
+LIVE_CHECK_INTERVAL = 30
+# поток SSE вместо опроса. Каждый поток занимает поток сервера на
+# LIVE_STREAM_TIMEOUT секунд: включать только на сервере с потоками или
+# async (gunicorn -k gthread --threads N, uvicorn), а не с sync-воркерами,
+# иначе несколько вкладок займут все воркеры. LIVE_MAX_STREAMS — потоков
+# на процесс, остальным 503, и страница переходит на опрос. Поток
+# опрашивает базу раз в LIVE_POLL_INTERVAL секунд, браузер
+# переподключается через LIVE_RETRY_MS миллисекунд
+LIVE_SSE_ENABLED = False
+LIVE_MAX_STREAMS = 10
+LIVE_POLL_INTERVAL = 5
+LIVE_STREAM_TIMEOUT = 5 * 60
+LIVE_RETRY_MS = 3000
+# RSS/Atom (posts.feeds): постов в ленте, сколько секунд XML живёт в кэше
+# и сколько читатели и прокси могут не перепроверять ленту
+FEED_ITEMS = 20
+FEED_CACHE_TIMEOUT = 10 * 60
+FEED_MAX_AGE = 60
+# популярные посты (posts.trending): вклад комментария и нового подписчика
+# (он поднимает посты автора за последние TRENDING_FOLLOW_WINDOW секунд),
+# период полураспада счёта, как часто запускается decay_trending и ниже
+# какого счёта пост выпадает из популярных
+TRENDING_COMMENT_WEIGHT = 1.0
+TRENDING_FOLLOW_WEIGHT = 0.5
+TRENDING_FOLLOW_WINDOW = 3 * 24 * 60 * 60
+TRENDING_HALF_LIFE = 6 * 60 * 60
+TRENDING_DECAY_INTERVAL = 10 * 60
+TRENDING_MIN_SCORE = 0.05
+# «кого почитать» (posts.recommendations): авторов на пользователя,
+# похожих авторов в расчёте и сколько подписчиков автора смотреть
+RECOMMENDATIONS_PER_USER = 5
+RECOMMENDATIONS_SIMILAR = 20
+RECOMMENDATIONS_FOLLOWER_SAMPLE = 500
+# посты старше стольких дней archive_posts переносит в архив (posts.archive)
+ARCHIVE_AFTER_DAYS = 365
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
 MEDIA_URL = '/media/'
@@ -47,6 +94,7 @@ INSTALLED_APPS = [
     'core.apps.CoreConfig',
     'users.apps.UsersConfig',
     'posts.apps.PostsConfig',
+    'api.apps.ApiConfig',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -59,11 +107,15 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'debug_toolbar.middleware.DebugToolbarMiddleware',
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.SlowQueryMiddleware',
+    'core.middleware.ReadReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -72,6 +124,55 @@ INTERNAL_IPS = [
     '127.0.0.1',
 ] 
 
+# метрики по view (core.metrics): каталог с файлами процессов,
+# как часто процесс сбрасывает свои значения и кому доступен /metrics
+METRICS_DIR = os.path.join(tempfile.gettempdir(), 'yatube-metrics')
+METRICS_FLUSH_INTERVAL = 10
+METRICS_ALLOWED_IPS = INTERNAL_IPS
+# за обратным прокси: заголовок с адресом клиента в request.META, например
+# 'HTTP_X_FORWARDED_FOR' (берётся последний адрес — тот, что дописал прокси)
+# или 'HTTP_X_REAL_IP'. Задавать, только если прокси сам перезаписывает
+# заголовок: иначе клиент подделает его и получит доступ к /metrics
+METRICS_CLIENT_IP_HEADER = None
+
+# журнал медленных запросов (core.slow_queries), порог в секундах;
+# файл вне дерева исходников, как и METRICS_DIR
+SLOW_QUERY_THRESHOLD = 0.1
+SLOW_QUERY_LOG = os.path.join(
+    tempfile.gettempdir(), 'yatube-slow-queries.log'
+)
+
+# профилирование запросов (core.profiling): по заголовку X-Profile от
+# staff-пользователя или для доли PROFILING_SAMPLE_RATE всех запросов
+PROFILING_ENABLED = False
+PROFILING_HEADER = 'HTTP_X_PROFILE'
+PROFILING_SAMPLE_RATE = 0
+PROFILING_INTERVAL = 0.005
+PROFILING_DIR = os.path.join(BASE_DIR, 'profiles')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'slow_queries': {
+            'class': 'logging.handlers.WatchedFileHandler',
+            'filename': SLOW_QUERY_LOG,
+            'formatter': 'message',
+            'delay': True,
+        },
+    },
+    'loggers': {
+        'yatube.slow_queries': {
+            'handlers': ['slow_queries'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
 ROOT_URLCONF = 'yatube.urls'
 
 TEMPLATES = [
@@ -96,18 +197,74 @@ WSGI_APPLICATION = 'yatube.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
 
+# соединения переживают запрос и проверяются перед следующим (core.db)
+DATABASE_CONN_MAX_AGE = 60
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
-    }
+        'CONN_MAX_AGE': DATABASE_CONN_MAX_AGE,
+    },
+    # тот же файл, открытый только на чтение (URI mode=ro): с него читают
+    # GET-запросы и не конкурируют с записью (core.routers)
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': 'file:{}?mode=ro'.format(os.path.join(BASE_DIR, 'db.sqlite3')),
+        'CONN_MAX_AGE': DATABASE_CONN_MAX_AGE,
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+DATABASE_ROUTERS = ['core.routers.ReadReplicaRouter']
+# алиас для чтения; None — всё через default
+DATABASE_READ_REPLICA = 'replica'
+# сколько секунд после записи клиент читает с основной базы
+DATABASE_PRIMARY_PIN = 5
+DATABASE_PRIMARY_PIN_COOKIE = 'primary_pin'
+
+# PRAGMA для каждого соединения с SQLite (core.db)
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000,
 }
+SQLITE_OPTIMIZE_INTERVAL = 60 * 60
 
 CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
+    },
+    # сессии — в кэше, общем для всех воркеров: выход в одном воркере
+    # удаляет сессию из кэша и для остальных. Файлы видят процессы одной
+    # машины; на нескольких серверах здесь memcached или redis
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(tempfile.gettempdir(), 'yatube-sessions'),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
 }
+# single-flight кэш (core.cache): аренда на пересчёт, сколько ждать
+# чужого пересчёта и сколько ещё отдавать устаревшее значение
+CACHE_LEASE_TIMEOUT = 10
+CACHE_LEASE_WAIT = 2
+CACHE_STALE_GRACE = 60
+# карточки постов в списках (posts.templatetags.post_filters.post_cards)
+POST_CARD_TIMEOUT = 60 * 60 * 24
+# сколько секунд процесс верит своей копии версий из core_version
+# (core.versions): столько другие воркеры могут видеть старую версию
+VERSION_CHECK_INTERVAL = 2
+
+# Сессии читаются из общего кэша 'sessions' и пишутся в БД только при
+# изменении. Пользователь для request.user берётся из кэша процесса, его
+# ключ включает версию из core.versions (users.backends).
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'sessions'
+AUTHENTICATION_BACKENDS = [
+    'users.backends.CachedModelBackend',
+]
 
 
 # Password validation
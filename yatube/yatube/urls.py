@@ -4,6 +4,8 @@ from django.urls import include, path
 from . import settings
 from django.conf.urls.static import static
 
+from core.views import metrics_view
+
 handler404 = 'core.views.page_not_found'
 handler403 = 'core.views.csrf_failure'
 handler500 = 'core.views.server_error'
@@ -11,7 +13,9 @@ handler500 = 'core.views.server_error'
 urlpatterns = [
     path('about/', include('about.urls', namespace='about')),
     path('', include('posts.urls', namespace='posts')),
+    path('api/v1/', include('api.urls', namespace='api')),
     path('admin/', admin.site.urls),
+    path('metrics', metrics_view, name='metrics'),
     path('auth/', include('users.urls', namespace='users')),
     path('auth/', include('django.contrib.auth.urls'))
 ]